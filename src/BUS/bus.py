@@ -13,8 +13,10 @@ The evaluation object is defined in the Evaluation module.
 """
 from concurrent.futures import ProcessPoolExecutor
 from src.BUS.bus_dsl import *
+from src.dsl import NodeKey
 from src.Evaluation.evaluation import *
 from src.Optimizer.optimizer import *
+from src.Utils.obs_equivalence import ObservationalEquivalence
 import time
 
 class Plist:
@@ -62,6 +64,9 @@ class Plist:
 
 class BUS:
 
+    # number of game states on which expressions are compared to prune the bank
+    SAMPLE_SIZE = 50
+
     def __init__(self, time_limit, logger, run_optimizer):
         self.time_limit = time_limit
         self.logger = logger
@@ -89,6 +94,9 @@ class BUS:
         
         self.plist = Plist(constants, scalars, dsfs)
 
+        self.equivalence = ObservationalEquivalence(eval_funct.sample_envs(BUS.SAMPLE_SIZE))
+        self.equivalence.add_bank(self.plist)
+
         if self.run_optimizer:
             optimizer = Optimizer(eval_funct, self.is_triage, self.n_iter, self.kappa)
 
@@ -138,8 +146,9 @@ class BUS:
         nplist = []
         for op in self.grammar['operators']:
             for p in op.grow(self.plist.copy(), psize):
-                if p.to_string() not in self.closed_list:
-                    self.closed_list.add(p.to_string())
+                key = NodeKey(p)
+                if key not in self.closed_list and self.equivalence.is_new(p):
+                    self.closed_list.add(key)
                     nplist.append(p)
                     yield p
         
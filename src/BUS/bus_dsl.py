@@ -20,6 +20,8 @@ This class implements an AST node representing a constant.
 """
 class Constant(baseDSL.Constant):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Constant, self).__init__()
 
@@ -29,6 +31,8 @@ choosing/returning an action among the available actions.
 """
 class ReturnAction(baseDSL.ReturnAction):
 
+    __slots__ = ()
+
     def __init__(self):
         super(ReturnAction, self).__init__()
 
@@ -54,6 +58,8 @@ for each x in coords:
 """
 class ForEach(baseDSL.ForEach):
 
+    __slots__ = ()
+
     def __init__(self):
         super(IT, self).__init__()
 
@@ -94,6 +100,8 @@ languages
 """
 class IT(baseDSL.IT):
 
+    __slots__ = ()
+
     def __init__(self):
         super(IT, self).__init__()
 
@@ -134,6 +142,8 @@ general-purpose programming languages.
 """
 class ITE(baseDSL.ITE):
 
+    __slots__ = ()
+
     def __init__(self):
         super(ITE, self).__init__()
 
@@ -177,6 +187,8 @@ the x-position of the player on the screen.
 """
 class PlayerPosition(baseDSL.PlayerPosition):
 
+    __slots__ = ()
+
     def __init__(self):
         super(PlayerPosition, self).__init__()
 
@@ -188,6 +200,8 @@ the ball.
 """
 class NonPlayerObjectPosition(baseDSL.NonPlayerObjectPosition):
 
+    __slots__ = ()
+
     def __init__(self):
         super(NonPlayerObjectPosition, self).__init__()
 
@@ -198,6 +212,8 @@ object is moving towards the player and False otherwise.
 """
 class NonPlayerObjectApproaching(baseDSL.NonPlayerObjectApproaching):
 
+    __slots__ = ()
+
     def __init__(self):
         super(NonPlayerObjectApproaching, self).__init__()
 
@@ -206,6 +222,8 @@ class NonPlayerObjectApproaching(baseDSL.NonPlayerObjectApproaching):
 This class implements an AST node represent a list variable
 """
 class VarArray(baseDSL.VarArray):
+
+    __slots__ = ()
     
     def __init__(self):
         super(VarArray, self).__init__()
@@ -217,6 +235,8 @@ For instance, the player's paddle width.
 """
 class VarScalar(baseDSL.VarScalar):
 
+    __slots__ = ()
+
     def __init__(self):
         super(VarScalar, self).__init__()
 
@@ -227,6 +247,8 @@ an array. For example, actions[0]
 """
 class VarFromArray(baseDSL.VarFromArray):
 
+    __slots__ = ()
+
     def __init__(self):
         super(VarFromArray, self).__init__()
 
@@ -238,6 +260,8 @@ method.
 """
 class LessThan(baseDSL.LessThan):
 
+    __slots__ = ()
+
     def __init__(self):
         super(LessThan, self).__init__()
 
@@ -262,7 +286,7 @@ class LessThan(baseDSL.LessThan):
                                     if t2 in valid_nodes:
                                         for right in p2:
 
-                                            if left.to_string() != right.to_string():
+                                            if not left.equals(right):
                                                 lt = LessThan.new(left, right)
                                                 nplist.append(lt)
                                                 yield lt
@@ -277,6 +301,8 @@ method.
 """
 class GreaterThan(baseDSL.GreaterThan):
 
+    __slots__ = ()
+
     def __init__(self):
         super(GreaterThan, self).__init__()
 
@@ -301,7 +327,7 @@ class GreaterThan(baseDSL.GreaterThan):
                                     if t2 in valid_nodes:
                                         for right in p2:
 
-                                            if left.to_string() != right.to_string():
+                                            if not left.equals(right):
                                                 gt = GreaterThan.new(left, right)
                                                 nplist.append(gt)
                                                 yield gt
@@ -315,6 +341,8 @@ operator
 """
 class EqualTo(baseDSL.EqualTo):
 
+    __slots__ = ()
+
     def __init__(self):
         super(EqualTo, self).__init__()
 
@@ -339,7 +367,7 @@ class EqualTo(baseDSL.EqualTo):
                                     if t2 in valid_nodes:
                                         for right in p2:
 
-                                            if left.to_string() != right.to_string():
+                                            if not left.equals(right):
                                                 eq = EqualTo.new(left, right)
                                                 nplist.append(eq)
                                                 yield eq
@@ -352,6 +380,8 @@ This class implements an AST node representing the addition operator.
 """
 class Plus(baseDSL.Plus):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Plus, self).__init__()
 
@@ -388,6 +418,8 @@ This class implements an AST node representing the multiplication operator
 """
 class Times(baseDSL.Times):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Times, self).__init__()
 
@@ -415,7 +447,7 @@ class Times(baseDSL.Times):
                                             eq = Times.new(right, left)
                                             is_equivalent = False
                                             for p in nplist:
-                                                if p.to_string() == eq.to_string():
+                                                if p.equals(eq):
                                                     is_equivalent = True
 
                                             if not is_equivalent:
@@ -430,6 +462,8 @@ This class implements an AST node representing the minus operator
 """
 class Minus(baseDSL.Minus):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Minus, self).__init__()
 
@@ -454,7 +488,7 @@ class Minus(baseDSL.Minus):
                                     if t2 in valid_nodes:
                                         for right in p2:
                                             minus = Minus.new(left, right)
-                                            if left.to_string() != right.to_string() and right.to_string() != '0':
+                                            if not left.equals(right) and right.to_string() != '0':
                                                 nplist.append(minus)
                                                 yield minus
 
@@ -466,6 +500,8 @@ This class implements an AST node representing the integer division operator
 """
 class Divide(baseDSL.Divide):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Divide, self).__init__()
 
@@ -490,7 +526,7 @@ class Divide(baseDSL.Divide):
                                     if t2 in valid_nodes:
                                         for right in p2:
                                             if right.to_string() != '0' and left.to_string() != '0':
-                                                if left.to_string() != right.to_string():
+                                                if not left.equals(right):
                                                     divide = Divide.new(left, right)
                                                     nplist.append(divide)
                                                     yield divide
@@ -503,6 +539,8 @@ This class implements the initial symbol of the DSL.
 """
 class Strategy(baseDSL.Strategy):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Strategy, self).__init__()
 
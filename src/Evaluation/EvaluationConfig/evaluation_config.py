@@ -12,6 +12,9 @@ from src.Evaluation.EvaluationConfig.evaluation_config_cheby import EvaluationCo
 from statistics import *
 from src.Evaluation.EvaluationConfig.evaluation_config_normal import *
 from src.Evaluation.EvaluationConfig.evaluation_config_batch import *
+from src.Evaluation.EvaluationConfig.evaluation_config_bernstein import *
+from src.Evaluation.EvaluationConfig.evaluation_config_sequential import *
+from src.Evaluation.EvaluationConfig.evaluation_config_paired import *
 
 class EvaluationConfigFactory:
 
@@ -25,8 +28,17 @@ class EvaluationConfigFactory:
         elif config_name == 'CHEBY':
             return EvaluationConfigCheby(config_attributes)
 
+        elif config_name == 'BERNSTEIN':
+            return EvaluationConfigBernstein(config_attributes)
+
+        elif config_name == 'SEQUENTIAL':
+            return EvaluationConfigSequential(config_attributes)
+
+        elif config_name == 'PAIRED':
+            return EvaluationConfigPaired(config_attributes)
+
         else:
-            raise Exception(f'No such EvaluationConfig object: {self.config_name}')
+            raise Exception(f'No such EvaluationConfig object: {config_name}')
 
 
 def form_basic_attr_dict(
@@ -10,6 +10,7 @@ by the synthesizer and returns the average of the maximum scores as the strategy
 """
 
 from src.Evaluation.EvaluationConfig.evaluation_config_parent import *
+from src.Evaluation.EvaluationConfig.running_stats import BatchMaxTracker
 from statistics import *
 
 class EvaluationConfigBatch(EvaluationConfig):
@@ -29,8 +30,9 @@ class EvaluationConfigBatch(EvaluationConfig):
         return self.batch_size
 
     def clean_up(self):
-        self.max_scores = []
+        self.batch_max_tracker = BatchMaxTracker(self.batch_size)
         self.last_score_index = 0
+        super(EvaluationConfigBatch, self).clean_up()
 
     def compute_result(self, scores, games_played):
         if not self.config_attributes_set:
@@ -38,29 +40,31 @@ class EvaluationConfigBatch(EvaluationConfig):
                 'Must set attributes of EvaluationConfigBatch object using set_config_attributes'
             )
 
-        if games_played % self.batch_size == 0:
-            batch_scores = scores[self.last_score_index:]
-            max_batch_score = max(batch_scores)
-            self.max_scores.append(max_batch_score)
-            self.last_score_index = len(scores)
+        # Each score is added to its batch once
+        if self.starts_new_evaluation(scores, self.last_score_index):
+            self.clean_up()
+            self.scored_list = scores
 
-        if len(self.max_scores) > 0:
-            return round(mean(self.max_scores), 2)
+        for score in scores[self.last_score_index:]:
+            self.batch_max_tracker.update(score)
+        self.last_score_index = len(scores)
+
+        max_stats = self.batch_max_tracker.get_max_stats()
+        if max_stats.get_count() > 0:
+            return round(max_stats.get_mean(), 2)
         else:
             return self.MIN_SCORE
 
     def check_continue(self, program_current_score, games_played):
         if games_played == self.total_games:
-            self.last_score_index = 0
             return False
 
-        if self.triage and len(self.max_scores) > 0:
+        if self.triage and self.batch_max_tracker.get_max_stats().get_count() > 0:
             if self.check_triage_stop(
                     program_current_score,
                     self.compute_epsilon(games_played),
                     self.compute_epsilon(self.total_games)
             ):
-                self.last_score_index = 0
                 return False
 
         return True
\ No newline at end of file
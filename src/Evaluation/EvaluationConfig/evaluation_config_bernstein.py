@@ -0,0 +1,99 @@
+"""
+evaluation_config_bernstein.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements a config. sub-class that uses the empirical Bernstein
+inequality for its triage. In contrast to the Hoeffding inequality used by
+EvaluationConfigNormal, the bound is built from the observed variance of the
+scores: its main term shrinks with the standard deviation of the scores rather
+than with their range, and only a second term, which decreases as 1 / games
+instead of 1 / sqrt(games), depends on the range of the scores.
+
+A range as wide as triage_var_bound makes the second term larger than the
+Hoeffding bound for the few dozen games programs usually play, so the range of
+the observed scores is used instead, capped by triage_var_bound if it is given.
+Like the variance used by EvaluationConfigCheby, the observed range is only
+trusted after a few games: the triage is checked after every game from the
+min_games-th game on.
+"""
+
+from src.Evaluation.EvaluationConfig.evaluation_config_parent import *
+from statistics import *
+import math
+
+class EvaluationConfigBernstein(EvaluationConfig):
+
+    min_games_name = 'min_games'
+
+    def set_config_attributes(self, attributes):
+        self.min_games = attributes.get(self.min_games_name)
+        if self.min_games is None:
+            self.min_games = 5
+
+        assert type(self.min_games) is int, 'min_games must be an integer'
+
+        self.best_eval_variance = 0
+        self.best_eval_range = 0
+
+        return super().set_config_attributes(attributes)
+
+    def set_best_eval_variance(self, variance):
+        self.best_eval_variance = variance
+
+    def set_best_eval_range(self, score_range):
+        self.best_eval_range = score_range
+
+    def compute_result(self, scores, games_played):
+        if not self.config_attributes_set:
+            raise Exception(
+                'Must set attributes of EvaluationConfigBernstein object using set_config_attributes'
+            )
+
+        stats = self.update_stats(scores)
+        if self.by_win_rate:
+            return self.compute_win_rate(scores, games_played)
+
+        return round(stats.get_mean(), 2)
+
+    def check_continue(self, program_current_score, games_played):
+        if games_played == self.total_games:
+            return False
+
+        if self.triage and games_played >= self.min_games and self.check_triage_stop(
+                program_current_score,
+                self.compute_epsilon(self.stats.get_pvariance(), self.cap_range(self.stats.get_range()), games_played, self.get_program_log_term(games_played)),
+                self.compute_epsilon(self.best_eval_variance, self.cap_range(self.best_eval_range), self.total_games, self.get_log_term())
+        ):
+            return False
+
+        return True
+
+    def check_triage_stop(self, program_current_score, epsilon_program, epsilon_current_best):
+        # Both bounds are zero if all the scores are equal, and programs as good
+        # as the best program must not be stopped
+        return program_current_score + epsilon_program < self.best_eval - epsilon_current_best
+
+    def get_delta(self):
+        # The confidence is split between the program and the best program,
+        # as in the Hoeffding inequality of the parent class
+        return 1 - math.sqrt(self.triage_confidence_value)
+
+    def get_log_term(self):
+        return math.log(3 / self.get_delta())
+
+    def get_program_log_term(self, games_played):
+        # The bound of the program is computed for a fixed number of games
+        return self.get_log_term()
+
+    def cap_range(self, score_range, factor=1):
+        # The observed range cannot exceed the range given by the user
+        if self.triage_random_var_bound is None:
+            return score_range
+        return min(score_range, factor * self.triage_random_var_bound)
+
+    def compute_epsilon(self, variance, score_range, number_evals, log_term):
+        # Empirical Bernstein inequality
+        return math.sqrt(2 * variance * log_term / number_evals) + \
+            3 * score_range * log_term / number_evals
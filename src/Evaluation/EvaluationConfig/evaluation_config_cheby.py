@@ -36,12 +36,14 @@ class EvaluationConfigCheby(EvaluationConfig):
 
     def clean_up(self):
         self.can_check_triage = False
+        super().clean_up()
 
     def compute_result(self, scores, games_played):
         self.scores = scores
+        stats = self.update_stats(scores)
 
         if games_played == self.k_eval:
-            self.variance = variance(scores)
+            self.variance = stats.get_variance()
 
         if games_played % self.k_eval == 0:
             self.can_check_triage = True
@@ -51,7 +53,7 @@ class EvaluationConfigCheby(EvaluationConfig):
         if self.by_win_rate:
             return self.compute_win_rate(scores, games_played)
 
-        return round(mean(scores), 2)
+        return round(stats.get_mean(), 2)
 
     def check_continue(self, program_current_score, games_played):
         if games_played == self.total_games:
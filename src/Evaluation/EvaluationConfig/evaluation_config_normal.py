@@ -36,4 +36,4 @@ class EvaluationConfigNormal(EvaluationConfig):
         if self.by_win_rate:
             return self.compute_win_rate(scores, games_played)
 
-        return round(mean(scores), 2)
\ No newline at end of file
+        return round(self.update_stats(scores).get_mean(), 2)
\ No newline at end of file
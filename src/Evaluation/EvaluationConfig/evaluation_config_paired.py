@@ -0,0 +1,73 @@
+"""
+evaluation_config_paired.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements a config. sub-class whose triage compares the program and
+the best program game by game. When the games are seeded by a SeedSchedule, the
+i-th game of the program and the i-th game of the best program are the same game,
+and the differences of their scores vary much less than the scores: a program
+that loses every game the best program wins is stopped after a few games, even
+if the scores themselves vary a lot from one game to the next.
+
+The triage stops the evaluation when the empirical Bernstein bound (see
+EvaluationConfigBernstein) of the mean difference is below zero. The bound is
+only computed for the differences, so all the confidence goes to it. If the scores
+of the best program are not known for the games played so far, the unpaired
+triage of EvaluationConfigBernstein is used instead.
+"""
+
+from src.Evaluation.EvaluationConfig.evaluation_config_bernstein import *
+import math
+
+class EvaluationConfigPaired(EvaluationConfigBernstein):
+
+    def set_config_attributes(self, attributes):
+        self.best_scores = None
+
+        return super().set_config_attributes(attributes)
+
+    def set_best_scores(self, scores):
+        self.best_scores = None if scores is None else tuple(scores)
+
+    def clean_up(self):
+        self.scores = []
+        super().clean_up()
+
+    def reset_stats(self):
+        self.difference_stats = RunningStats()
+        super().reset_stats()
+
+    def compute_result(self, scores, games_played):
+        self.scores = scores
+
+        return super().compute_result(scores, games_played)
+
+    def update_difference_stats(self, games_played):
+        # The differences of the games that were not seen yet are added
+        for i in range(self.difference_stats.get_count(), games_played):
+            self.difference_stats.update(self.scores[i] - self.best_scores[i])
+
+        return self.difference_stats
+
+    def check_continue(self, program_current_score, games_played):
+        if self.best_scores is None or len(self.best_scores) < games_played:
+            return super().check_continue(program_current_score, games_played)
+
+        if games_played == self.total_games:
+            return False
+
+        if self.triage and games_played >= self.min_games:
+            differences = self.update_difference_stats(games_played)
+
+            # The differences of scores within a range R are within a range 2R
+            difference_range = self.cap_range(differences.get_range(), factor=2)
+
+            # Only the bound of the differences is computed, so it gets all the confidence
+            log_term = math.log(3 / (1 - self.triage_confidence_value))
+            epsilon = self.compute_epsilon(differences.get_pvariance(), difference_range, games_played, log_term)
+            if differences.get_mean() + epsilon < 0:
+                return False
+
+        return True
@@ -14,7 +14,7 @@ the generated program's performance.
 The EvaluationConfig class is used by the Evaluation class which implements the evaluation
 logic at a higher level.
 """
-from pygame_games.ple import games
+from src.Evaluation.EvaluationConfig.running_stats import RunningStats
 from statistics import *
 import math
 
@@ -71,6 +71,12 @@ class EvaluationConfig:
     def set_best_eval_variance(self, variance):
         pass
 
+    def set_best_eval_range(self, score_range):
+        pass
+
+    def set_best_scores(self, scores):
+        pass
+
     def get_best_eval(self):
         return self.best_eval
 
@@ -81,16 +87,47 @@ class EvaluationConfig:
         return self.triage_confidence_value
 
     def clean_up(self):
-        pass
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = RunningStats()
+        self.num_wins = 0
+        self.scored_list = None
+
+    def starts_new_evaluation(self, scores, scores_seen):
+        """
+        Returns True if the running statistics do not hold the first scores_seen
+        scores of scores. They only do if scores is the list given to the previous
+        call and it grew since then, as in Evaluation.evaluate_sequential. Callers
+        that score several programs in turn, such as Racing, give a different list
+        for each program, so its statistics are computed again.
+        """
+        return scores is not self.scored_list or len(scores) < scores_seen
+
+    def update_stats(self, scores):
+        """
+        Adds the scores that were not seen yet to the running statistics of the
+        scores of the program, so that each game is only processed once, and
+        returns the statistics.
+        """
+        if self.starts_new_evaluation(scores, self.stats.get_count()):
+            self.reset_stats()
+            self.scored_list = scores
+
+        for score in scores[self.stats.get_count():]:
+            self.stats.update(score)
+            if score == 1:
+                self.num_wins += 1
+
+        return self.stats
 
     def compute_result(self, scores, games_played):
         raise Exception('Must implement compute_result')
 
     def compute_win_rate(self, wins_and_losses, games_played):
         # wins represented by 1's, losses represented by 0's
-        filtered_win_scores = list(filter(lambda arg: arg == 1, wins_and_losses))
-        num_wins = len(filtered_win_scores)
-        return round(num_wins / games_played, 2)
+        self.update_stats(wins_and_losses)
+        return round(self.num_wins / games_played, 2)
 
     def check_continue(self, program_current_score, games_played):
         raise Exception('Must implement check_continue method')
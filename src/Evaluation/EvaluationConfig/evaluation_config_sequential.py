@@ -0,0 +1,24 @@
+"""
+evaluation_config_sequential.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements a config. sub-class whose triage uses an anytime-valid
+confidence sequence. The other configs check their triage after several numbers
+of games with a bound that only holds for a fixed number of games, so the more
+often they check, the more likely they are to stop a good program. The empirical
+Bernstein bound of the program is computed here with the confidence of the n-th
+game set to delta / (n * (n + 1)), whose sum over all n is delta: the bound holds
+for all the games at once, and the triage can be checked after every game. The
+bound of the best program is computed once for total_games games, as in
+EvaluationConfigBernstein.
+"""
+
+from src.Evaluation.EvaluationConfig.evaluation_config_bernstein import *
+import math
+
+class EvaluationConfigSequential(EvaluationConfigBernstein):
+
+    def get_program_log_term(self, games_played):
+        return math.log(3 * games_played * (games_played + 1) / self.get_delta())
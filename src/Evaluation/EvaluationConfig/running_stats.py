@@ -0,0 +1,93 @@
+"""
+running_stats.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file implements the RunningStats and BatchMaxTracker classes. The evaluation
+configs compute the result of a program after every game it plays, and computing
+the mean and variance of all the scores with the statistics module every time
+costs O(games) per game. RunningStats is updated with each new score in O(1)
+time, using Welford's algorithm for the variance, and BatchMaxTracker keeps the
+running statistics of the maximum scores of batches of games, as used by
+EvaluationConfigBatch.
+"""
+
+class RunningStats:
+
+    def __init__(self, values=()):
+        self.count = 0
+        self.total = 0
+        self.welford_mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.extend(values)
+
+    def update(self, value):
+        self.count += 1
+        self.total += value
+
+        # Welford's algorithm
+        delta = value - self.welford_mean
+        self.welford_mean += delta / self.count
+        self.m2 += delta * (value - self.welford_mean)
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def extend(self, values):
+        for value in values:
+            self.update(value)
+
+    def get_count(self):
+        return self.count
+
+    def get_mean(self):
+        # The sum is exact for integer scores, so the mean is too
+        return self.total / self.count
+
+    def get_variance(self):
+        # sample variance, as statistics.variance
+        if self.count < 2:
+            return 0.0
+        return max(0.0, self.m2 / (self.count - 1))
+
+    def get_pvariance(self):
+        # population variance, as statistics.pvariance
+        if self.count == 0:
+            return 0.0
+        return max(0.0, self.m2 / self.count)
+
+    def get_range(self):
+        if self.count == 0:
+            return 0
+        return self.max - self.min
+
+
+class BatchMaxTracker:
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.batch_max = None
+        self.batch_count = 0
+        self.max_stats = RunningStats()
+
+    def update(self, score):
+        """
+        Adds the score of a game to the current batch. When the batch is complete,
+        its maximum score is added to the statistics of the maximum scores.
+        """
+        if self.batch_max is None or score > self.batch_max:
+            self.batch_max = score
+
+        self.batch_count += 1
+        if self.batch_count == self.batch_size:
+            self.max_stats.update(self.batch_max)
+            self.batch_max = None
+            self.batch_count = 0
+
+    def get_max_stats(self):
+        return self.max_stats
@@ -0,0 +1,89 @@
+"""
+evaluation_cache.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file implements the EvaluationCache class. Simulated annealing and the
+optimizer often evaluate the same program more than once, e.g. when a mutation
+or a Bayesian optimization step gives back a program seen before. An evaluation
+object with a cache returns the stored scores of such programs instead of playing
+the games again.
+
+Entries are keyed by the canonical key of the program (see simplifier.py), so
+that equivalent programs share an entry and other programs never do, the game,
+the type of the evaluation config, the number of games, the seeds of the games
+and the action repeat, and only complete evaluations (all total_games played)
+are stored. The least recently
+used entries are evicted first. The cache can be saved to and loaded from a
+file, so that a run can be warm-started with the results of previous runs.
+"""
+from collections import OrderedDict
+import os
+import pickle
+from src.Utils.simplifier import canonical_key
+
+class EvaluationCache:
+
+    def __init__(self, max_size=100_000, filepath=None):
+        self.max_size = max_size
+        self.filepath = filepath
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if filepath is not None and os.path.exists(filepath):
+            self.load(filepath)
+
+    def get_key(self, program, evaluation):
+        return (
+            canonical_key(program),
+            type(evaluation).__name__,
+            type(evaluation.eval_config).__name__,
+            evaluation.get_total_games(),
+            evaluation.get_seed_key(),
+            evaluation.get_action_repeat()
+        )
+
+    def get(self, key):
+        """
+        Returns the (scores, result) pair stored for key, or None if there is none.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, scores, result):
+        self.entries[key] = (tuple(scores), result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get_size(self):
+        return len(self.entries)
+
+    def get_hit_rate(self):
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0
+        return round(self.hits / lookups, 2)
+
+    def save(self, filepath=None):
+        if filepath is None:
+            filepath = self.filepath
+
+        if filepath is None:
+            raise Exception('No file to save the evaluation cache to')
+
+        with open(filepath, 'wb') as cache_file:
+            pickle.dump(list(self.entries.items()), cache_file)
+
+    def load(self, filepath):
+        with open(filepath, 'rb') as cache_file:
+            for key, entry in pickle.load(cache_file):
+                self.put(key, *entry)
@@ -7,21 +7,81 @@ Description:
 This file implements the parent Evaluation class.
 """
 from src.Evaluation.EvaluationConfig.evaluation_config import *
+from src.Evaluation.EvaluationConfig.running_stats import RunningStats
+from src.Utils.program_encoding import EncodedProgram
+from src.Utils.simplifier import is_constant_program
+from src.Utils.static_analysis import always_raises
+from src.Evaluation.evaluation_cache import EvaluationCache
 from statistics import *
 from functools import partial
-from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, Future
+import copy as cp
+import pickle
 import os
 
+# Evaluation object of a worker process of the pool used by evaluate_parallel
+worker_evaluation = None
+
+def init_worker(evaluation):
+    """
+    Runs once in each worker of the pool. The worker keeps its own evaluation
+    object, configured to play a single game per task, and builds a game right
+    away so that pygame and PLE are initialized before the first task arrives.
+    """
+    global worker_evaluation
+    worker_evaluation = evaluation
+    worker_evaluation.init_game()
+    worker_evaluation.clean_up()
+
+def play_game_in_worker(pickled_program, episode, action_repeat):
+    # The parent checked that the result is not known, and episode is the index
+    # of the game in the seed schedule
+    program = pickle.loads(pickled_program).decode()
+    worker_evaluation.set_episode(episode)
+    worker_evaluation.set_action_repeat(action_repeat)
+    scores, result = worker_evaluation.evaluate_sequential(program)
+    return scores[0] if len(scores) > 0 else result
+
+def evaluate_in_worker(pickled_program, eval_config, action_repeat):
+    # The worker plays single games for evaluate_parallel, so its config is restored afterwards
+    old_eval_config = worker_evaluation.eval_config
+    worker_evaluation.set_config(eval_config)
+    worker_evaluation.set_action_repeat(action_repeat)
+    try:
+        return worker_evaluation.evaluate(pickle.loads(pickled_program).decode(), verbose=True)
+    finally:
+        worker_evaluation.set_config(old_eval_config)
+
+
 class Evaluation:
 
     MIN_SCORE = -1_000_000
     STRONG_SCORE = 1000
     RUN_LONGER_TOTAL_GAMES = 1000
+    DEFAULT_ACTION_REPEAT = 1
 
     def __init__(self, score_threshold, eval_config):
         self.score_threshold = score_threshold
         self.best = None
         self.eval_config = eval_config
+        self.lockstep_games = 1
+        self.pool = None
+        self.pool_workers = None
+        self.pool_size = None
+        self.cache = None
+        self.constant_cache = None
+        self.seed_schedule = None
+        self.episode = 0
+        self.action_repeat = 1
+
+    def __getstate__(self):
+        # The worker pool cannot be sent to other processes, and workers do not share the cache
+        state = self.__dict__.copy()
+        state['pool'] = None
+        state['cache'] = None
+        state['constant_cache'] = None
+        return state
 
     def set_total_games(self, new_total_games):
         return self.eval_config.set_total_games(new_total_games)
@@ -29,6 +89,102 @@ class Evaluation:
     def get_total_games(self):
         return self.eval_config.get_total_games()
 
+    def set_lockstep_games(self, lockstep_games):
+        old_value = self.lockstep_games
+        self.lockstep_games = lockstep_games
+        return old_value
+
+    def set_cache(self, cache):
+        old_cache = self.cache
+        self.cache = cache
+        return old_cache
+
+    def get_cache(self):
+        return self.cache
+
+    def set_seed_schedule(self, seed_schedule):
+        """
+        Sets the SeedSchedule giving the seeds of the games. With a schedule, every
+        evaluation plays the same games in the same order. Returns the previous one.
+        """
+        old_seed_schedule = self.seed_schedule
+        self.seed_schedule = seed_schedule
+        return old_seed_schedule
+
+    def get_seed_schedule(self):
+        return self.seed_schedule
+
+    def set_action_repeat(self, action_repeat):
+        """
+        Sets the number of frames for which the action taken by the program is
+        repeated before the program is interpreted again. Returns the previous one.
+        """
+        assert type(action_repeat) is int and action_repeat > 0, 'action_repeat must be a positive integer'
+        old_value = self.action_repeat
+        self.action_repeat = action_repeat
+        return old_value
+
+    def get_action_repeat(self):
+        return self.action_repeat
+
+    def get_default_action_repeat(self):
+        return self.DEFAULT_ACTION_REPEAT
+
+    def set_episode(self, episode):
+        # index in the seed schedule of the next game played
+        self.episode = episode
+
+    def get_seed_key(self):
+        """
+        Returns a value identifying the seeds of the games played by evaluate,
+        used by the evaluation cache. None means that the seeds are not fixed.
+        """
+        if self.seed_schedule is None:
+            return None
+        return self.seed_schedule.get_key()
+
+    def get_result_cache(self, program):
+        """
+        Returns the cache in which the result of program is stored, if any.
+        Programs that always take the same action behave the same way in every
+        game, so when the games are seeded by a SeedSchedule their results are
+        kept even if no cache was set. Without a schedule, each evaluation plays
+        games with new random seeds, so no result is reused.
+        """
+        if self.cache is not None:
+            return self.cache
+
+        if self.seed_schedule is not None and is_constant_program(program):
+            if self.constant_cache is None:
+                self.constant_cache = EvaluationCache(max_size=1000)
+            return self.constant_cache
+
+        return None
+
+    def get_known_result(self, program):
+        """
+        Returns the (scores, result) pair of program if it is known without
+        playing any game, and None otherwise. Programs that raise an error at
+        every tick would stop at the first tick with MIN_SCORE, and the results
+        of other programs may be cached.
+        """
+        if always_raises(program):
+            return tuple(), Evaluation.MIN_SCORE
+
+        return self.get_cached_result(program)
+
+    def get_cached_result(self, program):
+        cache = self.get_result_cache(program)
+        if cache is None:
+            return None
+        return cache.get(cache.get_key(program, self))
+
+    def cache_result(self, program, scores, result):
+        # evaluations stopped early by triage are not stored
+        cache = self.get_result_cache(program)
+        if cache is not None and len(scores) == self.get_total_games():
+            cache.put(cache.get_key(program, self), scores, result)
+
     def set_config(self, eval_config):
         self.eval_config = eval_config
     
@@ -45,8 +201,13 @@ class Evaluation:
         
         if best_eval == self.MIN_SCORE:
             self.eval_config.set_best_eval_variance(0)
+            self.eval_config.set_best_eval_range(0)
+            self.eval_config.set_best_scores(None)
         else:
-            self.eval_config.set_best_eval_variance(variance(scores))
+            stats = RunningStats(scores)
+            self.eval_config.set_best_eval_variance(stats.get_variance())
+            self.eval_config.set_best_eval_range(stats.get_range())
+            self.eval_config.set_best_scores(scores)
     
     def get_best(self):
         return self.best, self.eval_config.get_best_eval()
@@ -71,6 +232,9 @@ class Evaluation:
     
     def init_game(self):
         raise Exception('Must implement init_game method')
+
+    def evaluate_lockstep(self, program, verbose=False):
+        raise Exception('Must implement evaluate_lockstep method')
     
     def clean_up(self):
         self.eval_config.clean_up()
@@ -81,13 +245,66 @@ class Evaluation:
     def check_continue(self, current_program_score, games_played):
         return self.eval_config.check_continue(current_program_score, games_played)
 
+    def set_pool_workers(self, pool_workers):
+        """
+        Sets the number of worker processes of the pool used by evaluate_parallel.
+        By default, the pool uses every available CPU.
+        """
+        old_value = self.pool_workers
+        self.pool_workers = pool_workers
+        return old_value
+
+    def get_pool(self):
+        """
+        Returns the pool of worker processes used by evaluate_parallel. The pool is
+        created on first use and then kept alive until shutdown_pool is called, so
+        that process startup and the pygame import are paid only once per run.
+        """
+        if self.pool is None:
+            if self.pool_workers is None:
+                cpu_count = int(os.environ.get('SLURM_JOB_CPUS_PER_NODE', default=os.cpu_count()))
+            else:
+                cpu_count = self.pool_workers
+
+            single_game_attributes = form_basic_attr_dict(
+                                        False,
+                                        None,
+                                        None,
+                                        1,
+                                        Evaluation.MIN_SCORE,
+                                        Evaluation.MIN_SCORE,
+                                        None
+                                    )
+
+            evaluation = cp.copy(self)
+            evaluation.set_lockstep_games(1)
+            evaluation.change_config('NORMAL', single_game_attributes)
+
+            self.pool = ProcessPoolExecutor(cpu_count, initializer=init_worker, initargs=(evaluation,))
+            self.pool_size = cpu_count
+
+        return self.pool
+
+    def shutdown_pool(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
     def evaluate_parallel(self, program, verbose=False):
         """
         This method runs a game and uses the program parameter as the strategy 
         to determine which actions to take at each game step. It works just like 
         the evaluate() method, except it executes the games in parallel. This can 
         speed up the evaluation phase if total_games is larger (e.g 1000).
+
+        The games are played by the persistent pool returned by get_pool, and each
+        task only carries the pickled EncodedProgram of program.
         """
+        cached = self.get_known_result(program)
+        if cached is not None:
+            scores, result = cached
+            return (list(scores), result) if verbose else result
+
         old_total_games = self.eval_config.get_total_games()
 
         new_config_attributes = form_basic_attr_dict(
@@ -102,43 +319,166 @@ class Evaluation:
 
         old_eval_config = self.change_config('NORMAL', new_config_attributes)
 
-        cpu_count = int(os.environ.get('SLURM_JOB_CPUS_PER_NODE', default=os.cpu_count()))
+        pool = self.get_pool()
+        pickled_program = pickle.dumps(EncodedProgram.encode(program))
+        chunksize = max(1, old_total_games // (4 * self.pool_size))
 
         scores = []
-        with ProcessPoolExecutor(cpu_count) as executor:
-            evaluate_args_list = [program for _ in range(old_total_games)]
-            partial_evaluate = partial(self.evaluate, verbose=False)
-
-            for res in executor.map(partial_evaluate, evaluate_args_list):
-                scores.append(res)
+        evaluate_args_list = [pickled_program for _ in range(old_total_games)]
+        episodes = range(old_total_games)
+        for res in pool.map(play_game_in_worker, evaluate_args_list, episodes, repeat(self.action_repeat), chunksize=chunksize):
+            scores.append(res)
 
         self.set_total_games(old_total_games)
         result = self.compute_result(scores, old_total_games)
 
         self.set_config(old_eval_config)
+        self.cache_result(program, scores, result)
 
         if verbose:
             return scores, result
         else:
             return result
 
+    def submit_evaluation(self, program):
+        """
+        Submits the evaluation of program to the pool returned by get_pool and
+        returns a Future of the (scores, result) pair evaluate(program, verbose=True)
+        would return. The worker uses a copy of the current eval config, so the
+        triage baseline is the best score known at submission. The result must be
+        read with collect_evaluation.
+        """
+        cached = self.get_known_result(program)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        return self.get_pool().submit(
+                    evaluate_in_worker,
+                    pickle.dumps(EncodedProgram.encode(program)),
+                    self.eval_config,
+                    self.action_repeat
+                )
+
+    def collect_evaluation(self, program, future):
+        scores, result = future.result()
+        self.cache_result(program, scores, result)
+        return scores, result
+
+    def rescore(self, program, total_games=None):
+        """
+        Evaluates program on total_games games, by default the current number of
+        games, without triage and with an action repeat of 1, and returns the
+        scores and the result. Programs found with a larger action repeat are
+        rescored this way, since their actions are then decided at every frame.
+        """
+        if total_games is None:
+            total_games = self.get_total_games()
+
+        new_config_attributes = form_basic_attr_dict(
+                                    False,
+                                    None,
+                                    None,
+                                    total_games,
+                                    self.get_best()[1],
+                                    Evaluation.MIN_SCORE,
+                                    None
+                                )
+
+        old_eval_config = self.change_config('NORMAL', new_config_attributes)
+        old_action_repeat = self.set_action_repeat(1)
+        try:
+            return self.evaluate(program, verbose=True)
+        finally:
+            self.set_action_repeat(old_action_repeat)
+            self.set_config(old_eval_config)
+
+    def play_games(self, program, n_games, first_game=0):
+        """
+        Plays n_games games with program, without triage and without the cache,
+        and returns the list of their scores, or None if program raised an error.
+        first_game is the index of the first game in the seed schedule. It is used
+        by Racing to play the games of a program in several rounds.
+        """
+        if n_games <= 0:
+            return []
+
+        self.set_episode(first_game)
+
+        new_config_attributes = form_basic_attr_dict(
+                                    False,
+                                    None,
+                                    None,
+                                    n_games,
+                                    self.get_best()[1],
+                                    Evaluation.MIN_SCORE,
+                                    None
+                                )
+
+        old_eval_config = self.change_config('NORMAL', new_config_attributes)
+        try:
+            if self.lockstep_games > 1:
+                scores, _ = self.evaluate_lockstep(program, verbose=True)
+            else:
+                scores, _ = self.evaluate_sequential(program)
+        finally:
+            self.set_config(old_eval_config)
+
+        if len(scores) == 0:
+            return None
+        return list(scores)
+
     def evaluate(self, program, verbose=False):
         """
         The evaluate method runs a game and uses the program parameter as
         strategy to determine which actions to take at each game tick. It then
         returns the score of the program when the game is over or when an exception
         is raised due to an impossible action.
+
+        If the result of program is known, either because it raises an error at
+        every tick or because it is cached, the games are not played and the
+        known result is returned.
+        """
+        cached = self.get_known_result(program)
+        if cached is not None:
+            scores, result = cached
+            return (scores, result) if verbose else result
+
+        self.set_episode(0)
+        if self.lockstep_games > 1:
+            scores, result = self.evaluate_lockstep(program, verbose=True)
+        else:
+            scores, result = self.evaluate_sequential(program)
+
+        self.cache_result(program, scores, result)
+        if verbose:
+            return scores, result
+        else:
+            return result
+
+    def evaluate_sequential(self, program):
+        """
+        Plays the games of evaluate one after the other and returns the tuple of
+        scores and the result.
         """
         scores = []
         score = Evaluation.MIN_SCORE
         games_played = 0
         continue_eval = True
+
+        # Compile the program once so that each game tick costs a single call
+        try:
+            strategy = program.compile()
+        except Exception:
+            return tuple([]), Evaluation.MIN_SCORE
+
         while continue_eval:
             self.init_game()
             while not self.game_over():
                 try:
-                    score = self.play(program)
-                except:
+                    score = self.play(strategy)
+                except Exception:
                     self.clean_up()
                     return tuple([]), Evaluation.MIN_SCORE
 
@@ -149,10 +489,7 @@ class Evaluation:
             continue_eval = self.check_continue(result, games_played)
 
         self.clean_up()
-        if verbose:
-            return tuple(scores), result
-        else:
-            return result
+        return tuple(scores), result
 
     def is_correct(self, program):
         """
@@ -14,121 +14,321 @@ from pygame_games.ple.games.snake import Snake
 from pygame_games.ple.ple import PLE
 
 from src.Evaluation.evaluation_parent import *
+from src.Evaluation.game_pool import GamePool
+from src.dsl import GameEnv
 
 import time
 import random
 
 class EvaluationPle(Evaluation):
 
+    def __init__(self, score_threshold, eval_config):
+        super(EvaluationPle, self).__init__(score_threshold, eval_config)
+        self.game = None
+        self.p = None
+        self.game_pool = None
+        self.recorder = None
+        self.env = self.new_env()
+
+    def __getstate__(self):
+        # pygame objects cannot be sent to other processes
+        state = super(EvaluationPle, self).__getstate__()
+        state['game'] = None
+        state['p'] = None
+        state['game_pool'] = None
+        state['recorder'] = None
+        return state
+
     def get_score(self):
         return self.game.getScore()
 
     def game_over(self):
         return self.game.game_over()
 
-    def play(self, program):
-        env = self.update_env(self.p.getGameState(), self.p.getActionSet())
-        action = program.interpret(env)
-        self.p.act(action)
+    def play(self, strategy):
+        """
+        Plays one game tick. strategy is the compiled program returned by
+        Node.compile, so a single call decides the action for this tick. The
+        action is repeated for action_repeat frames, or until the game is over.
+        """
+        env = self.update_env(self.p.getGameState(), self.p.getActionSet(), self.env)
+        action = strategy(env)
+        self.act(self.game, self.p, action)
+        if self.recorder is not None:
+            self.recorder.record(env, action, self.p.score())
         return self.p.score()
 
+    def act(self, game, p, action):
+        for _ in range(self.action_repeat):
+            p.act(action)
+            if game.game_over():
+                break
+
+    def set_recorder(self, recorder):
+        """
+        Attaches a TraceRecorder that records every tick played by play, i.e. the
+        frames at which the program is interpreted. Games played by evaluate_lockstep
+        are not recorded. Returns the previous recorder.
+        """
+        old_recorder = self.recorder
+        self.recorder = recorder
+        return old_recorder
+
+    def new_env(self):
+        """
+        Returns the GameEnv updated in place by update_env at every tick.
+        Sub-classes preallocate the lists their game state is copied into.
+        """
+        return GameEnv()
+
+    def sample_envs(self, n_states, stride=5, seed=0):
+        """
+        Plays games with uniformly random actions and returns copies of the env
+        at every stride-th tick until n_states of them are collected. The
+        bottom-up synthesizers compare expressions on these game states.
+        """
+        rng = random.Random(seed)
+        envs = []
+        ticks = 0
+        self.init_game()
+        while len(envs) < n_states:
+            if self.game_over():
+                self.init_game()
+
+            action_set = self.p.getActionSet()
+            if ticks % stride == 0:
+                envs.append(self.update_env(self.p.getGameState(), action_set, self.new_env()).to_dict())
+
+            self.p.act(rng.choice(action_set))
+            ticks += 1
+
+        self.clean_up()
+        return envs
+
+    def get_game_pool(self):
+        if self.game_pool is None:
+            self.game_pool = GamePool(self.make_game, self.new_seed)
+        return self.game_pool
+
+    def init_game(self):
+        # The game of the previous episode is reset and reused
+        self.release_game()
+        self.game, self.p = self.get_game_pool().acquire()
+        if self.recorder is not None:
+            self.recorder.start_episode()
+
+    def release_game(self):
+        if self.game is not None:
+            self.get_game_pool().release(self.game, self.p)
+            self.game = None
+            self.p = None
+
+    def make_game(self, seed):
+        raise Exception('Must implement make_game method')
+
+    def new_seed(self):
+        if self.seed_schedule is not None:
+            seed = self.seed_schedule.get_seed(self.episode)
+            self.episode += 1
+            return seed
+
+        return self.random_seed()
+
+    def random_seed(self):
+        return int(time.time())
+
+    def evaluate_lockstep(self, program, verbose=False):
+        """
+        Works like evaluate(), except that it keeps lockstep_games games alive and
+        steps them together, calling the compiled program once per game at every
+        tick. Finished games are passed on to the evaluation config in the order
+        they were started, so the i-th score is the score of the game played with
+        the i-th seed, as evaluate_sequential gives it, and triage can still stop
+        the evaluation early. A game that finishes before a game started earlier
+        waits for it. Each finished game is replaced by a new game while more are
+        needed.
+
+        Deciding the actions of all the games with one call to interpret_batch
+        was measured slower: stacking the envs of the games costs about 53 us per
+        tick for 8 games, against 1.6 us for the compiled calls, and the gap
+        remains with 256 games.
+
+        All games share the pygame display surface, which only affects rendering.
+        """
+        scores = []
+        result = Evaluation.MIN_SCORE
+        games_played = 0
+        games_started = 0
+        total_games = self.get_total_games()
+
+        game_pool = self.get_game_pool()
+        # (game, p, index) triples, where index is the order in which the game was started
+        running = []
+        finished_scores = {}
+        continue_eval = True
+        try:
+            strategy = program.compile()
+            while continue_eval:
+                while len(running) < self.lockstep_games and games_started < total_games:
+                    game, p = game_pool.acquire()
+                    running.append((game, p, games_started))
+                    games_started += 1
+
+                if len(running) == 0:
+                    break
+
+                still_running = []
+                for game, p, index in running:
+                    env = self.update_env(p.getGameState(), p.getActionSet(), self.env)
+                    self.act(game, p, strategy(env))
+                    if game.game_over():
+                        finished_scores[index] = p.score()
+                        game_pool.release(game, p)
+                    else:
+                        still_running.append((game, p, index))
+
+                running = still_running
+                while continue_eval and games_played in finished_scores:
+                    scores.append(finished_scores.pop(games_played))
+                    games_played += 1
+
+                    result = self.compute_result(scores, games_played)
+                    continue_eval = self.check_continue(result, games_played)
+        except Exception:
+            # The games that finished during the failed tick were already released
+            for game, p, _ in running:
+                if not game.game_over():
+                    game_pool.release(game, p)
+            self.clean_up()
+            return tuple([]), Evaluation.MIN_SCORE
+
+        for game, p, _ in running:
+            game_pool.release(game, p)
+        self.clean_up()
+        if verbose:
+            return tuple(scores), result
+        else:
+            return result
+
     def clean_up(self):
-        self.game = None
-        self.p = None
+        self.release_game()
         super(EvaluationPle, self).clean_up()
 
 
 class EvaluationCatcher(EvaluationPle):
 
-    def update_env(self, game_state, action_set):
+    # The fruit falls slowly compared to the paddle
+    DEFAULT_ACTION_REPEAT = 3
+
+    def update_env(self, game_state, action_set, env=None):
         """
         This method updates the env variable based on the game_state and
         the action set values.
         """
-        env = {}
-        env['state'] = {}
-        env['state']['non_player_position'] = game_state.get('fruit_x')
-        env['state']['non_player_approaching'] = True
-        
-        env['state']['player_position'] = game_state.get('player_x')
-        env['paddle_width'] = game_state.get('paddle_width')
-        env['actions'] = action_set
+        if env is None:
+            env = self.env
+
+        env.non_player_position = game_state.get('fruit_x')
+        env.non_player_approaching = True
+
+        env.player_position = game_state.get('player_x')
+        env.paddle_width = game_state.get('paddle_width')
+        env.actions = action_set
         return env
 
-    def init_game(self):
-        self.game = Catcher(width=500, height=500, init_lives=3)
-        self.p = PLE(self.game, fps=30, display_screen=False, rng=int(time.time()))
+    def make_game(self, seed):
+        game = Catcher(width=500, height=500, init_lives=3)
+        return game, PLE(game, fps=30, display_screen=False, rng=seed)
 
 
 class EvaluationPong(EvaluationPle):
 
-    def update_env(self, game_state, action_set):
-        env = {}
-        env['state'] = {}
-        env['state']['non_player_approaching'] = game_state['ball_velocity_x'] < 0
-        env['state']['non_player_position'] = game_state['ball_y']
-        env['state']['player_position'] = game_state['player_y']
+    DEFAULT_ACTION_REPEAT = 2
+
+    def update_env(self, game_state, action_set, env=None):
+        if env is None:
+            env = self.env
 
-        env['paddle_width'] = game_state.get('paddle_width')
-        env['actions'] = action_set
+        env.non_player_approaching = game_state['ball_velocity_x'] < 0
+        env.non_player_position = game_state['ball_y']
+        env.player_position = game_state['player_y']
+
+        env.paddle_width = game_state.get('paddle_width')
+        env.actions = action_set
         return env
 
-    def init_game(self):
-        self.game = Pong(width=500, height=500, MAX_SCORE=20)
-        self.p = PLE(self.game, fps=30, display_screen=True, rng=int(time.time()))
+    def make_game(self, seed):
+        game = Pong(width=500, height=500, MAX_SCORE=20)
+        return game, PLE(game, fps=30, display_screen=True, rng=seed)
 
 
 class EvaluationFlappyBird(EvaluationPle):
 
     STRONG_SCORE = 55
 
-    def update_env(self, game_state, action_set):
+    def new_env(self):
+        env = GameEnv()
+        env.non_player_position = [None, None]
+        return env
+
+    def update_env(self, game_state, action_set, env=None):
         """
         This method updates the env variable based on the game_state and
         the action set values.
         """
-        env = {}
-        env['state'] = {}
-        env['state']['non_player_approaching'] = True
-        env['state']['non_player_dist_to_player'] = game_state.get('next_pipe_dist_to_player')
-        env['state']['non_player_position'] = []
-        env['state']['non_player_position'].append(game_state.get('next_pipe_top_y'))
-        env['state']['non_player_position'].append(game_state.get('next_pipe_bottom_y'))
-
-        env['state']['player_position'] = game_state.get('player_y')
-        env['state']['player_velocity'] = game_state.get('player_vel')
-        env['paddle_width'] = game_state.get('paddle_width')
-        env['actions'] = action_set
+        if env is None:
+            env = self.env
+
+        env.non_player_approaching = True
+        env.non_player_dist_to_player = game_state.get('next_pipe_dist_to_player')
+        env.non_player_position[0] = game_state.get('next_pipe_top_y')
+        env.non_player_position[1] = game_state.get('next_pipe_bottom_y')
+
+        env.player_position = game_state.get('player_y')
+        env.player_velocity = game_state.get('player_vel')
+        env.paddle_width = game_state.get('paddle_width')
+        env.actions = action_set
 
         return env
 
-    def init_game(self):
-        self.game = FlappyBird()
-        self.p = PLE(self.game, fps=30, display_screen=False, rng=random.choice([2, 3, 5, 7, 11, 91]))
+    def make_game(self, seed):
+        game = FlappyBird()
+        return game, PLE(game, fps=30, display_screen=False, rng=seed)
+
+    def random_seed(self):
+        return random.choice([2, 3, 5, 7, 11, 91])
 
 
 class EvaluationSnake(EvaluationPle):
 
-    def update_env(self, game_state, action_set):
-        env = {}
-        env['state'] = {}
-        env['state']['non_player_approaching'] = True
-        env['state']['non_player_position'] = []
-        env['state']['non_player_position'].append(game_state.get('food_x'))
-        env['state']['non_player_position'].append(game_state.get('food_y'))
-        
-        env['state']['player_position'] = []
-        env['state']['player_position'].append(game_state.get('snake_head_x'))
-        env['state']['player_position'].append(game_state.get('snake_head_y'))
-        
-        env['state']['player_direction'] = []
-        env['state']['player_direction'].append(game_state.get('snake_dir').x)
-        env['state']['player_direction'].append(game_state.get('snake_dir').y)
-
-        env['paddle_width'] = game_state.get('paddle_width')
-        env['body_dist_list'] = game_state['snake_body']
-        env['actions'] = action_set
+    def new_env(self):
+        env = GameEnv()
+        env.non_player_position = [None, None]
+        env.player_position = [None, None]
+        env.player_direction = [None, None]
+        return env
 
-    def init_game(self):
-        self.game = Snake()
-        self.p = PLE(self.game, fps=30, display_screen=False, rng=int(time.time()))
\ No newline at end of file
+    def update_env(self, game_state, action_set, env=None):
+        if env is None:
+            env = self.env
+
+        env.non_player_approaching = True
+        env.non_player_position[0] = game_state.get('food_x')
+        env.non_player_position[1] = game_state.get('food_y')
+
+        env.player_position[0] = game_state.get('snake_head_x')
+        env.player_position[1] = game_state.get('snake_head_y')
+
+        snake_dir = game_state.get('snake_dir')
+        env.player_direction[0] = snake_dir.x
+        env.player_direction[1] = snake_dir.y
+
+        env.paddle_width = game_state.get('paddle_width')
+        env.body_dist_list = game_state['snake_body']
+        env.actions = action_set
+
+        return env
+
+    def make_game(self, seed):
+        game = Snake()
+        return game, PLE(game, fps=30, display_screen=False, rng=seed)
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+game_pool.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file implements the GamePool class. Building a game and its PLE wrapper
+creates pygame surfaces and sprites, which is expensive compared to playing an
+episode. A GamePool keeps the game instances that are not in use and resets them
+with a fresh seed when they are needed again, so an evaluation object only builds
+as many games as it plays at the same time.
+"""
+
+class GamePool:
+
+    def __init__(self, make_game, new_seed):
+        """
+        make_game(seed) returns a new (game, PLE) pair, and new_seed() returns the
+        seed of the next episode.
+        """
+        self.make_game = make_game
+        self.new_seed = new_seed
+        self.free_games = []
+
+    def acquire(self):
+        if len(self.free_games) == 0:
+            return self.make_game(self.new_seed())
+
+        game, p = self.free_games.pop()
+        self.reset(game, p, self.new_seed())
+        return game, p
+
+    def reset(self, game, p, seed):
+        # PLE hands its random state to the game, so both are reseeded at once
+        game.rng.seed(seed)
+        p.reset_game()
+
+    def release(self, game, p):
+        self.free_games.append((game, p))
+
+    def get_free_count(self):
+        return len(self.free_games)
@@ -0,0 +1,91 @@
+"""
+racing.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file implements the Racing class, which evaluates a batch of programs with
+successive halving instead of playing total_games games with each of them.
+Triage only compares one program against the best program found so far; racing
+compares the programs of the batch against each other.
+
+The games are handed out in rounds. In every round, each remaining program
+plays until it has played its share of the games of the round, and only the
+best 1/eta of the programs are kept for the next round. The number of games
+per program grows by a factor of eta every round, and the programs of the last
+round play all total_games games. Most of the games are therefore played by the
+promising programs, and the programs dropped early only play a few games.
+"""
+from math import ceil, log
+
+class Racing:
+
+    def __init__(self, evaluation, eta=2):
+        """
+        - evaluation: Evaluation object used to play the games. Its eval config
+                      gives the number of games and computes the results.
+        - eta: only the best 1/eta of the programs are kept after each round
+        """
+        assert eta > 1, 'eta must be greater than 1'
+        self.evaluation = evaluation
+        self.eta = eta
+
+    def get_schedule(self, n_programs):
+        """
+        Returns the number of games each remaining program has played at the end
+        of every round. The last round plays all the games.
+        """
+        total_games = self.evaluation.get_total_games()
+        rounds = 1
+        if n_programs > 1:
+            rounds += ceil(log(n_programs, self.eta) - 1e-9)
+
+        schedule = []
+        for r in range(rounds):
+            games = max(1, ceil(total_games / (self.eta ** (rounds - 1 - r))))
+            if len(schedule) == 0 or games > schedule[-1]:
+                schedule.append(games)
+
+        return schedule
+
+    def race(self, programs):
+        """
+        Races the programs and returns one (scores, result) pair per program, in
+        the order of programs. The programs that reached the last round played all
+        the games, and their results are cached by the evaluation object. The
+        results of the other programs are computed from the games they played.
+        Programs whose result is already known are not played.
+        """
+        evaluation = self.evaluation
+        results = [None] * len(programs)
+        scores = {}
+        for i, program in enumerate(programs):
+            known = evaluation.get_known_result(program)
+            if known is not None:
+                results[i] = known
+            else:
+                scores[i] = []
+
+        remaining = list(scores.keys())
+        schedule = self.get_schedule(len(remaining))
+        for r, games in enumerate(schedule):
+            for i in remaining:
+                # The games of the program continue where its previous round stopped
+                new_scores = evaluation.play_games(programs[i], games - len(scores[i]), len(scores[i]))
+
+                # The program raised an error, so it is out of the race
+                if new_scores is None:
+                    results[i] = (tuple(), evaluation.MIN_SCORE)
+                else:
+                    scores[i].extend(new_scores)
+                    results[i] = (tuple(scores[i]), evaluation.compute_result(scores[i], len(scores[i])))
+
+            remaining = [i for i in remaining if len(results[i][0]) > 0]
+            if r < len(schedule) - 1:
+                remaining.sort(key=lambda i: results[i][1], reverse=True)
+                remaining = remaining[:ceil(len(remaining) / self.eta)]
+
+        for i in remaining:
+            evaluation.cache_result(programs[i], *results[i])
+
+        return results
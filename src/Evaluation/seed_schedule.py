@@ -0,0 +1,43 @@
+"""
+seed_schedule.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file implements the SeedSchedule class, which gives the seeds of the games
+played by an evaluation object. Without a schedule, every game is seeded with the
+current time, so games started within the same second share a seed and different
+programs are evaluated on unrelated games. With a schedule, the i-th game played
+by every program uses the i-th seed of the schedule (common random numbers): two
+programs are compared on the same games, and the differences of their scores vary
+much less than the scores themselves. The EvaluationConfigPaired triage relies on
+this to stop bad programs after fewer games.
+"""
+import random
+
+class SeedSchedule:
+
+    MAX_SEED = 2 ** 31 - 1
+
+    def __init__(self, base_seed=0):
+        self.base_seed = base_seed
+        self.rng = random.Random(base_seed)
+        self.seeds = []
+
+    def get_seed(self, episode):
+        """
+        Returns the seed of the game of index episode. The seeds are drawn the
+        first time they are needed, and then always returned in the same order.
+        """
+        while len(self.seeds) <= episode:
+            self.seeds.append(self.rng.randint(0, self.MAX_SEED))
+
+        return self.seeds[episode]
+
+    def get_seeds(self, n_episodes):
+        self.get_seed(n_episodes - 1)
+        return self.seeds[:n_episodes]
+
+    def get_key(self):
+        # Used by the evaluation cache: games seeded by equal schedules are the same
+        return ('SeedSchedule', self.base_seed)
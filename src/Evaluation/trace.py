@@ -0,0 +1,230 @@
+"""
+trace.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file implements the TraceRecorder and TraceCorpus classes. A TraceRecorder
+is attached to an EvaluationPle object and records the env, the action taken and
+the score at every tick played by EvaluationPle.play. The recorded ticks form a
+TraceCorpus, which can be saved to and loaded from a .npz file.
+
+A TraceCorpus replays a program on all the recorded game states at once with
+Node.interpret_batch, or with one call of the compiled program per game state
+when batch mode is not supported, without stepping pygame, and scores how often
+the program agrees with the recorded actions. This is much cheaper than evaluate and can be
+used to filter out candidates before evaluating them.
+"""
+from src.dsl import Node, GameEnv
+import numpy as np
+
+class TraceRecorder:
+
+    def __init__(self):
+        self.envs = []
+        self.actions = []
+        self.scores = []
+        self.episodes = []
+        self.episode = -1
+
+    def start_episode(self):
+        self.episode += 1
+
+    def record(self, env, action, score):
+        """
+        Records one tick. env is the GameEnv given to the program, action is the
+        action returned by the program and score is the score after the action.
+        """
+        if self.episode < 0:
+            self.start_episode()
+
+        self.envs.append(env.to_dict())
+        self.actions.append(action)
+        self.scores.append(score)
+        self.episodes.append(self.episode)
+
+    def get_tick_count(self):
+        return len(self.envs)
+
+    def record_games(self, evaluation, program, n_games):
+        """
+        Plays n_games games of the evaluation object with program as the
+        strategy and records every tick.
+        """
+        old_recorder = evaluation.set_recorder(self)
+        strategy = program.compile()
+        try:
+            for _ in range(n_games):
+                evaluation.init_game()
+                while not evaluation.game_over():
+                    evaluation.play(strategy)
+        finally:
+            evaluation.set_recorder(old_recorder)
+            evaluation.clean_up()
+
+    def get_corpus(self):
+        if self.get_tick_count() == 0:
+            raise Exception('No tick was recorded')
+
+        actions = np.empty(len(self.actions), dtype=object)
+        actions[:] = self.actions
+        return TraceCorpus(
+                    Node.batch_env(self.envs),
+                    actions,
+                    np.asarray(self.scores, dtype=float),
+                    np.asarray(self.episodes, dtype=int)
+                )
+
+    def save(self, path):
+        self.get_corpus().save(path)
+
+
+class TraceCorpus:
+
+    STATE_PREFIX = 'state_'
+    ENV_PREFIX = 'env_'
+    SHARED_PREFIX = 'shared_'
+
+    def __init__(self, env, actions, scores, episodes):
+        """
+        env is the batch env built by Node.batch_env from the recorded envs, and
+        actions, scores and episodes hold one value per recorded tick.
+        """
+        self.env = env
+        self.actions = actions
+        self.scores = scores
+        self.episodes = episodes
+
+    def get_tick_count(self):
+        return len(self.actions)
+
+    def get_episode_count(self):
+        return len(np.unique(self.episodes))
+
+    def save(self, path):
+        arrays = {}
+        arrays['recorded_actions'] = self.actions
+        arrays['scores'] = self.scores
+        arrays['episodes'] = self.episodes
+
+        n_ticks = self.get_tick_count()
+        for key, value in self.env.items():
+            if key == 'state':
+                for field in value.dtype.names:
+                    arrays[TraceCorpus.STATE_PREFIX + field] = value[field]
+            elif isinstance(value, np.ndarray) and value.ndim > 0 and len(value) == n_ticks:
+                arrays[TraceCorpus.ENV_PREFIX + key] = value
+            else:
+                # values shared by all ticks, such as the action set
+                shared = np.empty(1, dtype=object)
+                shared[0] = value
+                arrays[TraceCorpus.SHARED_PREFIX + key] = shared
+
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a corpus saved by save. Some values (e.g. the action set) are
+        stored as Python objects, so only corpora from trusted sources should
+        be loaded.
+        """
+        with np.load(path, allow_pickle=True) as data:
+            n_ticks = len(data['recorded_actions'])
+            state_columns = {}
+            env = {}
+            for key in data.files:
+                if key.startswith(TraceCorpus.STATE_PREFIX):
+                    state_columns[key[len(TraceCorpus.STATE_PREFIX):]] = data[key]
+                elif key.startswith(TraceCorpus.ENV_PREFIX):
+                    env[key[len(TraceCorpus.ENV_PREFIX):]] = data[key]
+                elif key.startswith(TraceCorpus.SHARED_PREFIX):
+                    env[key[len(TraceCorpus.SHARED_PREFIX):]] = data[key][0]
+
+            dtype = [(field, column.dtype, column.shape[1:]) for field, column in state_columns.items()]
+            env['state'] = np.empty(n_ticks, dtype=dtype)
+            for field, column in state_columns.items():
+                env['state'][field] = column
+
+            return cls(env, data['recorded_actions'], data['scores'], data['episodes'])
+
+    def get_rewards(self):
+        """
+        Returns the reward of each tick, i.e. the change of score it caused
+        within its episode.
+        """
+        rewards = np.diff(self.scores, prepend=0.0)
+        episode_starts = np.diff(self.episodes, prepend=-1) != 0
+        rewards[episode_starts] = self.scores[episode_starts]
+        return rewards
+
+    def get_envs(self):
+        """
+        Returns the recorded game states as a list of envs in the format given
+        to Node.interpret, e.g. for ObservationalEquivalence.
+        """
+        n_ticks = self.get_tick_count()
+        envs = []
+        for i in range(n_ticks):
+            env = {}
+            env['state'] = {field: self.env['state'][field][i].tolist() for field in self.env['state'].dtype.names}
+            for key, value in self.env.items():
+                if key == 'state':
+                    continue
+
+                if isinstance(value, np.ndarray) and value.ndim > 0 and len(value) == n_ticks:
+                    value = value[i]
+                    if isinstance(value, np.generic):
+                        value = value.item()
+                env[key] = value
+            envs.append(env)
+
+        return envs
+
+    def replay(self, program):
+        """
+        Returns the actions program takes on every recorded game state, or None
+        if interpreting program raises an exception, in which case evaluate
+        would also fail. Programs that cannot be interpreted in batch mode, e.g.
+        a ForEach over body_dist_list, whose length differs between ticks, are
+        compiled and called once per recorded game state instead.
+        """
+        try:
+            return program.interpret_batch(self.env)
+        except Exception:
+            pass
+
+        try:
+            strategy = program.compile()
+            actions = np.empty(self.get_tick_count(), dtype=object)
+            actions[:] = [strategy(GameEnv.from_dict(env)) for env in self.get_envs()]
+            return actions
+        except Exception:
+            return None
+
+    def agrees_with(self, program):
+        actions = self.replay(program)
+        if actions is None:
+            return None
+        return np.asarray(actions == self.actions, dtype=bool)
+
+    def agreement(self, program):
+        """
+        Returns the fraction of the recorded ticks on which program takes the
+        recorded action.
+        """
+        agrees = self.agrees_with(program)
+        if agrees is None:
+            return 0.0
+        return float(np.mean(agrees))
+
+    def proxy_reward(self, program):
+        """
+        Returns the average reward per episode collected on the ticks where
+        program takes the recorded action. It is a cheap estimate of the score of
+        program when the corpus was recorded with a strong strategy.
+        """
+        agrees = self.agrees_with(program)
+        if agrees is None:
+            return 0.0
+        return float(np.sum(self.get_rewards()[agrees])) / self.get_episode_count()
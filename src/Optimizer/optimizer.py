@@ -34,6 +34,7 @@ class Optimizer:
         i = 1
         queue = []
         queue.append(self.ast)
+        self.const_nodes = []
         while len(queue) > 0:
             node = queue.pop(0)
             if isinstance(node, VarFromArray) or isinstance(node, VarScalar):
@@ -42,6 +43,7 @@ class Optimizer:
             if isinstance(node, Constant):
                 node_name = 'Const' + str(i)
                 i += 1
+                self.const_nodes.append(node)
                 original_values[node_name] = node.get_children()[0]
                 interval = (0.001, 100.001)
                 pbounds[node_name] = interval
@@ -53,6 +55,15 @@ class Optimizer:
 
         return pbounds, original_values
 
+    def get_ast_key(self):
+        """
+        Returns the key of self.ast in the tables of scores. Only the values of
+        the constants found by get_const_range change during the optimization,
+        so they identify the program without building its get_key tuple.
+        """
+        values = [node.get_children()[0] for node in self.const_nodes]
+        return tuple((type(value).__name__, value) for value in values)
+
     def set_const_value(self, values):
         queue = []
         i = 1
@@ -73,13 +84,16 @@ class Optimizer:
                 if isinstance(node, Node):
                     for child in node.get_children():
                         queue.append(child)
+
+        # the constants are replaced in place, so the hashes of their ancestors are refreshed
+        self.ast.check_correct_size()
         return
 
     def evaluation_fun(self, **kwargs):
         const_nodes = np.fromiter(kwargs.values(), dtype=float)
         self.set_const_value(const_nodes.tolist())
         scores, target = self.eval_funct.evaluate(self.ast, verbose=True)
-        self.all_scores[self.ast.to_string()] = scores
+        self.all_scores[self.get_ast_key()] = scores
 
         return target
 
@@ -98,7 +112,7 @@ class Optimizer:
         current_eval = self.initial_score
         current_params = self.original_values
         all_scores = {}
-        all_scores[self.ast.to_string()] = self.initial_scores
+        all_scores[self.get_ast_key()] = self.initial_scores
 
         is_optimized = False
 
@@ -113,7 +127,7 @@ class Optimizer:
             bayesOpt.register(params=next_point, target=target)
             num_iterations += 1
 
-            all_scores[self.ast.to_string()] = scores
+            all_scores[self.get_ast_key()] = scores
 
             current_eval, current_params = bayesOpt.max['target'], bayesOpt.max['params']
 
@@ -130,7 +144,7 @@ class Optimizer:
             is_optimized = True
 
         self.set_const_value(current_params)
-        return self.ast, current_params, current_eval, all_scores[self.ast.to_string()], is_optimized
+        return self.ast, current_params, current_eval, all_scores[self.get_ast_key()], is_optimized
 
     def non_triage_optimize(self):
         bayesOpt = BayesianOptimization(
@@ -141,7 +155,7 @@ class Optimizer:
 
         is_optimized = False
         self.all_scores = {}
-        self.all_scores[self.ast.to_string()] = self.initial_scores
+        self.all_scores[self.get_ast_key()] = self.initial_scores
 
         bayesOpt.maximize(init_points=20, n_iter=self.iterations, kappa=self.kappa)
         target, params = bayesOpt.max['target'], bayesOpt.max['params']
@@ -150,7 +164,7 @@ class Optimizer:
             is_optimized = True
 
         self.set_const_value(params)
-        return self.ast, params, target, self.all_scores[self.ast.to_string()], is_optimized
+        return self.ast, params, target, self.all_scores[self.get_ast_key()], is_optimized
 
     def optimize(self, ast, initial_ast_score, initial_ast_scores):
         self.ast = ast
@@ -11,6 +11,7 @@ algorithm.
 from math import floor, log10
 from src.dsl import *
 from src.PROBE.rule import *
+from src.Utils.obs_equivalence import ObservationalEquivalence
 import itertools
 import time
 import multiprocessing as mp
@@ -77,11 +78,14 @@ class Plist:
 
 class Probe:
 
+    # number of game states on which expressions are compared to prune the bank
+    SAMPLE_SIZE = 50
+
     def select(self, partial_solutions, best_score):
         select_partial_solutions = []
         for p in partial_solutions:
 
-            if self.eval[p.to_string()] > self.beta * (best_score + 1):
+            if self.eval[NodeKey(p)] > self.beta * (best_score + 1):
                 select_partial_solutions.append(p)
 
         return select_partial_solutions
@@ -92,7 +96,7 @@ class Probe:
             fit = []
             for p in partial_solutions:
                 if rule.used_in(p):
-                    fit_value = (best_score + 1 - self.eval[p.to_string()]) / ((1 - self.beta) * (best_score + 1))
+                    fit_value = (best_score + 1 - self.eval[NodeKey(p)]) / ((1 - self.beta) * (best_score + 1))
                     fit.append(fit_value)
 
             if len(fit) > 0:
@@ -122,6 +126,7 @@ class Probe:
         self.eval_funct = eval_funct
         self.cost_limit = 8
         self.beta = 0.55
+        self.equivalence = ObservationalEquivalence(eval_funct.sample_envs(Probe.SAMPLE_SIZE))
         
         while time.time() - start < time_limit:
             best_program, best_program_cost, best_score, partial_solutions = self.guided_search()
@@ -150,6 +155,8 @@ class Probe:
     def guided_search(self):
         cost = 1
         self.plist = Plist(pcfg=self.pcfg)
+        self.equivalence.reset()
+        self.equivalence.add_bank(self.plist)
         current_best = None
         current_best_cost = -1
         current_best_score = -1_000_000
@@ -165,11 +172,16 @@ class Probe:
                 pstring = p.to_string()
                 print(pstring)
 
-                if self.eval.get(pstring) is not None:
+                key = NodeKey(p)
+                if self.eval.get(key) is not None:
+                    continue
+
+                # an equivalent expression is already in the bank
+                if not self.equivalence.is_new(p):
                     continue
                 
                 self.plist.insert(p, cost)
-                self.eval[pstring] = None
+                self.eval[key] = None
 
                 if isinstance(p, (IT, ITE, Strategy, ReturnAction)):
                     # Decide if evaluation step should done in parallel
@@ -181,7 +193,7 @@ class Probe:
                                 for p, res in zip(ppool_keys, pool.map(self.eval_funct.evaluate, ppool_keys, chunksize=5)):
                                     pcost = ppool[p]
                                     evaluated_pool[p] = (res, pcost)
-                                    self.eval[p.to_string()] = res
+                                    self.eval[NodeKey(p)] = res
                             
                             ppool = {}
 
@@ -191,10 +203,10 @@ class Probe:
                     else:
                         pscore = self.eval_funct.evaluate(p)
                         evaluated_pool[p] = (pscore, cost)
-                        self.eval[pstring] = pscore
+                        self.eval[key] = pscore
                 else:
                     evaluated_pool[p] = (-1_000_000, cost)
-                    self.eval[pstring] = -1_000_000
+                    self.eval[key] = -1_000_000
 
                 for p, p_attributes in evaluated_pool.items():
                     pscore, pcost = p_attributes
@@ -0,0 +1,193 @@
+"""
+parallel_sim_anneal.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This file contains the implementation of an island model of the simulated
+annealing algorithm. Several annealing chains, each starting at a different
+temperature between the initial and final temperatures, run in parallel in a
+pool of processes. The chains run for a fixed amount of time between exchanges.
+At every exchange, the best program found by all the chains is broadcast to
+every chain, which keeps its own closed list. The broadcast program becomes the
+best program of every chain and the triage baseline of its evaluation object.
+With option 2, the chains anneal from it; with option 1, they still restart
+from random programs, which have to beat it.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from time import time
+import os
+
+from src.SA.sim_anneal import *
+import src.dsl as dsl
+
+def get_grammar_state():
+    """
+    Returns the valid children types of every node class. They are set at class
+    level from the dsl config of the game, so they are sent to the workers, which
+    may not inherit them from the parent process.
+    """
+    grammar_state = {}
+    for name, cls in vars(dsl).items():
+        if isinstance(cls, type) and issubclass(cls, dsl.Node):
+            grammar_state[name] = cls.valid_children_types
+    return grammar_state
+
+# Evaluation object of a worker process of the pool running the chains
+chain_evaluation = None
+
+def init_chain_worker(grammar_state, eval_funct, pool_workers):
+    """
+    Runs once in each worker of the pool running the chains. The worker keeps one
+    evaluation object for all the chains it runs, so the pool used by its
+    run_longer_eval and its cache are kept from one exchange interval to the next.
+    The pool is shut down when the worker exits.
+    """
+    global chain_evaluation
+    for name, valid_children_types in grammar_state.items():
+        getattr(dsl, name).valid_children_types = valid_children_types
+
+    chain_evaluation = eval_funct
+    chain_evaluation.set_pool_workers(pool_workers)
+
+    # An exiting worker waits for its child processes after running its finalizers,
+    # so the pool is shut down by a finalizer. It runs before the finalizers of the
+    # queues of the pool, which would stop them from telling its workers to exit.
+    Finalize(None, shutdown_chain_worker, exitpriority=100)
+
+def shutdown_chain_worker():
+    chain_evaluation.shutdown_pool()
+
+def run_chain(sa, time_limit, current_t, final_t, option, verbose_opt, initial_best, closed_list):
+    """
+    Runs one chain in a worker process until time_limit is reached and returns
+    the best program of the chain, its score and scores, and its closed list.
+    """
+    sa.time_limit = time_limit
+    best, best_eval = sa.synthesize(
+                        current_t,
+                        final_t,
+                        chain_evaluation,
+                        None,
+                        option=option,
+                        verbose_opt=verbose_opt,
+                        initial_best=initial_best,
+                        closed_list=closed_list
+                    )
+
+    return best, best_eval, sa.best_scores, sa.closed_list
+
+
+class ParallelSimulatedAnnealing:
+
+    def __init__(self, time_limit, logger, chains, exchange_interval):
+        """
+        - chains: list of SimulatedAnnealing objects, one per chain, each with its
+                  own logger
+        - exchange_interval: number of seconds the chains run between exchanges
+        """
+        self.time_limit = time_limit
+        self.logger = logger
+        self.chains = chains
+        self.exchange_interval = exchange_interval
+
+    def get_temperatures(self, current_t, final_t):
+        """
+        Returns the initial temperatures of the chains, spaced geometrically from
+        current_t down to final_t. The coldest chain starts one step above final_t,
+        so every chain anneals whatever the number of chains.
+        """
+        n_chains = len(self.chains)
+        return [current_t * (final_t / current_t) ** (i / n_chains) for i in range(n_chains)]
+
+    def synthesize(
+            self,
+            current_t,
+            final_t,
+            eval_funct,
+            plot_filename,
+            option=1,
+            verbose_opt=False,
+            generate_plot=False,
+            save_data=False
+        ):
+        """
+        Runs the chains until the time limit is reached. The arguments are the
+        same as those of SimulatedAnnealing.synthesize, but the scores of the
+        chains are not collected, so plots and data files are not generated.
+        """
+        start = time()
+        n_chains = len(self.chains)
+        temperatures = self.get_temperatures(current_t, final_t)
+        self.closed_lists = [{} for _ in range(n_chains)]
+
+        # The CPUs are shared by the chains and the pools they use in run_longer_eval
+        cpu_count = int(os.environ.get('SLURM_JOB_CPUS_PER_NODE', default=os.cpu_count()))
+        pool_workers = max(1, cpu_count // n_chains)
+
+        best = None
+        best_eval = Evaluation.MIN_SCORE
+        best_scores = None
+        exchanges = 0
+
+        initargs = (get_grammar_state(), eval_funct, pool_workers)
+        with ProcessPoolExecutor(n_chains, initializer=init_chain_worker, initargs=initargs) as executor:
+            while time() - start < self.time_limit:
+                interval = min(self.exchange_interval, self.time_limit - (time() - start))
+
+                if best is None:
+                    initial_best = None
+                else:
+                    initial_best = (best, best_eval, best_scores)
+
+                futures = []
+                for i, sa in enumerate(self.chains):
+                    futures.append(executor.submit(
+                        run_chain,
+                        sa,
+                        interval,
+                        temperatures[i],
+                        final_t,
+                        option,
+                        verbose_opt,
+                        initial_best,
+                        self.closed_lists[i]
+                    ))
+
+                best_updated = False
+                for i, future in enumerate(futures):
+                    chain_best, chain_best_eval, chain_best_scores, self.closed_lists[i] = future.result()
+
+                    if chain_best is not None and (best is None or chain_best_eval > best_eval):
+                        best, best_eval, best_scores = chain_best, chain_best_eval, chain_best_scores
+                        best_chain = i
+                        best_updated = True
+
+                exchanges += 1
+                timestamp = round((time() - start) / 60, 2)
+                if best_updated:
+                    pdescr = {
+                            'header': f'New Best Program (Chain #{best_chain})',
+                            'psize': best.get_size(),
+                            'score': best_eval,
+                            'timestamp': timestamp
+                        }
+                    self.logger.log_program(best.to_string(), pdescr)
+                    self.logger.log('Scores: ' + str(best_scores).strip('()'), end='\n\n')
+
+        self.logger.log('Running Time: ' + str(round(time() - start, 2)) + 'seconds')
+        self.logger.log('Chains: ' + str(n_chains) + '\tExchanges: ' + str(exchanges), end='\n\n')
+
+        if best is not None:
+            eval_funct.set_best(best, best_eval, best_scores)
+
+            pdescr = {
+                    'header': 'Best Program Found By Parallel SA',
+                    'psize': best.get_size(),
+                    'score': best_eval,
+                    'timestamp': round((time() - start) / 60, 2)
+                }
+            self.logger.log_program(best.to_string(), pdescr)
+
+        return best, best_eval
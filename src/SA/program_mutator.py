@@ -8,128 +8,125 @@ This file contains the implementation of the ProgramGenerator class, whose
 responsibility is to generate and/or mutate programs.
 """
 from src.dsl import *
+from src.Utils.compiled_grammar import CompiledGrammar
+from src.Utils.simplifier import canonical_key
 import random
 
 class ProgramMutator:
 
-    def __init__(self, initial_depth, max_depth, max_size):
+    def __init__(self, initial_depth, max_depth, max_size, node_weights=None, grammar=None):
+        """
+        - grammar: CompiledGrammar of the game, built by DslConfig.compile_grammar
+        - node_weights: optional dict mapping node class names (e.g. 'Constant'
+                        or 'GreaterThan') to the weight of their positions when
+                        choosing the node to mutate. Unlisted kinds weigh 1.
+        """
         self.initial_depth = initial_depth
         self.max_depth = max_depth
         self.max_size = max_size
+        self.node_weights = node_weights
+        self.grammar = grammar
+
+    def get_grammar(self):
+        """
+        Returns the compiled grammar used to generate programs. If none was given,
+        it is compiled from the valid children types set on the node classes the
+        first time it is needed.
+        """
+        if self.grammar is None:
+            self.grammar = CompiledGrammar()
+        return self.grammar
 
     def generate_random(self, closed_list):
+        grammar = self.get_grammar()
         while True:
-            initial_nodes = Node.get_valid_children_types()[0]
-            random_p = Node.instance(random.choice(list(initial_nodes)))
+            random_p = grammar.random_child(Node, 0)
             self.complete_program(random_p, self.initial_depth, self.max_depth, self.max_size)
-            random_p.check_correct_size()
 
-            if closed_list.get(random_p.to_string()) is None:
+            if closed_list.get(canonical_key(random_p)) is None:
                 return random_p
 
     def complete_program(self, p, depth, max_depth, max_size):
         if not isinstance(p, Node):
             return
 
+        grammar = self.get_grammar()
+        p_class = type(p)
         for i in range(p.get_max_number_children()):
-            valid_ith_child_types = p.get_valid_children_types()[i]
 
             if isinstance(p, ReturnAction):
-                action_index = random.choice(list(valid_ith_child_types))
-                child = VarFromArray.new('actions', action_index)
+                child = VarFromArray.new('actions', grammar.random_child(p_class, i))
                 p.add_child(child)
 
             # if p is a scalar or constant, no need to call complete_program on child
-            elif isinstance(p, VarScalar) or isinstance(p, VarFromArray) or \
-                isinstance(p, Constant) or isinstance(p, VarArray):
-                child = random.choice(list(valid_ith_child_types))
-                p.add_child(child)
+            elif grammar.is_value_parent(p_class):
+                p.add_child(grammar.random_child(p_class, i))
 
             # if max depth is exceeded, get a terminal node
             elif depth >= max_depth or p.get_size() >= max_size:
-                child = self.get_terminal_node(p, valid_ith_child_types)
+                child = grammar.random_terminal(p_class, i)
                 p.add_child(child)
                 self.complete_program(child, depth+1, max_depth, max_size)
 
             # else choose a random child node
             else:
-                child = Node.instance(random.choice(list(valid_ith_child_types)))
+                child = grammar.random_child(p_class, i)
                 p.add_child(child)
                 self.complete_program(child, depth+1, max_depth, max_size)
 
-    def get_terminal_node(self, p, valid_ith_child_types):
-        terminal_nodes = []
-
-        for child_type in valid_ith_child_types:
-            if child_type is None or type(child_type) is int:
-                terminal_nodes.append(child_type)
-                continue
-
-            child = Node.instance(child_type)
-            if child_type in [VarFromArray.className(), VarArray.className(), VarScalar.className(), Constant.className()] \
-                or child.get_max_number_children() == 0:
-                terminal_nodes.append(child)
-
-        if terminal_nodes == 0:
-            for child_type in valid_ith_child_types:
-                child = Node.instance(child_type)
-
-                if child.get_max_children_number() == 1:
-                    terminal_nodes.append(child)
-
-        if len(terminal_nodes) > 0:
-            return random.choice(terminal_nodes)
-
-        return Node.instance(random.choice(list(valid_ith_child_types)))
-
-    def mutate_inner_nodes(self, p, index):
-        self.processed_nodes += 1
-
-        if not isinstance(p, Node):
-            return False
-
-        for i in range(p.get_max_number_children()):
-
-            if index == self.processed_nodes:
-                valid_ith_child_types = p.get_valid_children_types()[i]
-                
-                child = Node.instance(random.choice(list(valid_ith_child_types)))
-                if isinstance(p, ReturnAction):
-                    child = VarFromArray.new('actions', child)
-
-                elif isinstance(child, Node):
-                    self.complete_program(child, self.initial_depth, self.max_depth, self.max_size-p.get_size())
-                p.replace_child(child, i)
-
-                return True
-
-            if self.mutate_inner_nodes(p.get_children()[i], index):
-                return True
-
-        return False
+    def select_position(self, p):
+        """
+        Returns the index in the preorder index of p of the position to mutate,
+        0 being the root. Positions are chosen uniformly, unless node_weights was
+        given, in which case the weight of a position is the weight of its kind.
+        """
+        preorder_index = p.get_preorder_index()
+        if self.node_weights is None:
+            return random.randrange(len(preorder_index))
+
+        weights = [self.node_weights.get(kind, 1) for _, kind in preorder_index]
+        return random.choices(range(len(preorder_index)), weights=weights)[0]
+
+    def mutate_inner_nodes(self, p, k):
+        """
+        Returns a mutation of p in which the node at the k-th position of the
+        preorder index of p is replaced by a random subtree. p is left untouched:
+        only the nodes on the path to the replaced node are copied and the rest
+        of the AST is shared with p.
+        """
+        preorder_index = p.get_preorder_index()
+        path = preorder_index[k][0]
+        i = path[-1]
+        mutated_p, parent = p.copy_path(path[:-1])
+
+        child = self.get_grammar().random_child(type(parent), i)
+        if isinstance(parent, ReturnAction):
+            child = VarFromArray.new('actions', child)
+
+        elif isinstance(child, Node):
+            # the new subtree starts at the depth of the node it replaces
+            self.complete_program(child, self.initial_depth + len(path), self.max_depth, self.max_size-parent.get_size())
+        parent.replace_child(child, i)
+
+        mutated_p.splice_preorder_index(preorder_index, k, child)
+        return mutated_p
 
     def mutate(self, p, closed_list):
+        """
+        Returns a mutation of p that is not in closed_list. p is not modified and
+        shares the subtrees that were not mutated with the returned AST.
+        """
         while True:
-            # print('p.get_size()', p.get_size())
-            index = random.randint(0, p.get_size())
-            # print('index', index)
-            # print()
+            k = self.select_position(p)
 
             # root will be mutated
-            if index == 0:
-                ptypes = Node.get_valid_children_types()[0]
-                p = Node.instance(random.choice(list(ptypes)))
+            if k == 0:
+                p = self.get_grammar().random_child(Node, 0)
                 self.complete_program(p, self.initial_depth, self.max_depth, self.max_size)
-                p.check_correct_size()
 
-                # Check for duplicates
-                if closed_list.get(p.to_string()) is None:
-                    return p
-
-            self.processed_nodes = 0
-            self.mutate_inner_nodes(p, index)
-            p.check_correct_size()
+            else:
+                p = self.mutate_inner_nodes(p, k)
 
             # Check for duplicates
-            if closed_list.get(p.to_string()) is None:
+            if closed_list.get(canonical_key(p)) is None:
                 return p
\ No newline at end of file
@@ -10,22 +10,28 @@ algorithm.
 """
 import copy as cp
 from time import time
+from concurrent.futures import wait, as_completed, FIRST_COMPLETED
+from collections import ChainMap
 import random
 import multiprocessing as mp
 from math import exp
 
 from src.dsl import *
 from src.Evaluation.evaluation import *
+from src.Evaluation.racing import Racing
 from src.Optimizer.optimizer import *
 from src.Optimizer.start_optimizer import *
 from src.SA.plotter import *
+from src.Utils.simplifier import canonical_key
 from statistics import *
 
 class SimulatedAnnealing:
 
-    def __init__(self, time_limit, logger, optimizer, program_mutator):
+    def __init__(self, time_limit, logger, optimizer, program_mutator, batch_size=1, race_size=1):
         self.time_limit = time_limit
         self.logger = logger
+        self.batch_size = batch_size     # number of candidates evaluated at the same time
+        self.race_size = race_size       # number of candidates raced against each other
         if optimizer is None:
             self.run_optimizer = False
         else:
@@ -64,6 +70,7 @@ class SimulatedAnnealing:
         self.alpha = 0.9
         self.beta = 100
         self.ppool = []     # for storing solutions to be optimized
+        self.best_scores = None
 
         if self.run_optimizer:
             if self.optimizer.get_parallel():
@@ -91,7 +98,9 @@ class SimulatedAnnealing:
             option=1, 
             verbose_opt=False, 
             generate_plot=False,
-            save_data=False
+            save_data=False,
+            initial_best=None,
+            closed_list=None
         ):
         """
         This method implements the simulated annealing algorithm that can be used
@@ -104,6 +113,10 @@ class SimulatedAnnealing:
                 -- Option 1: Does not generate a random program each time simulated annealing
                              finishes to run. More likely to get stuck on a local min/max.
                 -- Option 2: Generates a random program after each simulated annealing run.
+            - initial_best: optional (program, eval, scores) triple used as the initial best
+                            program, e.g. the best program broadcast to the chains of
+                            ParallelSimulatedAnnealing
+            - closed_list: optional closed list of a previous call to continue from
 
         """
         self.start = time()
@@ -111,15 +124,27 @@ class SimulatedAnnealing:
 
         initial_t = current_t
         iterations = 0
-        self.closed_list = {}
+        if closed_list is None:
+            closed_list = {}
+        self.closed_list = closed_list
+
+        if initial_best is not None:
+            best, best_eval, self.best_scores = initial_best
+            self.closed_list[canonical_key(best)] = (best_eval, self.get_timestamp())
+
+            eval_funct.set_best(best, best_eval, self.best_scores)
+
+            if self.run_optimizer:
+                self.optimizer.set_baseline_eval(best_eval)
 
         # Option 2: Generate random program only once
-        if option == 2:
+        elif option == 2:
             best = self.program_mutator.generate_random(self.closed_list)
             timestamp = self.get_timestamp()
             scores, best_eval = eval_funct.evaluate(best, verbose=True)
-            self.closed_list[best.to_string()] = (best_eval, timestamp)
+            self.closed_list[canonical_key(best)] = (best_eval, timestamp)
 
+            self.best_scores = scores
             eval_funct.set_best(best, best_eval, scores)    # update best score in eval object
 
             # Set baseline for optimizer
@@ -147,13 +172,13 @@ class SimulatedAnnealing:
             if option == 1:
                 current = self.program_mutator.generate_random(self.closed_list)
                 scores, current_eval = eval_funct.evaluate(current, verbose=True)
-                self.closed_list[current.to_string()] = (current_eval, timestamp)   # save to closed_list
+                self.closed_list[canonical_key(current)] = (current_eval, timestamp)   # save to closed_list
 
                 if best is not None:
                     new_best, current_eval, scores = self.check_new_best(current, current_eval, scores, best_eval, eval_funct)
 
                 if best is None or new_best:
-                    best, best_eval = current, current_eval
+                    best, best_eval, self.best_scores = current, current_eval, scores
                     eval_funct.set_best(best, best_eval, scores)        # update best score in eval object
 
                     # Set baseline for optimizer
@@ -167,6 +192,7 @@ class SimulatedAnnealing:
             elif option == 2 and best is not None:
                 current = best
                 current_eval = best_eval
+                scores = self.best_scores
 
             if verbose_opt or iterations == 0:
                 # Log initial program to file
@@ -207,7 +233,7 @@ class SimulatedAnnealing:
                 'header': 'Best Program Found By SA',
                 'psize': best.get_size(), 
                 'score': best_eval,
-                'timestamp': self.closed_list[best.to_string()][1]
+                'timestamp': self.closed_list[canonical_key(best)][1]
             }
         self.logger.log_program(best.to_string(), pdescr)
 
@@ -271,7 +297,11 @@ class SimulatedAnnealing:
                                 )
 
         original_eval_config = eval_funct.change_config("NORMAL", new_config_attributes)
+
+        # Strong programs are scored with an action decided at every frame
+        old_action_repeat = eval_funct.set_action_repeat(1)
         scores, program_eval = eval_funct.evaluate_parallel(program, verbose=True)
+        eval_funct.set_action_repeat(old_action_repeat)
         eval_funct.set_config(original_eval_config)
 
         return scores, program_eval
@@ -288,84 +318,324 @@ class SimulatedAnnealing:
             eval_funct,
             verbose_opt,
         ):
+        if self.race_size > 1:
+            return self.simulated_annealing_race(
+                        current_t,
+                        final_t,
+                        current,
+                        best,
+                        current_eval,
+                        best_eval,
+                        iterations,
+                        eval_funct,
+                        verbose_opt
+                    )
+
+        if self.batch_size > 1:
+            return self.simulated_annealing_batch(
+                        current_t,
+                        final_t,
+                        current,
+                        best,
+                        current_eval,
+                        best_eval,
+                        iterations,
+                        eval_funct,
+                        verbose_opt
+                    )
+
         epoch = 0
         mutations = 0
         while current_t > final_t:
-            best_updated = False
-            header = 'Mutated Program'
             timestamp = self.get_timestamp()
 
             # Mutate current program
-            candidate = self.program_mutator.mutate(cp.deepcopy(current), self.closed_list)
+            candidate = self.program_mutator.mutate(current, self.closed_list)
             mutations += 1
 
             # Evaluate the mutated program
             scores, candidate_eval = eval_funct.evaluate(candidate, verbose=True)
 
-            # Run optimizer if flag was specified
-            if self.run_optimizer:
-                self.ppool.append((candidate, candidate_eval, scores))
-                # print('self.ppool_len', len(self.ppool))
-
-                if len(self.ppool) >= self.ppool_max_size:
-                    unoptimized_candidate_eval = candidate_eval
-                    candidate, candidate_eval, scores, is_optimized = start_optimizer(
-                        self.optimizer,
-                        self.ppool,
-                        self.logger,
-                        self.get_timestamp,
-                        verbose=verbose_opt
-                    )
-
-                    if is_optimized:
-                        timestamp = self.get_timestamp()
-                        self.unoptimized_pscore_dict[iterations + epoch] = (unoptimized_candidate_eval, timestamp)
-                        self.optimized_pscore_dict[iterations + epoch] = (candidate_eval, timestamp)
-
-                    self.ppool = []
+            candidate, candidate_eval, best, best_eval, _ = self.process_candidate(
+                                                                candidate,
+                                                                candidate_eval,
+                                                                scores,
+                                                                best,
+                                                                best_eval,
+                                                                iterations + epoch,
+                                                                timestamp,
+                                                                mutations,
+                                                                eval_funct,
+                                                                verbose_opt
+                                                            )
 
-            new_best, candidate_eval, scores = self.check_new_best(candidate, candidate_eval, scores, best_eval, eval_funct)
+            j_diff = candidate_eval - current_eval
             
-            if new_best:
-                header = 'New Best Program'
-                best_updated = True
-                best, best_eval = candidate, candidate_eval
-
-                # Set the best program and its score in eval_funct
-                # Since triage is used, the best score in eval_funct must be updated
-                eval_funct.set_best(best, best_eval, scores)
-
-                # Update the baseline score of the optimizer
-                if self.run_optimizer:
-                    self.optimizer.set_baseline_eval(best_eval)
-                
-                self.best_pscore_dict[iterations + epoch] = (best_eval, timestamp)
+            # Decide whether to accept the candidate program
+            if j_diff > 0 or self.is_accept(j_diff, current_t):
+                current, current_eval = candidate, candidate_eval
+            
+            current_t = self.reduce_temp(current_t, epoch)
+            epoch += 1
 
-            # If candidate program does not raise an error, store scores
-            if candidate_eval != Evaluation.MIN_SCORE:  
-                self.scores_dict[iterations + epoch] = (candidate_eval, timestamp)
+        return best, best_eval, epoch+1
 
-            self.closed_list[candidate.to_string()] = (candidate_eval, timestamp)
+    def simulated_annealing_batch(
+            self,
+            current_t,
+            final_t,
+            current,
+            best,
+            current_eval,
+            best_eval,
+            iterations,
+            eval_funct,
+            verbose_opt,
+        ):
+        """
+        Works like simulated_annealing, except that batch_size mutations of current
+        are evaluated at the same time by the pool of eval_funct. Results are
+        processed as soon as they arrive. Only candidates mutated from the current
+        program go through the acceptance test; the results of the others can still
+        update the best program. Candidates whose evaluation has not started yet are
+        dropped when the current program changes, and resubmitted with the new
+        triage baseline when the best program changes. Evaluations that already
+        started cannot be cancelled, so a candidate is never submitted while an
+        equivalent one is still in flight, and the results of these evaluations
+        are still processed when the temperature reaches final_t.
+        """
+        epoch = 0
+        mutations = 0
+        generation = 0      # incremented every time the current program changes
+        in_flight = {}
+        try:
+            while current_t > final_t:
+                # Candidates in flight are not in the closed list yet
+                in_flight_keys = {canonical_key(candidate): True for candidate, _, _ in in_flight.values()}
+                seen = ChainMap(in_flight_keys, self.closed_list)
+                while len(in_flight) < self.batch_size:
+                    candidate = self.program_mutator.mutate(current, seen)
+                    in_flight_keys[canonical_key(candidate)] = True
+                    mutations += 1
+                    future = eval_funct.submit_evaluation(candidate)
+                    in_flight[future] = (candidate, generation, self.get_timestamp())
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                # Every completed result is processed, even if the temperature
+                # reaches final_t before the last one
+                for future in done:
+                    candidate, candidate_generation, timestamp = in_flight.pop(future)
+                    scores, candidate_eval = eval_funct.collect_evaluation(candidate, future)
+
+                    candidate, candidate_eval, best, best_eval, best_updated = self.process_candidate(
+                                                                                    candidate,
+                                                                                    candidate_eval,
+                                                                                    scores,
+                                                                                    best,
+                                                                                    best_eval,
+                                                                                    iterations + epoch,
+                                                                                    timestamp,
+                                                                                    mutations,
+                                                                                    eval_funct,
+                                                                                    verbose_opt
+                                                                                )
+
+                    # Pending evaluations were submitted with the old triage baseline
+                    if best_updated:
+                        self.resubmit_pending(in_flight, eval_funct)
+
+                    if current_t <= final_t:
+                        continue
+
+                    if candidate_generation == generation:
+                        j_diff = candidate_eval - current_eval
+
+                        # Decide whether to accept the candidate program
+                        if j_diff > 0 or self.is_accept(j_diff, current_t):
+                            current, current_eval = candidate, candidate_eval
+                            generation += 1
+                            self.cancel_pending(in_flight)
+
+                    current_t = self.reduce_temp(current_t, epoch)
+                    epoch += 1
+
+            # The evaluations that already started keep the workers busy anyway,
+            # so their results are collected and can still update the best program
+            self.cancel_pending(in_flight)
+            for future in as_completed(list(in_flight)):
+                candidate, _, timestamp = in_flight.pop(future)
+                scores, candidate_eval = eval_funct.collect_evaluation(candidate, future)
+                _, _, best, best_eval, _ = self.process_candidate(
+                                                candidate,
+                                                candidate_eval,
+                                                scores,
+                                                best,
+                                                best_eval,
+                                                iterations + epoch,
+                                                timestamp,
+                                                mutations,
+                                                eval_funct,
+                                                verbose_opt
+                                            )
+        finally:
+            self.cancel_pending(in_flight)
+
+        return best, best_eval, epoch+1
+
+    def simulated_annealing_race(
+            self,
+            current_t,
+            final_t,
+            current,
+            best,
+            current_eval,
+            best_eval,
+            iterations,
+            eval_funct,
+            verbose_opt,
+        ):
+        """
+        Works like simulated_annealing, except that race_size mutations of current
+        are raced against each other (see racing.py) at every epoch. Only the winner
+        of the race, which played all the games, goes through the acceptance test
+        and can become the best program. The other candidates are only added to the
+        closed list, with the result of the games they played.
+        """
+        racing = Racing(eval_funct)
+        epoch = 0
+        mutations = 0
+        while current_t > final_t:
+            timestamp = self.get_timestamp()
 
-            # Log program to file
-            if best_updated or verbose_opt:
-                pdescr = {
-                        'header': header, 
-                        'psize': candidate.get_size(), 
-                        'score': candidate_eval,
-                        'timestamp': timestamp
-                    }
-                self.logger.log_program(candidate.to_string(), pdescr)
-                self.logger.log('Scores: ' + str(scores).strip('()'))
-                self.logger.log('Mutations: ' + str(mutations), end='\n\n')
+            # Mutate current program
+            candidates = []
+            for _ in range(self.race_size):
+                candidates.append(self.program_mutator.mutate(current, self.closed_list))
+                mutations += 1
+
+            results = racing.race(candidates)
+            winner = max(range(len(candidates)), key=lambda i: results[i][1])
+            for i, candidate in enumerate(candidates):
+                if i != winner:
+                    self.closed_list[canonical_key(candidate)] = (results[i][1], timestamp)
+
+            scores, candidate_eval = results[winner]
+            candidate, candidate_eval, best, best_eval, _ = self.process_candidate(
+                                                                candidates[winner],
+                                                                candidate_eval,
+                                                                scores,
+                                                                best,
+                                                                best_eval,
+                                                                iterations + epoch,
+                                                                timestamp,
+                                                                mutations,
+                                                                eval_funct,
+                                                                verbose_opt
+                                                            )
 
             j_diff = candidate_eval - current_eval
-            
+
             # Decide whether to accept the candidate program
             if j_diff > 0 or self.is_accept(j_diff, current_t):
                 current, current_eval = candidate, candidate_eval
-            
+
             current_t = self.reduce_temp(current_t, epoch)
             epoch += 1
 
-        return best, best_eval, epoch+1
\ No newline at end of file
+        return best, best_eval, epoch+1
+
+    def cancel_pending(self, in_flight):
+        for future in list(in_flight.keys()):
+            if future.cancel():
+                del in_flight[future]
+
+    def resubmit_pending(self, in_flight, eval_funct):
+        for future, (candidate, candidate_generation, timestamp) in list(in_flight.items()):
+            if future.cancel():
+                del in_flight[future]
+                new_future = eval_funct.submit_evaluation(candidate)
+                in_flight[new_future] = (candidate, candidate_generation, timestamp)
+
+    def process_candidate(
+            self,
+            candidate,
+            candidate_eval,
+            scores,
+            best,
+            best_eval,
+            iteration,
+            timestamp,
+            mutations,
+            eval_funct,
+            verbose_opt
+        ):
+        """
+        Runs the optimizer on the evaluated candidate if required, updates the best
+        program, the closed list and the data used for plots, and logs the candidate.
+        Returns the candidate and its score, which change if it was optimized, the
+        best program and its score, and whether the best program was updated.
+        """
+        best_updated = False
+        header = 'Mutated Program'
+
+        # Run optimizer if flag was specified
+        if self.run_optimizer:
+            # The optimizer replaces constants in place, so it gets a copy that
+            # does not share subtrees with the current and best programs
+            self.ppool.append((cp.deepcopy(candidate), candidate_eval, scores))
+            # print('self.ppool_len', len(self.ppool))
+
+            if len(self.ppool) >= self.ppool_max_size:
+                unoptimized_candidate_eval = candidate_eval
+                candidate, candidate_eval, scores, is_optimized = start_optimizer(
+                    self.optimizer,
+                    self.ppool,
+                    self.logger,
+                    self.get_timestamp,
+                    verbose=verbose_opt
+                )
+
+                if is_optimized:
+                    timestamp = self.get_timestamp()
+                    self.unoptimized_pscore_dict[iteration] = (unoptimized_candidate_eval, timestamp)
+                    self.optimized_pscore_dict[iteration] = (candidate_eval, timestamp)
+
+                self.ppool = []
+
+        new_best, candidate_eval, scores = self.check_new_best(candidate, candidate_eval, scores, best_eval, eval_funct)
+        
+        if new_best:
+            header = 'New Best Program'
+            best_updated = True
+            best, best_eval, self.best_scores = candidate, candidate_eval, scores
+
+            # Set the best program and its score in eval_funct
+            # Since triage is used, the best score in eval_funct must be updated
+            eval_funct.set_best(best, best_eval, scores)
+
+            # Update the baseline score of the optimizer
+            if self.run_optimizer:
+                self.optimizer.set_baseline_eval(best_eval)
+            
+            self.best_pscore_dict[iteration] = (best_eval, timestamp)
+
+        # If candidate program does not raise an error, store scores
+        if candidate_eval != Evaluation.MIN_SCORE:  
+            self.scores_dict[iteration] = (candidate_eval, timestamp)
+
+        self.closed_list[canonical_key(candidate)] = (candidate_eval, timestamp)
+
+        # Log program to file
+        if best_updated or verbose_opt:
+            pdescr = {
+                    'header': header, 
+                    'psize': candidate.get_size(), 
+                    'score': candidate_eval,
+                    'timestamp': timestamp
+                }
+            self.logger.log_program(candidate.to_string(), pdescr)
+            self.logger.log('Scores: ' + str(scores).strip('()'))
+            self.logger.log('Mutations: ' + str(mutations), end='\n\n')
+
+        return candidate, candidate_eval, best, best_eval, best_updated
@@ -11,9 +11,11 @@ the synthesis process, and calls the synthesizer with the desired arguments.
 
 """
 from src.SA.sim_anneal import *
+from src.SA.parallel_sim_anneal import *
 from src.SA.program_mutator import *
 from src.SA.plotter import *
 from src.Evaluation.evaluation import *
+from src.Evaluation.seed_schedule import SeedSchedule
 from src.Evaluation.EvaluationConfig.evaluation_config import *
 from src.Utils.logger import *
 from src.Utils.dsl_config import *
@@ -33,6 +35,19 @@ def init_var_child_types(grammar):
         Constant.valid_children_types = [set(grammar['constants'])]
 
 
+def log_rescored_best(logger, eval_funct, best):
+    """
+    The best program of a search with an action repeat larger than 1 is rescored
+    with an action decided at every frame, and its score is logged.
+    """
+    if best is None or eval_funct.get_action_repeat() == 1:
+        return
+
+    scores, best_eval = eval_funct.rescore(best)
+    logger.log('Score Of Best Program With Action Repeat 1: ' + str(best_eval))
+    logger.log('Scores: ' + str(scores).strip('()'), end='\n\n')
+
+
 def start_sa(
         time_limit, 
         log_file, 
@@ -47,7 +62,17 @@ def start_sa(
         plot_filename, 
         ibr, 
         total_games, 
-        multi_runs
+        multi_runs,
+        lockstep_games=1,
+        use_cache=False,
+        cache_filepath=None,
+        chains=1,
+        exchange_interval=60,
+        sa_batch_size=1,
+        sa_race_size=1,
+        node_weights=None,
+        seed=None,
+        action_repeat=1
     ):
 
     if ibr:
@@ -64,7 +89,7 @@ def start_sa(
         {**run_optimizer, **{'time': time_limit}}
     )
 
-    program_mutator = ProgramMutator(0, 4, 50)
+    program_mutator = ProgramMutator(0, 4, 50, node_weights=node_weights, grammar=dsl_config.compile_grammar())
    
     triage, random_var_bound, confidence_value = triage_eval
     config_factory = EvaluationConfigFactory()
@@ -85,6 +110,23 @@ def start_sa(
     )
 
     eval_funct = eval_factory.get_eval_fun(game)
+    eval_funct.set_lockstep_games(lockstep_games)
+
+    # The cache is shared by all runs, and a cache file warm-starts the search
+    if use_cache or cache_filepath is not None:
+        eval_funct.set_cache(EvaluationCache(filepath=cache_filepath))
+
+    # The paired triage compares programs on the same games
+    if seed is None and eval_config_name == 'PAIRED':
+        seed = 0
+
+    if seed is not None:
+        eval_funct.set_seed_schedule(SeedSchedule(seed))
+
+    # None stands for the default action repeat of the game
+    if action_repeat is None:
+        action_repeat = eval_funct.get_default_action_repeat()
+    eval_funct.set_action_repeat(action_repeat)
 
     is_triage_optimizer = run_optimizer['triage']
     n_iter = run_optimizer['iterations']
@@ -103,7 +145,20 @@ def start_sa(
     else:
         optimizer = None
 
-    sa = SimulatedAnnealing(time_limit, logger, optimizer, program_mutator)
+    if chains > 1:
+        # Each chain logs the programs it finds to its own file
+        chain_sas = []
+        for chain in range(chains):
+            chain_logger = Logger(
+                log_file + '_chain' + str(chain),
+                'Simulated Annealing',
+                {**run_optimizer, **{'time': time_limit}}
+            )
+            chain_sas.append(SimulatedAnnealing(time_limit, chain_logger, optimizer, program_mutator, sa_batch_size, sa_race_size))
+
+        sa = ParallelSimulatedAnnealing(time_limit, logger, chain_sas, exchange_interval)
+    else:
+        sa = SimulatedAnnealing(time_limit, logger, optimizer, program_mutator, sa_batch_size, sa_race_size)
     
     if multi_runs[0]:
         plotter = Plotter()
@@ -111,7 +166,7 @@ def start_sa(
         for run in range(total_runs):
             n_plot_filename = 'run' + str(run) + '_' + plot_filename
             print(f'Starting run #{run}')
-            sa.synthesize(
+            best, _ = sa.synthesize(
                 2000, 
                 1, 
                 eval_funct,
@@ -121,6 +176,7 @@ def start_sa(
                 generate_plot=plot,
                 save_data=save
             )
+            log_rescored_best(logger, eval_funct, best)
             print(f'Finishing run #{run}\n')
 
             data_filenames = plotter.construct_dat_filenames(n_plot_filename)
@@ -128,7 +184,7 @@ def start_sa(
             dump(config_name, data_filenames['best_scores'])
     
     else:
-        sa.synthesize(
+        best, _ = sa.synthesize(
             2000, 
             1, 
             eval_funct,
@@ -137,4 +193,13 @@ def start_sa(
             verbose_opt=verbose, 
             generate_plot=plot,
             save_data=save
-        )
\ No newline at end of file
+        )
+        log_rescored_best(logger, eval_funct, best)
+
+    eval_funct.shutdown_pool()
+
+    eval_cache = eval_funct.get_cache()
+    if eval_cache is not None:
+        logger.log('Evaluation Cache Hit Rate: ' + str(eval_cache.get_hit_rate()), end='\n\n')
+        if cache_filepath is not None:
+            eval_cache.save(cache_filepath)
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+compiled_grammar.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements the CompiledGrammar class, built by DslConfig from the
+valid children types set on the node classes of the dsl. For every node class
+and child slot, it stores the choices of children as a tuple, in which node
+types are already resolved to their classes, and the subset of those choices
+that are terminals. The arity of every node class is computed once. The
+ProgramMutator can then generate and mutate programs with table lookups
+instead of converting sets to lists, looking up class names in globals() and
+instantiating every candidate child to find the terminals.
+"""
+import random
+import src.dsl as dsl
+
+class CompiledGrammar:
+
+    # The children of these nodes are values, e.g. the name of a scalar
+    value_parents = (dsl.VarScalar, dsl.VarFromArray, dsl.Constant, dsl.VarArray)
+
+    def __init__(self):
+        self.node_classes = [dsl.Node]
+        for cls in vars(dsl).values():
+            if isinstance(cls, type) and issubclass(cls, dsl.Node) and cls is not dsl.Node:
+                self.node_classes.append(cls)
+
+        self.arity = {}
+        for cls in self.node_classes:
+            self.arity[cls] = cls().get_max_number_children()
+
+        self.choices = {}
+        self.terminals = {}
+        for cls in self.node_classes:
+            self.choices[cls] = []
+            self.terminals[cls] = []
+
+            if cls.valid_children_types == 'empty':
+                continue
+
+            for valid_ith_child_types in cls.valid_children_types:
+                choices = tuple(self.resolve(child_type) for child_type in valid_ith_child_types)
+                terminals = tuple(choice for choice in choices if self.is_terminal(choice))
+
+                self.choices[cls].append(choices)
+                self.terminals[cls].append(terminals)
+
+    @staticmethod
+    def resolve(child_type):
+        """
+        Returns the node class named child_type, or child_type itself if it is a
+        value (e.g. None, an action index or the name of a scalar).
+        """
+        if isinstance(child_type, str) and child_type in vars(dsl):
+            cls = vars(dsl)[child_type]
+            if isinstance(cls, type) and issubclass(cls, dsl.Node):
+                return cls
+
+        return child_type
+
+    def is_terminal(self, choice):
+        if not isinstance(choice, type):
+            return True
+
+        return choice in self.value_parents or self.arity[choice] == 0
+
+    @staticmethod
+    def make(choice):
+        if isinstance(choice, type):
+            return choice()
+        return choice
+
+    def random_child(self, cls, i):
+        """
+        Returns a new random child for the ith slot of a node of class cls.
+        """
+        return CompiledGrammar.make(random.choice(self.choices[cls][i]))
+
+    def random_terminal(self, cls, i):
+        """
+        Returns a new random terminal child for the ith slot of a node of class
+        cls, or any random child if the slot accepts no terminal.
+        """
+        terminals = self.terminals[cls][i]
+        if len(terminals) > 0:
+            return CompiledGrammar.make(random.choice(terminals))
+
+        return self.random_child(cls, i)
+
+    def is_value_parent(self, cls):
+        return cls in self.value_parents
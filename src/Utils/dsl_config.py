@@ -11,6 +11,7 @@ import json
 import os
 import random
 from src.dsl import *
+from src.Utils.compiled_grammar import CompiledGrammar
 
 class DslConfig:
 
@@ -105,4 +106,12 @@ class DslConfig:
                                                         node,
                                                         game_specific_children_types,
                                                         valid_children_types
-                                                    )
\ No newline at end of file
+                                                    )
+
+    def compile_grammar(self):
+        """
+        Returns a CompiledGrammar of the valid children types currently set on
+        the node classes. It must be called after init_valid_children_types and
+        after the children types of the variables and constants are set.
+        """
+        return CompiledGrammar()
@@ -0,0 +1,111 @@
+"""
+obs_equivalence.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements the ObservationalEquivalence class used by the bottom-up
+synthesizers (BUS and PROBE) to prune their banks of programs. Two expressions
+are observationally equivalent if they return the same values on a fixed sample
+of game states, e.g. a + b and b + a. Only the first expression with a given
+output signature is kept, which keeps the number of programs grown by
+LessThan.grow, Plus.grow, etc. from blowing up.
+"""
+from src.dsl import *
+
+class ObservationalEquivalence:
+
+    # Arithmetic expressions can replace each other, and so can conditions, but
+    # an expression is never merged with a condition even if 1 == True
+    expression_types = (
+        Constant,
+        VarScalar,
+        PlayerPosition,
+        PlayerVelocity,
+        NonPlayerObjectPosition,
+        NonPlayerDistToPlayer,
+        Plus,
+        Minus,
+        Times,
+        Divide
+    )
+
+    condition_types = (
+        LessThan,
+        GreaterThan,
+        EqualTo,
+        NonPlayerObjectApproaching
+    )
+
+    ERROR = 'error'
+
+    def __init__(self, envs):
+        """
+        envs is the sample of game states, in the env format given to interpret,
+        on which expressions are compared. It is usually built with the
+        sample_envs method of an evaluation object.
+        """
+        self.envs = envs
+        self.signatures = set()
+
+    def reset(self):
+        self.signatures = set()
+
+    def get_category(self, p):
+        if isinstance(p, self.condition_types):
+            return 'condition'
+
+        if isinstance(p, self.expression_types):
+            return 'expression'
+
+        return None
+
+    def get_signature(self, p):
+        """
+        Returns the outputs of p on the sample of game states, or None if p is
+        not an expression or a condition, in which case it is never pruned.
+        """
+        category = self.get_category(p)
+        if category is None:
+            return None
+
+        outputs = []
+        for env in self.envs:
+            try:
+                output = p.interpret(env)
+            except Exception:
+                output = ObservationalEquivalence.ERROR
+
+            if isinstance(output, list):
+                output = tuple(output)
+            outputs.append(output)
+
+        return category, tuple(outputs)
+
+    def is_new(self, p):
+        """
+        Returns False if an expression equivalent to p was already seen, and
+        otherwise records the signature of p and returns True.
+        """
+        if len(self.envs) == 0:
+            return True
+
+        signature = self.get_signature(p)
+        if signature is None:
+            return True
+
+        if signature in self.signatures:
+            return False
+
+        self.signatures.add(signature)
+        return True
+
+    def add_bank(self, plist):
+        """
+        Records the signatures of the programs already in the bank plist, such
+        as the constants and the dsfs it starts with.
+        """
+        for programs_by_type in plist.plist.values():
+            for programs in programs_by_type.values():
+                for p in programs:
+                    self.is_new(p)
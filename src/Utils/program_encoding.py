@@ -0,0 +1,287 @@
+"""
+program_encoding.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements the EncodedProgram class, a compact encoding of the
+ASTs of the dsl and of the dsl of Bottom-Up Search. A program is stored as a bytes object of opcodes, one per
+node or value in preorder, and a tuple of the values (constants, action
+indexes, variable names, None) in the order they appear. The opcode of a node
+encodes both its class and its number of children, and the opcode LITERAL
+stands for the next value of the tuple.
+
+Encoded programs convert to and from ASTs without loss. They pickle to a few
+dozen bytes, so they are what the evaluation objects send to the worker
+processes of their pools. Their hash is one crc32 call, and a bank holding
+millions of them only costs two small immutable objects per program.
+EncodedProgram.interpret plays a program without decoding it: the opcodes are
+turned once into a tree of closures, which are then called at every tick.
+"""
+import operator
+import zlib
+import src.dsl as dsl
+import src.BUS.bus_dsl as bus_dsl
+
+# Modules defining the node classes of the synthesizers. The classes are sorted
+# by module and name, so that opcodes agree across processes
+node_modules = (dsl, bus_dsl)
+node_classes = sorted(
+    (
+        cls for module in node_modules for cls in vars(module).values()
+        if isinstance(cls, type) and issubclass(cls, dsl.Node) and cls is not dsl.Node and cls.__module__ == module.__name__
+    ),
+    key=lambda cls: (cls.__module__, cls.__name__)
+)
+node_class_codes = {cls: code for code, cls in enumerate(node_classes)}
+
+LITERAL = 0
+MAX_CHILDREN = 4
+
+assert len(node_classes) * MAX_CHILDREN < 256, 'opcodes must fit in a byte'
+
+def get_opcode(cls, number_children):
+    if cls not in node_class_codes:
+        module_names = ', '.join(module.__name__ for module in node_modules)
+        raise Exception(f'Cannot encode {cls.__module__}.{cls.__name__}: only the node classes of {module_names} can be encoded')
+
+    return 1 + node_class_codes[cls] * MAX_CHILDREN + number_children
+
+def split_opcode(opcode):
+    """
+    Returns the node class and the number of children of a node opcode.
+    """
+    code, number_children = divmod(opcode - 1, MAX_CHILDREN)
+    return node_classes[code], number_children
+
+
+"""
+This class implements an immutable program encoded as an opcode array and a
+tuple of values.
+"""
+class EncodedProgram:
+
+    __slots__ = ('ops', 'literals', 'strategy')
+
+    def __init__(self, ops, literals):
+        self.ops = ops
+        self.literals = literals
+        self.strategy = None
+
+    @classmethod
+    def encode(cls, program):
+        """
+        Returns the EncodedProgram of the AST rooted at program.
+        """
+        ops = bytearray()
+        literals = []
+        EncodedProgram.encode_node(program, ops, literals)
+        return cls(bytes(ops), tuple(literals))
+
+    @staticmethod
+    def encode_node(node, ops, literals):
+        if not isinstance(node, dsl.Node):
+            ops.append(LITERAL)
+            literals.append(node)
+            return
+
+        assert len(node.children) < MAX_CHILDREN, f'{type(node).__name__} has too many children to be encoded'
+        ops.append(get_opcode(type(node), len(node.children)))
+        for child in node.children:
+            EncodedProgram.encode_node(child, ops, literals)
+
+    def decode(self):
+        """
+        Returns a new AST equal to the encoded program.
+        """
+        ops = iter(self.ops)
+        literals = iter(self.literals)
+        return EncodedProgram.decode_node(ops, literals)
+
+    @staticmethod
+    def decode_node(ops, literals):
+        opcode = next(ops)
+        if opcode == LITERAL:
+            return next(literals)
+
+        cls, number_children = split_opcode(opcode)
+        node = cls()
+        # DSFs with children are built by new(), which sets max_number_children
+        if node.get_max_number_children() != number_children:
+            node.max_number_children = number_children
+
+        for _ in range(number_children):
+            node.add_child(EncodedProgram.decode_node(ops, literals))
+
+        return node
+
+    def get_size(self):
+        """
+        Returns the number of opcodes, i.e. of nodes and values, of the program.
+        """
+        return len(self.ops)
+
+    def get_hash(self):
+        # crc32 does not depend on PYTHONHASHSEED, so hashes agree across processes
+        return zlib.crc32(repr(self.literals).encode(), zlib.crc32(self.ops))
+
+    def __hash__(self):
+        return hash((self.ops, self.literals))
+
+    def __eq__(self, other):
+        if not isinstance(other, EncodedProgram):
+            return NotImplemented
+
+        # 1 == 1.0 == True, but they are different programs
+        return self.ops == other.ops and self.literals == other.literals and \
+            all(type(a) is type(b) for a, b in zip(self.literals, other.literals))
+
+    def __reduce__(self):
+        return (EncodedProgram, (self.ops, self.literals))
+
+    def interpret(self, env):
+        """
+        Returns the same value as the interpret method of the decoded AST.
+        """
+        if self.strategy is None:
+            ops = iter(self.ops)
+            literals = iter(self.literals)
+            self.strategy = build_closure(ops, literals)[0]
+
+        return self.strategy(env)
+
+    def to_string(self):
+        return self.decode().to_string()
+
+
+def build_closure(ops, literals):
+    """
+    Returns a (function, value) pair for the next node of ops. Nodes give a
+    function of the env and values give the value itself.
+    """
+    opcode = next(ops)
+    if opcode == LITERAL:
+        return None, next(literals)
+
+    cls, number_children = split_opcode(opcode)
+    children = [build_closure(ops, literals) for _ in range(number_children)]
+    return closure_builders[cls.__name__](children), None
+
+def child_function(child):
+    function, value = child
+    if function is None:
+        return lambda env: value
+    return function
+
+def build_constant(children):
+    return child_function(children[0])
+
+def build_return_action(children):
+    return child_function(children[0])
+
+def build_var_scalar(children):
+    name = children[0][1]
+    return lambda env: env[name]
+
+def build_var_from_array(children):
+    name = children[0][1]
+    index_function, index = children[1]
+    if index_function is not None:
+        return lambda env: env[name][index_function(env)]
+    return lambda env: env[name][index]
+
+def build_dsf(field):
+    def build(children):
+        if len(children) == 0:
+            return lambda env: env['state'][field]
+
+        if len(children) == 1:
+            index = children[0][1]
+            return lambda env: env['state'][field][index]
+
+        index, value = children[0][1], children[1][1]
+        return lambda env: env['state'][field][index] == value
+
+    return build
+
+def build_operator(op):
+    def build(children):
+        left, right = child_function(children[0]), child_function(children[1])
+        return lambda env: op(left(env), right(env))
+
+    return build
+
+def build_it(children):
+    condition, if_body = child_function(children[0]), child_function(children[1])
+
+    def it(env):
+        if condition(env):
+            return if_body(env)
+        return 'False'
+
+    return it
+
+def build_ite(children):
+    condition, if_body, else_body = (child_function(child) for child in children)
+
+    def ite(env):
+        if condition(env):
+            return if_body(env)
+        return else_body(env)
+
+    return ite
+
+def build_strategy(children):
+    statement = child_function(children[0])
+    if children[1][0] is None:
+        return statement
+
+    next_statements = children[1][0]
+
+    def strategy(env):
+        res = statement(env)
+        if res == 'False':
+            return next_statements(env)
+        return res
+
+    return strategy
+
+def build_for_each(children):
+    iterable, loop_body = child_function(children[0]), child_function(children[1])
+
+    def for_each(env):
+        for element in iterable(env):
+            env['loop'] = element
+            loop_res = loop_body(env)
+            if loop_res != 'False':
+                env['loop'] = None
+                return loop_res
+        env['loop'] = None
+
+    return for_each
+
+closure_builders = {
+    'Constant': build_constant,
+    'ReturnAction': build_return_action,
+    'VarScalar': build_var_scalar,
+    'VarArray': build_var_scalar,
+    'VarFromArray': build_var_from_array,
+    'PlayerDirection': build_dsf('player_direction'),
+    'PlayerPosition': build_dsf('player_position'),
+    'PlayerVelocity': build_dsf('player_velocity'),
+    'NonPlayerDistToPlayer': build_dsf('non_player_dist_to_player'),
+    'NonPlayerObjectPosition': build_dsf('non_player_position'),
+    'NonPlayerObjectApproaching': build_dsf('non_player_approaching'),
+    'LessThan': build_operator(operator.lt),
+    'GreaterThan': build_operator(operator.gt),
+    'EqualTo': build_operator(operator.eq),
+    'Plus': build_operator(operator.add),
+    'Times': build_operator(operator.mul),
+    'Minus': build_operator(operator.sub),
+    'Divide': build_operator(operator.floordiv),
+    'IT': build_it,
+    'ITE': build_ite,
+    'NestedITEDepth1': build_ite,
+    'Strategy': build_strategy,
+    'ForEach': build_for_each
+}
@@ -0,0 +1,265 @@
+"""
+simplifier.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements a simplifier of the ASTs of the dsl. The synthesizers
+often produce programs such as Constant * Constant, PlayerPosition - PlayerPosition,
+comparisons of two constants, or IT statements whose condition is always false.
+simplify returns an equivalent AST in which:
+
+- arithmetic expressions and comparisons of constants are folded;
+- x + 0, x - 0, x * 1, x - x, x < x, x > x and x == x are folded, where x has
+  no division and thus cannot raise an error;
+- the operands of Plus, Times and EqualTo are ordered by hash, and a > b is
+  written b < a, so that commuted expressions have the same form;
+- IT, ITE and NestedITEDepth1 nodes with a constant condition are replaced by
+  the branch that is taken, and statements following a statement that always
+  returns an action are removed.
+
+A statement that never returns anything is folded into a Constant holding the
+value 'False', the value such statements return when interpreted.
+
+The key of the simplified AST is the canonical key used by the closed list of
+simulated annealing and by the evaluation cache, so programs that simplify to
+the same AST are evaluated once. Programs that simplify to a single action are constant: they behave the
+same way whatever the game state.
+"""
+import operator
+from src.dsl import *
+
+arithmetic_operators = (
+    (Plus, operator.add),
+    (Minus, operator.sub),
+    (Times, operator.mul),
+    (Divide, operator.floordiv)
+)
+
+comparison_operators = (
+    (LessThan, operator.lt),
+    (GreaterThan, operator.gt),
+    (EqualTo, operator.eq)
+)
+
+# Expressions made of these nodes never raise an error
+pure_expression_types = (
+    Constant,
+    VarScalar,
+    PlayerPosition,
+    PlayerVelocity,
+    NonPlayerObjectPosition,
+    NonPlayerDistToPlayer,
+    NonPlayerObjectApproaching,
+    Plus,
+    Minus,
+    Times,
+    LessThan,
+    GreaterThan,
+    EqualTo
+)
+
+def simplify(program):
+    """
+    Returns a new AST equivalent to program. program is not modified, and no
+    node is shared between program and the returned AST.
+    """
+    if not isinstance(program, Node):
+        return program
+
+    children = [simplify(child) for child in program.children]
+
+    op = get_operator(program, arithmetic_operators)
+    if op is not None:
+        return simplify_arithmetic(program, op, children[0], children[1])
+
+    op = get_operator(program, comparison_operators)
+    if op is not None:
+        return simplify_comparison(program, op, children[0], children[1])
+
+    if isinstance(program, IT):
+        condition, if_body = children
+        if is_constant(condition):
+            if get_value(condition):
+                return if_body
+            return make_constant('False')
+
+    if isinstance(program, (ITE, NestedITEDepth1)):
+        condition, if_body, else_body = children
+        if is_constant(condition):
+            return if_body if get_value(condition) else else_body
+
+        if is_pure(condition) and if_body.equals(else_body):
+            return if_body
+
+    if isinstance(program, Strategy):
+        statement, next_statements = children
+        if is_constant(statement) and get_value(statement) == 'False':
+            return statement if next_statements is None else next_statements
+
+        if always_returns(statement):
+            return statement
+
+    return rebuild(program, children)
+
+# Canonical forms of recently simplified programs, keyed by their structural
+# key, since the same program is looked up several times. Structural hashes
+# are not used as keys, since two programs may share a hash
+canonical_forms = {}
+MAX_CANONICAL_FORMS = 100_000
+
+def get_canonical_form(program):
+    """
+    Returns the key of the simplified program and whether program is constant.
+    """
+    program_key = program.get_key()
+    canonical_form = canonical_forms.get(program_key)
+    if canonical_form is not None:
+        return canonical_form
+
+    simplified = simplify(program)
+    if isinstance(simplified, ReturnAction):
+        is_constant_action = not isinstance(simplified.children[0].children[1], Node)
+    else:
+        is_constant_action = is_constant(simplified)
+
+    if len(canonical_forms) >= MAX_CANONICAL_FORMS:
+        canonical_forms.clear()
+
+    canonical_form = (simplified.get_key(), is_constant_action)
+    canonical_forms[program_key] = canonical_form
+    return canonical_form
+
+def canonical_key(program):
+    """
+    Returns the structural key of the simplified program. Equivalent programs
+    found by the simplifier have the same canonical key, and other programs
+    never do.
+    """
+    return get_canonical_form(program)[0]
+
+def is_constant_program(program):
+    """
+    Returns True if program always returns the same action, or never returns one.
+    """
+    return get_canonical_form(program)[1]
+
+def get_operator(node, operators):
+    for node_type, op in operators:
+        if isinstance(node, node_type):
+            return op
+    return None
+
+def rebuild(node, children):
+    new_node = type(node)()
+    # DSFs with children are built by new(), which sets max_number_children
+    if new_node.get_max_number_children() != len(children):
+        new_node.max_number_children = len(children)
+
+    for child in children:
+        new_node.add_child(child)
+
+    return new_node
+
+def make_constant(value):
+    # Constant.new asserts that the value is a number, but 'False' can be folded too
+    constant = Constant()
+    constant.add_child(value)
+    return constant
+
+def is_constant(node):
+    return isinstance(node, Constant)
+
+def get_value(constant):
+    return constant.children[0]
+
+def is_number(node, number):
+    if not is_constant(node):
+        return False
+
+    value = get_value(node)
+    return type(value) in (int, float) and value == number
+
+def is_pure(node):
+    if not isinstance(node, pure_expression_types):
+        return False
+
+    for child in node.children:
+        if isinstance(child, Node) and not is_pure(child):
+            return False
+
+    return True
+
+def always_returns(statement):
+    """
+    Returns True if the interpretation of statement never gives 'False', so the
+    statements following it are never interpreted.
+    """
+    if isinstance(statement, ReturnAction):
+        return True
+
+    if is_constant(statement):
+        return get_value(statement) != 'False'
+
+    if isinstance(statement, (ITE, NestedITEDepth1)):
+        return always_returns(statement.children[1]) and always_returns(statement.children[2])
+
+    if isinstance(statement, Strategy):
+        next_statements = statement.children[1]
+        return always_returns(statement.children[0]) or \
+            (next_statements is not None and always_returns(next_statements))
+
+    return False
+
+def order_by_hash(left, right):
+    if left.get_hash() > right.get_hash():
+        return right, left
+    return left, right
+
+def simplify_arithmetic(node, op, left, right):
+    if is_constant(left) and is_constant(right):
+        try:
+            return make_constant(op(get_value(left), get_value(right)))
+        except (ZeroDivisionError, TypeError):
+            return rebuild(node, [left, right])
+
+    if isinstance(node, Plus):
+        if is_number(right, 0):
+            return left
+        if is_number(left, 0):
+            return right
+
+    if isinstance(node, Minus):
+        if is_number(right, 0):
+            return left
+        if is_pure(left) and left.equals(right):
+            return make_constant(0)
+
+    if isinstance(node, Times):
+        if is_number(right, 1):
+            return left
+        if is_number(left, 1):
+            return right
+
+    if isinstance(node, (Plus, Times)):
+        left, right = order_by_hash(left, right)
+
+    return rebuild(node, [left, right])
+
+def simplify_comparison(node, op, left, right):
+    if is_constant(left) and is_constant(right):
+        try:
+            return make_constant(bool(op(get_value(left), get_value(right))))
+        except TypeError:
+            return rebuild(node, [left, right])
+
+    if is_pure(left) and left.equals(right):
+        return make_constant(isinstance(node, EqualTo))
+
+    if isinstance(node, GreaterThan):
+        return rebuild(LessThan(), [right, left])
+
+    if isinstance(node, EqualTo):
+        left, right = order_by_hash(left, right)
+
+    return rebuild(node, [left, right])
@@ -0,0 +1,80 @@
+"""
+static_analysis.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module implements a static analysis of the ASTs of the dsl that finds
+degenerate programs before they are played:
+
+- programs that raise an error at every tick, e.g. because a condition that
+  is always interpreted divides by a constant zero. Playing them always ends
+  at the first tick with the score Evaluation.MIN_SCORE;
+- constant programs, which always return the same action or never return one
+  (see simplifier.py). They behave the same way in every game state.
+
+The evaluation objects give programs that always raise their known score
+without building a game, and play constant programs only once per canonical
+form.
+"""
+from src.dsl import *
+from src.Utils.simplifier import simplify, is_constant_program
+
+RAISES = 'raises'
+CONSTANT = 'constant'
+
+def classify(program):
+    """
+    Returns RAISES if program raises an error whenever it is interpreted,
+    CONSTANT if it always takes the same action, and None otherwise.
+    """
+    if always_raises(program):
+        return RAISES
+
+    if is_constant_program(program):
+        return CONSTANT
+
+    return None
+
+def always_raises(node):
+    """
+    Returns True if interpreting node raises an error whatever the game state.
+    Only the parts of node that are interpreted at every tick are considered.
+    """
+    if not isinstance(node, Node):
+        return False
+
+    if isinstance(node, Divide):
+        left, right = node.children
+        if always_raises(left) or always_raises(right):
+            return True
+
+        denominator = simplify(right)
+        return isinstance(denominator, Constant) and is_zero(denominator.children[0])
+
+    if isinstance(node, (Plus, Minus, Times, LessThan, GreaterThan, EqualTo, ReturnAction, VarFromArray)):
+        return any(always_raises(child) for child in node.children)
+
+    if isinstance(node, IT):
+        return always_raises(node.children[0])
+
+    if isinstance(node, (ITE, NestedITEDepth1)):
+        condition, if_body, else_body = node.children
+        return always_raises(condition) or (always_raises(if_body) and always_raises(else_body))
+
+    if isinstance(node, Strategy):
+        statement, next_statements = node.children
+        if always_raises(statement):
+            return True
+
+        # The next statements are interpreted at every tick if the statement never returns
+        return always_raises(next_statements) and never_returns(statement)
+
+    return False
+
+def never_returns(statement):
+    simplified = simplify(statement)
+    return isinstance(simplified, Constant) and simplified.children[0] == 'False'
+
+def is_zero(value):
+    return type(value) in (int, float, bool) and value == 0
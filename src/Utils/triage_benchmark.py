@@ -0,0 +1,173 @@
+"""
+triage_benchmark.py
+
+Author: Olivier Vadiavaloo
+
+Description:
+This module benchmarks the triage of the EvaluationConfig classes on recorded
+score distributions. The scores of a set of programs are recorded once and saved
+to a JSON file: random programs, and mutations of the best of them, since the
+candidates of simulated annealing are mutations of a good program. The games are
+seeded by a SeedSchedule, so the i-th game of every program is the same game.
+The evaluation loop of Evaluation.evaluate_sequential is then replayed, for each
+config, on random orderings of the recorded games, the same for every program.
+The baseline is the program whose mean score is at the given quantile of the
+recorded programs.
+
+For each config, the benchmark reports the average number of games played per
+program, and the number of programs that are at least as good as the baseline
+but were stopped by triage.
+
+Usage:
+    python -m src.Utils.triage_benchmark record GAME FILE [--programs N] [--games G]
+    python -m src.Utils.triage_benchmark replay FILE [--tg G] [--te C BOUND] [--configs NAME ...]
+"""
+import argparse
+import json
+import random
+from statistics import *
+from src.dsl import *
+from src.Evaluation.EvaluationConfig.evaluation_config import *
+from src.Evaluation.seed_schedule import SeedSchedule
+from src.SA.program_mutator import ProgramMutator
+from src.Utils.dsl_config import DslConfig
+
+MIN_SCORE = -1_000_000
+
+def record_scores(game, n_programs, n_games, filepath, seed=0):
+    """
+    Plays n_games games with n_programs programs that do not raise errors and
+    saves their scores to filepath. Half of the programs are mutations of the
+    best random program.
+    """
+    from src.Evaluation.evaluation import EvaluationFactory
+
+    dsl_config = DslConfig('./src/dsl_config.json')
+    dsl_config.init_valid_children_types(game)
+    grammar = dsl_config.get_grammar(game)
+    VarArray.valid_children_types = [set(grammar['arrays'])]
+    VarFromArray.valid_children_types = [set(grammar['arrays']), set(grammar['array_indexes'])]
+    VarScalar.valid_children_types = [set(grammar['scalars'])]
+    Constant.valid_children_types = [set(grammar['constants'])]
+
+    attributes = form_basic_attr_dict(False, None, None, n_games, MIN_SCORE, MIN_SCORE, None)
+    config = EvaluationConfigFactory().get_config('NORMAL', attributes)
+    evaluation = EvaluationFactory(0, config).get_eval_fun(game)
+    evaluation.set_seed_schedule(SeedSchedule(seed))
+
+    random.seed(seed)
+    mutator = ProgramMutator(0, 4, 50, grammar=dsl_config.compile_grammar())
+    records = []
+    best, best_eval = None, MIN_SCORE
+    while len(records) < n_programs:
+        if len(records) < n_programs // 2 or best is None:
+            program = mutator.generate_random({})
+        else:
+            program = mutator.mutate(best, {})
+
+        evaluation.set_episode(0)
+        scores, result = evaluation.evaluate_sequential(program)
+        if len(scores) == 0:
+            continue
+
+        records.append({'program': program.to_string(), 'scores': list(scores)})
+        if result > best_eval:
+            best, best_eval = program, result
+
+    with open(filepath, 'w') as scores_file:
+        json.dump({'game': game, 'programs': records}, scores_file)
+
+def replay(eval_config, scores):
+    """
+    Runs the loop of Evaluation.evaluate_sequential on the recorded scores and
+    returns the number of games played.
+    """
+    eval_config.clean_up()
+    played = []
+    continue_eval = True
+    while continue_eval:
+        # The configs keep running statistics of the list, so it grows as in evaluate_sequential
+        played.append(scores[len(played)])
+        games_played = len(played)
+        result = eval_config.compute_result(played, games_played)
+        continue_eval = eval_config.check_continue(result, games_played)
+
+    eval_config.clean_up()
+    return games_played
+
+def run_benchmark(records, config_names, total_games, confidence_value, var_bound, quantile=0.75, n_orders=20, seed=0):
+    """
+    Returns a dict mapping each config name to the average number of games
+    played per program and the number of wrong stops.
+    """
+    rng = random.Random(seed)
+    records = [r for r in records if len(r['scores']) >= total_games]
+    records.sort(key=lambda r: mean(r['scores']))
+    baseline = records[min(len(records) - 1, int(quantile * len(records)))]
+    best_eval = mean(baseline['scores'])
+
+    # Every program replays its games in the same orders, so the i-th games of
+    # two programs are still the same game
+    n_recorded = min(len(r['scores']) for r in records)
+    orders = [rng.sample(range(n_recorded), total_games) for _ in range(n_orders)]
+
+    stats = {}
+    for config_name in config_names:
+        attributes = form_basic_attr_dict(True, var_bound, confidence_value, total_games, best_eval, MIN_SCORE, 5)
+        eval_config = EvaluationConfigFactory().get_config(config_name, attributes)
+        eval_config.set_best_eval_variance(variance(baseline['scores']))
+        eval_config.set_best_eval_range(max(baseline['scores']) - min(baseline['scores']))
+
+        games = 0
+        wrong_stops = 0
+        for order in orders:
+            eval_config.set_best_scores([baseline['scores'][i] for i in order])
+            for record in records:
+                games_played = replay(eval_config, [record['scores'][i] for i in order])
+                games += games_played
+                if mean(record['scores']) >= best_eval and games_played < total_games:
+                    wrong_stops += 1
+
+        stats[config_name] = (games / (len(orders) * len(records)), wrong_stops)
+
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the triage of the evaluation configs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='Record the scores of programs')
+    record_parser.add_argument('game', choices=['Catcher', 'FlappyBird', 'Pong', 'Snake'])
+    record_parser.add_argument('filepath', metavar='FILE')
+    record_parser.add_argument('--programs', type=int, default=100, dest='n_programs')
+    record_parser.add_argument('--games', type=int, default=100, dest='n_games')
+
+    replay_parser = subparsers.add_parser('replay', help='Replay the triage of the configs on recorded scores')
+    replay_parser.add_argument('filepath', metavar='FILE')
+    replay_parser.add_argument('--tg', type=int, default=30, dest='total_games')
+    replay_parser.add_argument('--te', type=float, nargs=2, default=[0.95, 500], dest='triage_eval',
+                               metavar=('CONFIDENCE', 'BOUND'))
+    replay_parser.add_argument('--configs', nargs='+', default=['NORMAL', 'CHEBY', 'BERNSTEIN', 'SEQUENTIAL', 'PAIRED'])
+    replay_parser.add_argument('--quantile', type=float, default=0.75)
+
+    parameters = parser.parse_args()
+    if parameters.command == 'record':
+        record_scores(parameters.game, parameters.n_programs, parameters.n_games, parameters.filepath)
+    else:
+        with open(parameters.filepath, 'r') as scores_file:
+            records = json.load(scores_file)['programs']
+
+        confidence_value, var_bound = parameters.triage_eval
+        stats = run_benchmark(
+                    records,
+                    parameters.configs,
+                    parameters.total_games,
+                    confidence_value,
+                    var_bound,
+                    quantile=parameters.quantile
+                )
+
+        print(f'{"config":<12}{"games/program":>15}{"wrong stops":>13}')
+        for config_name, (games, wrong_stops) in stats.items():
+            print(f'{config_name:<12}{games:>15.2f}{wrong_stops:>13}')
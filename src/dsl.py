@@ -12,6 +12,111 @@ in the PyGame-Learning-Environment.
 from random import choice
 from pygame.constants import K_w, K_s, K_a, K_d
 import numpy as np
+import functools
+import hashlib
+
+"""
+This class implements the environment in which programs are interpreted. The
+evaluation objects preallocate one GameEnv per game and update its slots in place
+at every tick, and compiled programs read the slots directly. It also supports
+the dict-style access used by interpret, where env[statename] is the env itself.
+"""
+class GameEnv:
+
+    state_fields = (
+        'player_position',
+        'player_velocity',
+        'player_direction',
+        'non_player_position',
+        'non_player_approaching',
+        'non_player_dist_to_player'
+    )
+
+    env_fields = (
+        'paddle_width',
+        'actions',
+        'body_dist_list',
+        'loop'
+    )
+
+    __slots__ = state_fields + env_fields
+
+    def __init__(self):
+        self.loop = None
+
+    def __getitem__(self, key):
+        if key == 'state':
+            return self
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def to_dict(self):
+        """
+        Returns a copy of the env in the nested dict layout built by the
+        update_env methods before GameEnv existed.
+        """
+        env = {}
+        env['state'] = {}
+        for field in self.state_fields:
+            if hasattr(self, field):
+                env['state'][field] = self.copy_value(getattr(self, field))
+
+        for field in self.env_fields:
+            if hasattr(self, field) and field != 'loop':
+                env[field] = self.copy_value(getattr(self, field))
+
+        return env
+
+    @classmethod
+    def from_dict(cls, env):
+        """
+        Returns a GameEnv holding the values of an env in the nested dict layout
+        returned by to_dict, e.g. a game state recorded in a TraceCorpus.
+        """
+        game_env = cls()
+        for field, value in env['state'].items():
+            setattr(game_env, field, value)
+
+        for field, value in env.items():
+            if field != 'state':
+                setattr(game_env, field, value)
+
+        return game_env
+
+    @staticmethod
+    def copy_value(value):
+        if isinstance(value, list):
+            return value.copy()
+        return value
+
+
+class NodeKey:
+    """
+    Key of the AST rooted at node in the closed lists and tables of scores of
+    the synthesizers. It hashes to the structural hash stored in the node, so a
+    lookup costs O(1) instead of hashing a nested get_key tuple, and keys with
+    the same hash are told apart with equals. The AST must not be modified
+    while it is used as a key.
+    """
+
+    __slots__ = ('node', 'hash')
+
+    def __init__(self, node):
+        self.node = node
+        self.hash = node.hash
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if not isinstance(other, NodeKey) or self.hash != other.hash:
+            return False
+
+        # The synthesizers usually look a program up with the node they stored
+        return self.node is other.node or self.node.equals(other.node)
+
 
 """
 This is a base class representing the Node of an abstract-
@@ -22,15 +127,26 @@ class Node:
 
     valid_children_types = 'empty'
 
+    # Metadata shared by all the nodes of a class. The DSFs whose number of
+    # children depends on the game declare max_number_children as a slot
+    max_number_children = 0
+    statename = 'state'
+    actionname = 'actions'
+    loopname = 'loop'
+
+    # Banks of the bottom-up synthesizers hold millions of nodes, so nodes have
+    # no __dict__ and every subclass must declare its own __slots__
+    __slots__ = ('size', 'children', 'parent', 'height', 'hash', 'preorder_index')
+
+    slot_names = {}
+
     def __init__(self):
         self.size = 1
-        self.current_child_num = 0
-        self.max_number_children = 0
         self.children = []
-
-        self.statename = 'state'
-        self.actionname = 'actions'
-        self.loopname = 'loop'
+        self.parent = None
+        self.height = 1
+        self.hash = self.compute_hash()
+        self.preorder_index = None
 
     def add_child(self, child):
         if type(self).__name__ == Constant.className():
@@ -38,68 +154,425 @@ class Node:
 
         assert len(self.children) < self.max_number_children, f'{len(self.children)} not less than {self.max_number_children}, {type(self).__name__}'
         self.children.append(child)
-        self.current_child_num += 1
         
         if isinstance(child, Node):
-            self.size += child.get_size()
+            size_change = child.get_size()
+            child.parent = self
         elif child is not None:
-            self.size += 1
+            size_change = 1
+        else:
+            size_change = 0
+
+        self.update_ancestors(size_change)
 
     def replace_child(self, child, i):
         if type(self).__name__ == Constant.className():
             assert type(child).__name__ != Constant.className()
         
-        if isinstance(self.children[i], Node):
-            self.size -= self.children[i].get_size()
-        elif self.children[i] is not None:
-            self.size -= 1
+        size_change = 0
+        old_child = self.children[i]
+        if isinstance(old_child, Node):
+            size_change -= old_child.get_size()
+            if old_child.parent is self:
+                old_child.parent = None
+        elif old_child is not None:
+            size_change -= 1
 
         if isinstance(child, Node):
-            self.size += child.get_size()
+            size_change += child.get_size()
+            child.parent = self
         elif child is not None:
-            self.size += 1
+            size_change += 1
 
         self.children[i] = child
+        self.update_ancestors(size_change)
+
+    def update_ancestors(self, size_change):
+        """
+        Adds size_change to the size of this node and of its ancestors, and
+        refreshes their heights and hashes. A change to a child therefore costs
+        O(depth) instead of a traversal of the whole tree with check_correct_size.
+        """
+        node = self
+        while node is not None:
+            node.size += size_change
+            node.height = node.compute_height()
+            node.hash = node.compute_hash()
+            node.preorder_index = None
+            node = node.parent
 
     def check_correct_size(self):
-        size_zero_nodes = set([
-                            Strategy.className(),
-                            Constant.className(),
-                            VarScalar.className(),
-                            VarFromArray.className()
-        ])
-        
-        if type(self).__name__ in size_zero_nodes:
+        """
+        Recomputes the size, height and hash of every node of the tree rooted at
+        this node and sets the parent of every child. Only needed when nodes were
+        shared between trees (e.g. by the bottom-up synthesizers) or edited without
+        add_child and replace_child.
+        """
+        if isinstance(self, size_zero_nodes):
             size = 0
         else:
             size = 1
         
-        for child in self.get_children():
+        for child in self.children:
             if isinstance(child, Node):
-                child_size = child.check_correct_size()
-            else:
-                child_size = 1
-            size += child_size
-
-        if size != self.get_size():
-            self.size = size
+                child.parent = self
+                size += child.check_correct_size()
+            elif child is not None:
+                size += 1
+
+        self.size = size
+        self.height = self.compute_height()
+        self.hash = self.compute_hash()
         
         return self.size
 
+    def compute_height(self):
+        height = 0
+        for child in self.children:
+            if isinstance(child, Node) and child.height > height:
+                height = child.height
+        return height + 1
+
+    def get_height(self):
+        """
+        Returns the number of nodes on the longest path from this node to a leaf.
+        """
+        return self.height
+
+    def get_depth(self):
+        """
+        Returns the number of edges between this node and the root of its tree.
+        """
+        depth = 0
+        node = self.parent
+        while node is not None:
+            depth += 1
+            node = node.parent
+        return depth
+
+    def get_parent(self):
+        return self.parent
+
+    def shallow_copy(self):
+        """
+        Returns a copy of this node that shares its children with this node. The
+        children are moved under the copy, which keeps the parent pointers of the
+        newest AST valid; a shared subtree keeps its position, so its depth is
+        the same in every AST that contains it.
+        """
+        node = object.__new__(type(self))
+        for name in self.get_slot_names():
+            if hasattr(self, name):
+                setattr(node, name, getattr(self, name))
+        node.children = self.children.copy()
+        node.parent = None
+        for child in node.children:
+            if isinstance(child, Node):
+                child.parent = node
+
+        return node
+
+    def copy_path(self, path):
+        """
+        Returns a copy of the AST rooted at this node in which only the nodes on
+        path, a list of child indexes starting at this node, are copied. All the
+        other subtrees are shared with this AST, so the copy costs O(depth) instead
+        of O(size) like copy.deepcopy. Also returns the copy of the last node of
+        path, on which add_child and replace_child can then be called. ASTs that
+        share subtrees must otherwise be treated as immutable.
+        """
+        root = self.shallow_copy()
+        node = root
+        for i in path:
+            child = node.children[i].shallow_copy()
+            child.parent = node
+            node.children[i] = child
+            node = child
+
+        return root, node
+
+    def get_preorder_index(self):
+        """
+        Returns the positions of the AST rooted at this node in preorder. A
+        position is a (path, kind) pair, where path is the tuple of child indexes
+        leading from this node to the position and kind is the class name of the
+        node at the position. Values stored in a node (e.g. the value of a Constant
+        or the name of a VarScalar) have the kind of that node. The index is built
+        on first use and kept until the AST is changed with add_child or replace_child.
+        """
+        if self.preorder_index is None:
+            self.preorder_index = []
+            self.build_preorder_index((), self.preorder_index)
+
+        return self.preorder_index
+
+    def build_preorder_index(self, path, preorder_index):
+        preorder_index.append((path, type(self).__name__))
+        for i, child in enumerate(self.children):
+            if isinstance(child, Node):
+                child.build_preorder_index(path + (i,), preorder_index)
+            else:
+                preorder_index.append((path + (i,), type(self).__name__))
+
+    def splice_preorder_index(self, preorder_index, k, subtree):
+        """
+        Sets the index of this AST, obtained from the AST of preorder_index by
+        putting subtree at position k, from preorder_index instead of walking
+        this AST. Paths are child indexes, so only the positions of the replaced
+        subtree change.
+        """
+        path = preorder_index[k][0]
+        depth = len(path)
+        end = k + 1
+        while end < len(preorder_index) and preorder_index[end][0][:depth] == path:
+            end += 1
+
+        subtree_index = []
+        if isinstance(subtree, Node):
+            subtree.build_preorder_index(path, subtree_index)
+        else:
+            parent = self
+            for i in path[:-1]:
+                parent = parent.children[i]
+            subtree_index.append((path, type(parent).__name__))
+
+        self.preorder_index = preorder_index[:k] + subtree_index + preorder_index[end:]
+
+    @classmethod
+    def get_slot_names(cls):
+        """
+        Returns the names of the slots of the nodes of class cls, including the
+        slots declared by its base classes.
+        """
+        slot_names = Node.slot_names.get(cls)
+        if slot_names is None:
+            slot_names = []
+            for base in cls.__mro__:
+                slot_names.extend(base.__dict__.get('__slots__', ()))
+            slot_names = tuple(slot_names)
+            Node.slot_names[cls] = slot_names
+
+        return slot_names
+
+    def __getstate__(self):
+        # Subtrees may be shared between ASTs, so the parent pointers are not
+        # followed when pickling or deep copying; __setstate__ rebuilds them
+        state = {}
+        for name in self.get_slot_names():
+            if hasattr(self, name):
+                state[name] = getattr(self, name)
+        state['parent'] = None
+        state['preorder_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        for child in self.children:
+            if isinstance(child, Node):
+                child.parent = self
+
     def get_size(self):
         return self.size
 
+    @staticmethod
+    @functools.lru_cache(maxsize=4096, typed=True)
+    def literal_hash(value):
+        # blake2b does not depend on PYTHONHASHSEED, so hashes agree across processes
+        digest = hashlib.blake2b(repr(value).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+
+    def compute_hash(self):
+        """
+        Computes the structural hash of the AST rooted at this node from the
+        stored hashes of its children, so updating it costs O(number of children).
+        The hashes are combined by hashing a tuple of integers, which mixes every
+        element in turn and does not depend on PYTHONHASHSEED. Unlike XOR-based
+        combinations, children cannot cancel each other out, e.g. Minus(x, Minus(x, y))
+        and y have different hashes.
+        """
+        child_hashes = [Node.literal_hash(type(self).__name__)]
+        for child in self.children:
+            if isinstance(child, Node):
+                child_hashes.append(child.hash)
+            else:
+                child_hashes.append(Node.literal_hash(child))
+
+        return hash(tuple(child_hashes))
+
+    def get_hash(self):
+        """
+        Returns the 64-bit structural hash of the AST rooted at this node. Two ASTs
+        that print the same program have the same hash, but different ASTs may
+        share a hash, so tables of programs are keyed by get_key instead.
+        """
+        return self.hash
+
+    def get_key(self):
+        """
+        Returns a nested tuple holding the class name of every node and the type
+        and value of every literal of the AST rooted at this node. Two ASTs have
+        equal keys exactly when equals returns True, so keys are used instead of
+        to_string() by the closed lists and the tables of scores. Building and
+        hashing the tuple costs O(size); NodeKey avoids both for programs that
+        are not modified while they are keys.
+        """
+        key = [type(self).__name__]
+        for child in self.children:
+            if isinstance(child, Node):
+                key.append(child.get_key())
+            else:
+                # 1 == 1.0 == True, but they are different programs
+                key.append((type(child).__name__, child))
+
+        return tuple(key)
+
+    def equals(self, other):
+        """
+        Returns True if other is an AST with the same structure and values as
+        the AST rooted at this node. The hashes are compared first, so ASTs that
+        differ are usually told apart without walking them.
+        """
+        if not isinstance(other, Node) or self.hash != other.hash or type(self) is not type(other):
+            return False
+
+        if len(self.children) != len(other.children):
+            return False
+
+        for child, other_child in zip(self.children, other.children):
+            if isinstance(child, Node):
+                if not child.equals(other_child):
+                    return False
+            elif isinstance(other_child, Node) or type(child) is not type(other_child) or child != other_child:
+                return False
+
+        return True
+
     def to_string(self, indent=0):
         raise Exception("Unimplemented method: to_string")
 
     def interpret(self):
         raise Exception("Unimplemented method: interpret")
 
+    def compile(self):
+        """
+        Compiles the AST rooted at this node into a single Python function that
+        takes a GameEnv as its only argument and returns the same value as
+        interpret(env). Game loops can then pay one function call per tick instead
+        of walking the tree.
+        """
+        literals = []
+        lines = ['def program(env):']
+        self.compile_statement(lines, 1, literals)
+        lines.append("\treturn 'False'")
+
+        namespace = {}
+        for i, literal in enumerate(literals):
+            namespace[f'k{i}'] = literal
+
+        try:
+            exec('\n'.join(lines), namespace)
+        except (SyntaxError, RecursionError):
+            # Very deeply nested programs exceed the limits of the Python compiler
+            return self.interpret
+
+        return namespace['program']
+
+    def compile_statement(self, lines, indent, literals):
+        """
+        Appends the lines of code of this node to lines. The code either returns
+        a value or falls through, which is equivalent to interpret returning 'False'.
+        """
+        tab = '\t' * indent
+        lines.append(f'{tab}return {self.compile_expression(literals)}')
+
+    def compile_expression(self, literals):
+        raise Exception("Unimplemented method: compile_expression")
+
+    def interpret_batch(self, env):
+        """
+        Interprets the node over a batch of game states at once. env has the same
+        keys as the env given to interpret, but env[statename] is a NumPy structured
+        array with one record per game and the other per-game values are arrays.
+        Returns one value per game.
+        """
+        raise Exception("Unimplemented method: interpret_batch")
+
+    def batch_len(self, env):
+        return len(env[self.statename])
+
+    def select_batch(self, env, mask):
+        """
+        Returns the sub-batch of env made of the games for which mask is True.
+        Values shared by all games (e.g. the action set) are left untouched.
+        """
+        n = self.batch_len(env)
+        selected_env = {}
+        for key, value in env.items():
+            if isinstance(value, np.ndarray) and value.ndim > 0 and len(value) == n:
+                selected_env[key] = value[mask]
+            else:
+                selected_env[key] = value
+
+        return selected_env
+
+    @staticmethod
+    def batch_env(envs, statename='state', shared_keys=('actions',)):
+        """
+        Stacks a list of env dicts, as built by the update_env methods of the
+        Evaluation classes, into the batch env expected by interpret_batch.
+        """
+        env = {}
+        states = [e[statename] for e in envs]
+        columns = {key: np.asarray([state[key] for state in states]) for key in states[0]}
+        dtype = [(key, column.dtype, column.shape[1:]) for key, column in columns.items()]
+
+        env[statename] = np.empty(len(envs), dtype=dtype)
+        for key, column in columns.items():
+            env[statename][key] = column
+
+        for key in envs[0]:
+            if key == statename:
+                continue
+
+            if key in shared_keys:
+                env[key] = envs[0][key]
+                continue
+
+            # values such as lists of varying length are kept as an object array
+            env[key] = np.empty(len(envs), dtype=object)
+            env[key][:] = [e[key] for e in envs]
+            if not any(isinstance(e[key], (list, tuple)) for e in envs):
+                env[key] = np.asarray(env[key].tolist())
+
+        return env
+
+    @staticmethod
+    def compile_literal(value, literals):
+        literals.append(value)
+        return f'k{len(literals) - 1}'
+
+    @staticmethod
+    def compile_env_access(name, literals):
+        """
+        Returns the code reading name from env. Fields of GameEnv are read
+        directly from their slot instead of going through __getitem__.
+        """
+        if name in GameEnv.__slots__:
+            return f'env.{name}'
+        return f'env[{Node.compile_literal(name, literals)}]'
+
+    @staticmethod
+    def compile_operand(operand, literals):
+        if isinstance(operand, Node):
+            return operand.compile_expression(literals)
+        return Node.compile_literal(operand, literals)
+
     def get_children(self):
         return self.children.copy()
 
     def get_current_child_num(self):
-        return self.current_child_num
+        return len(self.children)
 
     def get_max_number_children(self):
         return self.max_number_children
@@ -135,9 +608,11 @@ This class implements an AST node representing a constant.
 """
 class Constant(Node):
 
+    __slots__ = ()
+    max_number_children = 1
+
     def __init__(self):
         super(Constant, self).__init__()
-        self.max_number_children = 1
         self.size = 0
 
     @classmethod
@@ -152,7 +627,14 @@ class Constant(Node):
         return f"{self.get_children()[0]}"
 
     def interpret(self, env):
-        return self.get_children()[0]
+        return self.children[0]
+
+    def compile_expression(self, literals):
+        return Node.compile_literal(self.children[0], literals)
+
+    def interpret_batch(self, env):
+        return self.children[0]
+
 
 
 """
@@ -161,9 +643,11 @@ choosing/returning an action among the available actions.
 """
 class ReturnAction(Node):
 
+    __slots__ = ()
+    max_number_children = 1
+
     def __init__(self):
         super(ReturnAction, self).__init__()
-        self.max_number_children = 1
 
     @classmethod
     def new(cls, action):
@@ -181,9 +665,21 @@ class ReturnAction(Node):
         return f"{tab}return {action.to_string()}"
 
     def interpret(self, env):
-        action = self.get_children()[0]
+        action = self.children[0]
         return action.interpret(env)
 
+    def compile_statement(self, lines, indent, literals):
+        tab = '\t' * indent
+        action = self.children[0]
+        lines.append(f'{tab}return {Node.compile_operand(action, literals)}')
+
+    def interpret_batch(self, env):
+        action = self.children[0].interpret_batch(env)
+        actions = np.empty(self.batch_len(env), dtype=object)
+        actions[:] = action if np.ndim(action) == 0 else list(action)
+        return actions
+
+
 """
 This class represents a for loop in the DSL. It is interpreted as
 a for-each loop where the program iterates over each element of the
@@ -194,9 +690,11 @@ for each x in coords:
 """
 class ForEach(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(ForEach, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, iterable, loop_body):
@@ -221,8 +719,8 @@ class ForEach(Node):
         return for_str
 
     def interpret(self, env):
-        iterable = self.get_children()[0]
-        loop_body = self.get_children()[1]
+        iterable = self.children[0]
+        loop_body = self.children[1]
 
         for element in iterable.interpret(env):
             env[self.loopname] = element
@@ -234,15 +732,57 @@ class ForEach(Node):
 
         env[self.loopname] = None
 
+    def compile_statement(self, lines, indent, literals):
+        tab = '\t' * indent
+        iterable = self.children[0]
+        loop_body = self.children[1]
+        loop_variable = Node.compile_env_access(self.loopname, literals)
+
+        # the loop variable is reset whether the loop returns or runs to completion
+        lines.append(f'{tab}try:')
+        lines.append(f'{tab}\tfor element in {iterable.compile_expression(literals)}:')
+        lines.append(f'{tab}\t\t{loop_variable} = element')
+        loop_body.compile_statement(lines, indent + 2, literals)
+        lines.append(f'{tab}finally:')
+        lines.append(f'{tab}\t{loop_variable} = None')
+        lines.append(f'{tab}return None')
+
+    def interpret_batch(self, env):
+        iterable = self.children[0].interpret_batch(env)
+        loop_body = self.children[1]
+
+        if isinstance(iterable, np.ndarray) and iterable.dtype == object:
+            raise Exception('ForEach over a different iterable for each game is not supported in batch mode')
+
+        results = np.full(self.batch_len(env), None, dtype=object)
+        pending = np.ones(self.batch_len(env), dtype=bool)
+        for element in iterable:
+            if not pending.any():
+                break
+
+            env[self.loopname] = element
+            loop_res = loop_body.interpret_batch(self.select_batch(env, pending))
+            returned = loop_res != 'False'
+
+            pending_indexes = np.flatnonzero(pending)
+            results[pending_indexes[returned]] = loop_res[returned]
+            pending[pending_indexes[returned]] = False
+
+        env[self.loopname] = None
+        return results
+
+
 """
 This class represents an nested if-then-else conditional statement with depth 1 in
 the DSL. In other words, the if-else bodies can have multiple NON-NESTED if-then statements.
 """
 class NestedITEDepth1(Node):
+
+    __slots__ = ()
+    max_number_children = 3
     
     def __init__(self):
         super(NestedITEDepth1, self).__init__()
-        self.max_number_children = 3
 
     @classmethod
     def new(cls, condition, if_body, else_body):
@@ -272,15 +812,41 @@ class NestedITEDepth1(Node):
         return ite_string
 
     def interpret(self, env):
-        condition = self.get_children()[0]
-        if_body = self.get_children()[1]
-        else_body = self.get_children()[2]
+        condition = self.children[0]
+        if_body = self.children[1]
+        else_body = self.children[2]
 
         if condition.interpret(env):
             return if_body.interpret(env)
         else:
             return else_body.interpret(env)
 
+    def compile_statement(self, lines, indent, literals):
+        tab = '\t' * indent
+        condition = self.children[0]
+        if_body = self.children[1]
+        else_body = self.children[2]
+
+        lines.append(f'{tab}if {condition.compile_expression(literals)}:')
+        if_body.compile_statement(lines, indent + 1, literals)
+        lines.append(f'{tab}else:')
+        else_body.compile_statement(lines, indent + 1, literals)
+
+    def interpret_batch(self, env):
+        condition = self.children[0]
+        if_body = self.children[1]
+        else_body = self.children[2]
+
+        results = np.empty(self.batch_len(env), dtype=object)
+        mask = np.broadcast_to(condition.interpret_batch(env), results.shape).astype(bool)
+        if mask.any():
+            results[mask] = if_body.interpret_batch(self.select_batch(env, mask))
+        if not mask.all():
+            results[~mask] = else_body.interpret_batch(self.select_batch(env, ~mask))
+
+        return results
+
+
 
 """
 This class represents an if-then conditional statement in the DSL. It is
@@ -289,9 +855,11 @@ languages
 """
 class IT(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(IT, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, condition, if_body):
@@ -315,15 +883,35 @@ class IT(Node):
         return it_string
 
     def interpret(self, env):
-        condition = self.get_children()[0]
-        if_body = self.get_children()[1]
+        condition = self.children[0]
+        if_body = self.children[1]
 
         if condition.interpret(env):
             return if_body.interpret(env)
 
         return 'False'
+
+    def compile_statement(self, lines, indent, literals):
+        tab = '\t' * indent
+        condition = self.children[0]
+        if_body = self.children[1]
+
+        lines.append(f'{tab}if {condition.compile_expression(literals)}:')
+        if_body.compile_statement(lines, indent + 1, literals)
     
 
+    def interpret_batch(self, env):
+        condition = self.children[0]
+        if_body = self.children[1]
+
+        results = np.full(self.batch_len(env), 'False', dtype=object)
+        mask = np.broadcast_to(condition.interpret_batch(env), results.shape).astype(bool)
+        if mask.any():
+            results[mask] = if_body.interpret_batch(self.select_batch(env, mask))
+
+        return results
+
+
 """
 This class represents an if-then-else conditional statement in the 
 DSL. It is interpreted as the if-then-else conditional statements in
@@ -331,9 +919,11 @@ general-purpose programming languages.
 """
 class ITE(Node):
 
+    __slots__ = ()
+    max_number_children = 3
+
     def __init__(self):
         super(ITE, self).__init__()
-        self.max_number_children = 3
 
     @classmethod
     def new(cls, condition, if_body, else_body):
@@ -362,15 +952,41 @@ class ITE(Node):
         return ite_string
 
     def interpret(self, env):
-        condition = self.get_children()[0]
-        if_body = self.get_children()[1]
-        else_body = self.get_children()[2]
+        condition = self.children[0]
+        if_body = self.children[1]
+        else_body = self.children[2]
 
         if condition.interpret(env):
             return if_body.interpret(env)
         else:
             return else_body.interpret(env)
 
+    def compile_statement(self, lines, indent, literals):
+        tab = '\t' * indent
+        condition = self.children[0]
+        if_body = self.children[1]
+        else_body = self.children[2]
+
+        lines.append(f'{tab}if {condition.compile_expression(literals)}:')
+        if_body.compile_statement(lines, indent + 1, literals)
+        lines.append(f'{tab}else:')
+        else_body.compile_statement(lines, indent + 1, literals)
+
+    def interpret_batch(self, env):
+        condition = self.children[0]
+        if_body = self.children[1]
+        else_body = self.children[2]
+
+        results = np.empty(self.batch_len(env), dtype=object)
+        mask = np.broadcast_to(condition.interpret_batch(env), results.shape).astype(bool)
+        if mask.any():
+            results[mask] = if_body.interpret_batch(self.select_batch(env, mask))
+        if not mask.all():
+            results[~mask] = else_body.interpret_batch(self.select_batch(env, ~mask))
+
+        return results
+
+
 
 """
 This class implements a domain-specific function that returns
@@ -378,6 +994,7 @@ the direction in which the player is heading.
 """
 class PlayerDirection(Node):
 
+    __slots__ = ('max_number_children',)
     valid_children_types = 'empty'
 
     def __init__(self):
@@ -404,12 +1021,29 @@ class PlayerDirection(Node):
 
     def interpret(self, env):
         if self.valid_children_types != 'empty':
-            pos_index = self.get_children()[0]
-            direction = self.get_children()[1]
+            pos_index = self.children[0]
+            direction = self.children[1]
             return env[self.statename]['player_direction'][pos_index] == direction
 
         return env[self.statename]['player_direction']
 
+    def compile_expression(self, literals):
+        if self.valid_children_types != 'empty':
+            pos_index = Node.compile_literal(self.children[0], literals)
+            direction = Node.compile_literal(self.children[1], literals)
+            return f"(env.player_direction[{pos_index}] == {direction})"
+
+        return "env.player_direction"
+
+    def interpret_batch(self, env):
+        if self.valid_children_types != 'empty':
+            pos_index = self.children[0]
+            direction = self.children[1]
+            return env[self.statename]['player_direction'][:, pos_index] == direction
+
+        return env[self.statename]['player_direction']
+
+
 
 """
 This class implements a domain-specific function that returns
@@ -417,6 +1051,7 @@ the x-position of the player on the screen.
 """
 class PlayerPosition(Node):
 
+    __slots__ = ('max_number_children',)
     valid_children_types = 'empty'
 
     def __init__(self):
@@ -442,11 +1077,26 @@ class PlayerPosition(Node):
 
     def interpret(self, env):
         if self.valid_children_types != 'empty':
-            pos_index = self.get_children()[0]
+            pos_index = self.children[0]
             return env[self.statename]['player_position'][pos_index]
 
         return env[self.statename]['player_position']
 
+    def compile_expression(self, literals):
+        if self.valid_children_types != 'empty':
+            pos_index = Node.compile_literal(self.children[0], literals)
+            return f"env.player_position[{pos_index}]"
+
+        return "env.player_position"
+
+    def interpret_batch(self, env):
+        if self.valid_children_types != 'empty':
+            pos_index = self.children[0]
+            return env[self.statename]['player_position'][:, pos_index]
+
+        return env[self.statename]['player_position']
+
+
 
 """
 This class implements a domain-specific function that returns the
@@ -454,9 +1104,10 @@ velocity of the player on the screen.
 """
 class PlayerVelocity(Node):
 
+    __slots__ = ()
+
     def __init__(self):
         super(PlayerVelocity, self).__init__()
-        self.max_number_children = 0
 
     def to_string(self, indent=0):
         return PlayerVelocity.className()
@@ -464,6 +1115,13 @@ class PlayerVelocity(Node):
     def interpret(self, env):
         return env[self.statename]['player_velocity']
 
+    def compile_expression(self, literals):
+        return "env.player_velocity"
+
+    def interpret_batch(self, env):
+        return env[self.statename]['player_velocity']
+
+
 
 """
 This class implements a domain-specific function that returns
@@ -472,6 +1130,8 @@ screen
 """
 class NonPlayerDistToPlayer(Node):
 
+    __slots__ = ()
+
     def __init__(self):
         super(NonPlayerDistToPlayer, self).__init__()
 
@@ -481,6 +1141,13 @@ class NonPlayerDistToPlayer(Node):
     def interpret(self, env):
         return env[self.statename]['non_player_dist_to_player']
 
+    def compile_expression(self, literals):
+        return "env.non_player_dist_to_player"
+
+    def interpret_batch(self, env):
+        return env[self.statename]['non_player_dist_to_player']
+
+
 
 """
 This class implements a domain-specific function that returns
@@ -490,6 +1157,7 @@ the ball.
 """
 class NonPlayerObjectPosition(Node):
 
+    __slots__ = ('max_number_children',)
     valid_children_types = 'empty'
 
     def __init__(self):
@@ -515,21 +1183,37 @@ class NonPlayerObjectPosition(Node):
 
     def interpret(self, env):
         if self.valid_children_types != 'empty':
-            pos_index = self.get_children()[0]
+            pos_index = self.children[0]
             return env[self.statename]['non_player_position'][pos_index]
 
         return env[self.statename]['non_player_position']
 
+    def compile_expression(self, literals):
+        if self.valid_children_types != 'empty':
+            pos_index = Node.compile_literal(self.children[0], literals)
+            return f"env.non_player_position[{pos_index}]"
+
+        return "env.non_player_position"
+
+    def interpret_batch(self, env):
+        if self.valid_children_types != 'empty':
+            pos_index = self.children[0]
+            return env[self.statename]['non_player_position'][:, pos_index]
+
+        return env[self.statename]['non_player_position']
+
+
 
 """
 This class implements a DSF that returns True if the non-player
 object is moving towards the player and False otherwise.
 """
 class NonPlayerObjectApproaching(Node):
+
+    __slots__ = ()
     
     def __init__(self):
         super(NonPlayerObjectApproaching, self).__init__()
-        self.max_number_children = 0
 
     def to_string(self, indent=0):
         return NonPlayerObjectApproaching.className()
@@ -537,6 +1221,13 @@ class NonPlayerObjectApproaching(Node):
     def interpret(self, env):
         return env[self.statename]['non_player_approaching']
 
+    def compile_expression(self, literals):
+        return "env.non_player_approaching"
+
+    def interpret_batch(self, env):
+        return env[self.statename]['non_player_approaching']
+
+
 
 """
 This class implements an AST node representing a domain-specific scalar variable.
@@ -544,9 +1235,11 @@ For instance, the player's paddle width.
 """
 class VarScalar(Node):
 
+    __slots__ = ()
+    max_number_children = 1
+
     def __init__(self):
         super(VarScalar, self).__init__()
-        self.max_number_children = 1
         self.size = 0
 
     @classmethod
@@ -560,7 +1253,14 @@ class VarScalar(Node):
         return f"{self.get_children()[0]}"
 
     def interpret(self, env):
-        return env[self.get_children()[0]]
+        return env[self.children[0]]
+
+    def compile_expression(self, literals):
+        return Node.compile_env_access(self.children[0], literals)
+
+    def interpret_batch(self, env):
+        return env[self.children[0]]
+
 
 
 """
@@ -568,9 +1268,11 @@ This class implements an AST node represent a list variable
 """
 class VarArray(Node):
 
+    __slots__ = ()
+    max_number_children = 1
+
     def __init__(self):
         super(VarArray, self).__init__()
-        self.max_number_children = 1
         self.size = 0
 
     @classmethod
@@ -587,9 +1289,16 @@ class VarArray(Node):
         return array_name
 
     def interpret(self, env):
-        array_name = self.get_children()[0]
+        array_name = self.children[0]
         return env[array_name]
 
+    def compile_expression(self, literals):
+        return Node.compile_env_access(self.children[0], literals)
+
+    def interpret_batch(self, env):
+        return env[self.children[0]]
+
+
 
 """
 This class implements an AST node representing a domain-specific variable from
@@ -597,9 +1306,11 @@ an array. For example, actions[0]
 """
 class VarFromArray(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(VarFromArray, self).__init__()
-        self.max_number_children = 2
         self.size = 0
 
     @classmethod
@@ -619,13 +1330,29 @@ class VarFromArray(Node):
         return f"{name}[{index}]"
 
     def interpret(self, env):
-        name = self.get_children()[0]
-        index = self.get_children()[1]
+        name = self.children[0]
+        index = self.children[1]
         if isinstance(index, Node) or type(index).__name__ == Constant.className():
             index = index.interpret(env)
 
         return env[name][index]
 
+    def compile_expression(self, literals):
+        name = Node.compile_env_access(self.children[0], literals)
+        index = Node.compile_operand(self.children[1], literals)
+        return f"{name}[{index}]"
+
+    def interpret_batch(self, env):
+        name = self.children[0]
+        index = self.children[1]
+        if isinstance(index, Node):
+            index = index.interpret_batch(env)
+            if np.ndim(index) > 0:
+                return np.asarray(env[name], dtype=object)[index]
+
+        return env[name][index]
+
+
 
 """
 This class implements an AST node representing the '<' comparison
@@ -634,9 +1361,11 @@ method.
 """
 class LessThan(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(LessThan, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -650,7 +1379,16 @@ class LessThan(Node):
         return f"{self.get_children()[0].to_string()} < {self.get_children()[1].to_string()}"
 
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) < self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) < self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} < {right})"
+
+    def interpret_batch(self, env):
+        return self.children[0].interpret_batch(env) < self.children[1].interpret_batch(env)
+
 
 
 """
@@ -660,9 +1398,11 @@ method.
 """
 class GreaterThan(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(GreaterThan, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -676,7 +1416,16 @@ class GreaterThan(Node):
         return f"{self.get_children()[0].to_string()} > {self.get_children()[1].to_string()}"
 
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) > self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) > self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} > {right})"
+
+    def interpret_batch(self, env):
+        return self.children[0].interpret_batch(env) > self.children[1].interpret_batch(env)
+
 
 
 """
@@ -685,9 +1434,11 @@ operator
 """
 class EqualTo(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(EqualTo, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -701,7 +1452,16 @@ class EqualTo(Node):
         return f"{self.get_children()[0].to_string()} == {self.get_children()[1].to_string()}"
 
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) == self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) == self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} == {right})"
+
+    def interpret_batch(self, env):
+        return self.children[0].interpret_batch(env) == self.children[1].interpret_batch(env)
+
 
 
 """
@@ -709,9 +1469,11 @@ This class implements an AST node representing the addition operator.
 """
 class Plus(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(Plus, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -725,7 +1487,16 @@ class Plus(Node):
         return f"({self.get_children()[0].to_string()} + {self.get_children()[1].to_string()})"
 
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) + self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) + self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} + {right})"
+
+    def interpret_batch(self, env):
+        return self.children[0].interpret_batch(env) + self.children[1].interpret_batch(env)
+
 
 
 """
@@ -733,9 +1504,11 @@ This class implements an AST node representing the multiplication operator
 """
 class Times(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(Times, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -749,7 +1522,16 @@ class Times(Node):
         return f"({self.get_children()[0].to_string()} * {self.get_children()[1].to_string()})"
 
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) * self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) * self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} * {right})"
+
+    def interpret_batch(self, env):
+        return self.children[0].interpret_batch(env) * self.children[1].interpret_batch(env)
+
 
 
 """
@@ -757,9 +1539,11 @@ This class implements an AST node representing the minus operator
 """
 class Minus(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(Minus, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -773,7 +1557,16 @@ class Minus(Node):
         return f"({self.get_children()[0].to_string()} - {self.get_children()[1].to_string()})"
 
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) - self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) - self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} - {right})"
+
+    def interpret_batch(self, env):
+        return self.children[0].interpret_batch(env) - self.children[1].interpret_batch(env)
+
 
 
 """
@@ -781,9 +1574,11 @@ This class implements an AST node representing the integer division operator
 """
 class Divide(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(Divide, self).__init__()
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, left, right):
@@ -798,7 +1593,23 @@ class Divide(Node):
 
     
     def interpret(self, env):
-        return self.get_children()[0].interpret(env) // self.get_children()[1].interpret(env)
+        return self.children[0].interpret(env) // self.children[1].interpret(env)
+
+    def compile_expression(self, literals):
+        left = self.children[0].compile_expression(literals)
+        right = self.children[1].compile_expression(literals)
+        return f"({left} // {right})"
+
+    def interpret_batch(self, env):
+        left = self.children[0].interpret_batch(env)
+        right = self.children[1].interpret_batch(env)
+
+        # NumPy returns inf on division by zero while interpret raises
+        if np.any(np.asarray(right) == 0):
+            raise ZeroDivisionError('integer division or modulo by zero')
+
+        return np.floor_divide(left, right)
+
 
 
 """
@@ -806,10 +1617,12 @@ This class implements the initial symbol of the DSL.
 """
 class Strategy(Node):
 
+    __slots__ = ()
+    max_number_children = 2
+
     def __init__(self):
         super(Strategy, self).__init__()
         self.size = 0
-        self.max_number_children = 2
 
     @classmethod
     def new(cls, statement, next_statements):
@@ -836,8 +1649,8 @@ class Strategy(Node):
         return strategy_string
 
     def interpret(self, env):
-        statement = self.get_children()[0]
-        next_statements = self.get_children()[1]
+        statement = self.children[0]
+        next_statements = self.children[1]
 
         res = statement.interpret(env)
         if res == 'False' and next_statements is not None:
@@ -845,6 +1658,31 @@ class Strategy(Node):
 
         return res
 
+    def compile_statement(self, lines, indent, literals):
+        statement = self.children[0]
+        next_statements = self.children[1]
+
+        # falling through the statement is equivalent to it returning 'False'
+        statement.compile_statement(lines, indent, literals)
+        if next_statements is not None:
+            next_statements.compile_statement(lines, indent, literals)
+
+    def interpret_batch(self, env):
+        statement = self.children[0]
+        next_statements = self.children[1]
+
+        results = statement.interpret_batch(env)
+        if next_statements is not None:
+            pending = results == 'False'
+            if pending.any():
+                results[pending] = next_statements.interpret_batch(self.select_batch(env, pending))
+
+        return results
+
+
+# Nodes whose size only counts their children, see Node.check_correct_size
+size_zero_nodes = (Strategy, Constant, VarScalar, VarArray, VarFromArray)
+
 
 # Node.valid_children_types = [set([Strategy.className(), ITE.className()])]
 
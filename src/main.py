@@ -36,6 +36,17 @@ def total_games_int(string):
     except:
         raise argparse.ArgumentTypeError('Total games value has to be between 2 and 1000')
 
+def node_weights_dict(string):
+    try:
+        node_weights = {}
+        for item in string.split(','):
+            kind, weight = item.split('=')
+            node_weights[kind.strip()] = float(weight)
+            assert node_weights[kind.strip()] >= 0
+        return node_weights
+    except:
+        raise argparse.ArgumentTypeError('Mutation weights have to be given as Kind=weight pairs separated by commas, e.g. Constant=4,GreaterThan=2')
+
 
 def main():
 
@@ -46,12 +57,27 @@ def main():
             epilog='Happy Synthesizing! :-)'
     )
 
-    parser.add_argument('--eval-type', choices=['CHEBY', 'NORMAL', 'BATCH'], dest='eval_config_type',
+    parser.add_argument('--eval-type', choices=['CHEBY', 'NORMAL', 'BATCH', 'BERNSTEIN', 'SEQUENTIAL', 'PAIRED'], dest='eval_config_type',
                         default='NORMAL', help='Run batch evaluation')
 
+    parser.add_argument('--action-repeat', type=int, nargs='?', const=None, default=1, dest='action_repeat', metavar='K',
+                        help='Repeat each action for K frames, or for the default of the game if K is omitted')
+
+    parser.add_argument('--cache', action='store_true', dest='use_cache',
+                        help='Reuse the scores of programs that were already evaluated')
+
+    parser.add_argument('--cache-file', action='store', dest='cache_filepath', metavar='FILE',
+                        help='Load the evaluation cache from FILE and save it back after the search. Implies --cache')
+
+    parser.add_argument('--chains', type=int, action='store', dest='chains', default=1,
+                        help='Number of simulated annealing chains run in parallel')
+
     parser.add_argument('--config', action='store', dest='config_name', default='sa_default',
                         help='Configuration name for the synthesizer. Used with -mr option.')
 
+    parser.add_argument('--exchange-interval', type=int, action='store', dest='exchange_interval', default=60,
+                        metavar='SECONDS', help='Seconds between exchanges of the best program. Used with --chains')
+
     parser.add_argument('-g', '--game', choices=available_games.keys(), dest='game', default='Catcher',
                         help='Game for which a strategy will be synthesized')
 
@@ -61,9 +87,15 @@ def main():
     parser.add_argument('-l', '--log', action='store', dest='log_file', default='log',
                         help='Name of log file in which results of search will be stored')
 
+    parser.add_argument('--lockstep', type=int, action='store', dest='lockstep_games', default=1,
+                        help='Number of games played in lockstep by each evaluation')
+
     parser.add_argument('-mr', '--multi', type=int, action='store', dest='runs',
                         help='Run synthesizer multi-times. Must specify a config name')
 
+    parser.add_argument('--mutation-weights', type=node_weights_dict, dest='node_weights', metavar='KIND=W,...',
+                        help='Weights of the node kinds when SA chooses the node to mutate, e.g. Constant=4,GreaterThan=2')
+
     parser.add_argument('--no-warn', action='store_true', dest='hide_warning',
                         help='Hide warning messages')
 
@@ -88,6 +120,12 @@ def main():
     parser.add_argument('--plot-name', action='store', dest='plot_filename', default='plot_file',
                         help='Name of file storing the plotted figure if --plot is specified')
     
+    parser.add_argument('--sa-batch', type=int, action='store', dest='sa_batch_size', default=1, metavar='K',
+                        help='Number of mutated programs evaluated at the same time by simulated annealing')
+
+    parser.add_argument('--sa-race', type=int, action='store', dest='sa_race_size', default=1, metavar='K',
+                        help='Number of mutated programs raced against each other by simulated annealing. Overrides --sa-batch')
+
     parser.add_argument('--sa-option', type=int, choices=[1, 2], dest='sa_option', default=1,
                         help='Option 1 makes it less likely for SA to be stuck in a local max')
 
@@ -97,6 +135,9 @@ def main():
     parser.add_argument('--score', type=float, action='store', dest='score_threshold', default=200.00,
                         help='Initial score threshold to be achieved by programs synthesized with BUS')
 
+    parser.add_argument('--seed', type=int, action='store', dest='seed', default=None,
+                        help='Play the games of every program with the same seeds, drawn from SEED. Implied by --eval-type PAIRED')
+
     parser.add_argument('-s', '-S','--search', action='store', dest='search_algorithm',
                         default='SimulatedAnnealing',
                         help='Search Algorithm (Simulated Annealing or Bottom-Up Search)')
@@ -137,6 +178,16 @@ def main():
     total_games = parameters.total_games
     triage_eval = parameters.triage_eval
     eval_config_name = parameters.eval_config_type
+    lockstep_games = parameters.lockstep_games
+    use_cache = parameters.use_cache
+    cache_filepath = parameters.cache_filepath
+    chains = parameters.chains
+    exchange_interval = parameters.exchange_interval
+    sa_batch_size = parameters.sa_batch_size
+    sa_race_size = parameters.sa_race_size
+    seed = parameters.seed
+    action_repeat = parameters.action_repeat
+    node_weights = parameters.node_weights
     runs = parameters.runs
     if runs is None:
         runs = 1
@@ -196,7 +247,17 @@ def main():
             plot_filename,
             ibr,
             total_games,
-            multi_runs.copy()
+            multi_runs.copy(),
+            lockstep_games=lockstep_games,
+            use_cache=use_cache,
+            cache_filepath=cache_filepath,
+            chains=chains,
+            exchange_interval=exchange_interval,
+            sa_batch_size=sa_batch_size,
+            sa_race_size=sa_race_size,
+            node_weights=node_weights,
+            seed=seed,
+            action_repeat=action_repeat
         )
 
     if algorithm == 'BUS':
@@ -0,0 +1,51 @@
+import unittest
+import random
+import src.dsl as dsl
+from src.dsl import *
+from src.Utils.dsl_config import DslConfig
+
+class TestCompiledGrammar(unittest.TestCase):
+
+    def setUp(self):
+        # The grammar is set at class level, so it is restored after each test
+        self.grammar_state = {}
+        for name, cls in vars(dsl).items():
+            if isinstance(cls, type) and issubclass(cls, Node):
+                self.grammar_state[cls] = cls.valid_children_types
+
+        dsl_config = DslConfig('./src/dsl_config.json')
+        dsl_config.init_valid_children_types('Catcher')
+        grammar = dsl_config.get_grammar('Catcher')
+        VarScalar.valid_children_types = [set(grammar['scalars'])]
+        Constant.valid_children_types = [set(grammar['constants'])]
+        self.grammar = dsl_config.compile_grammar()
+
+    def tearDown(self):
+        for cls, valid_children_types in self.grammar_state.items():
+            cls.valid_children_types = valid_children_types
+
+    def test_choices(self):
+        self.assertEqual(set(self.grammar.choices[Node][0]), {Strategy, ITE})
+        self.assertEqual(set(self.grammar.choices[Strategy][1]), {Strategy, ReturnAction, None},
+            'class names should be resolved and values kept')
+        self.assertEqual(set(self.grammar.choices[ReturnAction][0]), {0, 1, 2})
+
+    def test_terminals(self):
+        self.assertEqual(set(self.grammar.terminals[Plus][0]), {Constant, VarScalar, NonPlayerObjectPosition, PlayerPosition})
+        self.assertEqual(set(self.grammar.terminals[Strategy][1]), {None})
+        self.assertEqual(self.grammar.terminals[IT][0], (), 'comparisons are not terminals')
+
+    def test_random_terminal(self):
+        random.seed(0)
+        for _ in range(20):
+            self.assertIsInstance(self.grammar.random_terminal(IT, 1), ReturnAction,
+                'a random child should be returned when a slot has no terminal')
+            self.assertIn(type(self.grammar.random_terminal(GreaterThan, 0)), (Constant, VarScalar, NonPlayerObjectPosition, PlayerPosition))
+
+    def test_arity(self):
+        self.assertEqual(self.grammar.arity[ITE], 3)
+        self.assertEqual(self.grammar.arity[PlayerPosition], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import random
+import numpy as np
+from src.dsl import *
+
+class TestInterpretBatch(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+        random.seed(0)
+
+        self.envs = []
+        for _ in range(50):
+            env = {}
+            env['state'] = {}
+            env['state']['player_position'] = random.randint(0, 500)
+            env['state']['non_player_position'] = random.randint(0, 500)
+            env['state']['non_player_approaching'] = random.choice([True, False])
+            env['paddle_width'] = 50
+            env['actions'] = [97, 100, None]
+            self.envs.append(env)
+
+        self.batch_env = Node.batch_env(self.envs)
+
+    def assert_same_as_interpret(self, program):
+        results = program.interpret_batch(self.batch_env)
+        self.assertEqual(len(results), len(self.envs), 'interpret_batch should return one action per game')
+
+        for env, result in zip(self.envs, results):
+            self.assertEqual(result, program.interpret(env), 'interpret_batch should agree with interpret')
+
+    def test_strategy(self):
+        program = Strategy.new(
+            IT.new(
+                GreaterThan.new(NonPlayerObjectPosition(), Plus.new(PlayerPosition(), Times.new(VarScalar.new('paddle_width'), Constant.new(0.5)))),
+                ReturnAction.new(VarFromArray.new('actions', 1))
+            ),
+            Strategy.new(
+                IT.new(
+                    LessThan.new(NonPlayerObjectPosition(), Minus.new(PlayerPosition(), Divide.new(VarScalar.new('paddle_width'), Constant.new(2)))),
+                    ReturnAction.new(VarFromArray.new('actions', 0))
+                ),
+                None
+            )
+        )
+        self.assert_same_as_interpret(program)
+
+    def test_ite(self):
+        program = ITE.new(
+            NonPlayerObjectApproaching(),
+            ReturnAction.new(VarFromArray.new('actions', 0)),
+            ReturnAction.new(VarFromArray.new('actions', 2))
+        )
+        self.assert_same_as_interpret(program)
+
+    def test_nested_ite(self):
+        program = NestedITEDepth1.new(
+            EqualTo.new(Constant.new(1), Constant.new(1)),
+            Strategy.new(
+                IT.new(LessThan.new(PlayerPosition(), NonPlayerObjectPosition()), ReturnAction.new(VarFromArray.new('actions', 0))),
+                None
+            ),
+            ReturnAction.new(VarFromArray.new('actions', 1))
+        )
+        self.assert_same_as_interpret(program)
+
+    def test_indexed_positions(self):
+        NonPlayerObjectPosition.valid_children_types = [set([0, 1])]
+        for env in self.envs:
+            env['state']['non_player_position'] = [random.randint(0, 500), random.randint(0, 500)]
+        self.batch_env = Node.batch_env(self.envs)
+
+        program = ITE.new(
+            GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition.new(1)),
+            ReturnAction.new(VarFromArray.new('actions', 0)),
+            ReturnAction.new(VarFromArray.new('actions', 1))
+        )
+        self.assert_same_as_interpret(program)
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+
+    def test_divide_by_zero(self):
+        program = ReturnAction.new(VarFromArray.new('actions', Divide.new(PlayerPosition(), Constant.new(0))))
+        with self.assertRaises(ZeroDivisionError, msg='interpret_batch should raise ZeroDivisionError'):
+            program.interpret_batch(self.batch_env)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from src.dsl import *
+
+class TestCompile(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+
+        self.env = GameEnv()
+        self.env.actions = ['LEFT', 'RIGHT', None]
+        self.env.paddle_width = 100
+
+        """
+        if NonPlayerObjectPosition > (PlayerPosition + (paddle_width * 0.5)):
+            return actions[1]
+        if NonPlayerObjectPosition < (PlayerPosition - (paddle_width // 2)):
+            return actions[0]
+        return actions[2]
+        """
+        self.program = Strategy.new(
+            IT.new(
+                GreaterThan.new(NonPlayerObjectPosition(), Plus.new(PlayerPosition(), Times.new(VarScalar.new('paddle_width'), Constant.new(0.5)))),
+                ReturnAction.new(VarFromArray.new('actions', 1))
+            ),
+            Strategy.new(
+                IT.new(
+                    LessThan.new(NonPlayerObjectPosition(), Minus.new(PlayerPosition(), Divide.new(VarScalar.new('paddle_width'), Constant.new(2)))),
+                    ReturnAction.new(VarFromArray.new('actions', 0))
+                ),
+                ReturnAction.new(VarFromArray.new('actions', 2))
+            )
+        )
+
+    def set_positions(self, player_position, non_player_position):
+        self.env.player_position = player_position
+        self.env.non_player_position = non_player_position
+
+    def test_same_actions_as_interpret(self):
+        strategy = self.program.compile()
+        for positions in [(35, 100), (100, 35), (50, 50), (0, 500)]:
+            self.set_positions(*positions)
+            self.assertEqual(strategy(self.env), self.program.interpret(self.env),
+                'compiled program should return the same action as interpret')
+
+    def test_no_statement_fires(self):
+        program = Strategy.new(
+            IT.new(EqualTo.new(PlayerPosition(), Constant.new(1)), ReturnAction.new(VarFromArray.new('actions', 0))),
+            None
+        )
+        self.set_positions(0, 0)
+        self.assertEqual(program.compile()(self.env), 'False', 'compiled program should return False')
+
+    def test_ite(self):
+        program = ITE.new(
+            GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()),
+            ReturnAction.new(VarFromArray.new('actions', 0)),
+            ReturnAction.new(VarFromArray.new('actions', 1))
+        )
+        strategy = program.compile()
+
+        self.set_positions(10, 0)
+        self.assertEqual(strategy(self.env), 'LEFT', 'compiled ITE should return LEFT')
+
+        self.set_positions(0, 10)
+        self.assertEqual(strategy(self.env), 'RIGHT', 'compiled ITE should return RIGHT')
+
+    def test_nested_ite_does_not_fall_through(self):
+        if_body = Strategy.new(
+            IT.new(LessThan.new(PlayerPosition(), Constant.new(0)), ReturnAction.new(VarFromArray.new('actions', 0))),
+            None
+        )
+        program = NestedITEDepth1.new(
+            GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()),
+            if_body,
+            ReturnAction.new(VarFromArray.new('actions', 1))
+        )
+        self.set_positions(10, 0)
+        self.assertEqual(program.compile()(self.env), program.interpret(self.env),
+            'compiled NestedITEDepth1 should not fall through to the else body')
+
+    def test_for_each_resets_loop_variable(self):
+        loop_body = Strategy.new(
+            IT.new(EqualTo.new(PlayerPosition(), Constant.new(1)), ReturnAction.new(VarFromArray.new('actions', 0))),
+            None
+        )
+        program = ForEach.new(VarArray.new('actions'), loop_body)
+        self.set_positions(1, 0)
+
+        self.assertEqual(program.compile()(self.env), 'LEFT', 'compiled ForEach should return LEFT')
+        self.assertIsNone(self.env.loop, 'compiled ForEach should reset the loop variable')
+
+    def test_divide_by_zero(self):
+        program = ReturnAction.new(VarFromArray.new('actions', Divide.new(PlayerPosition(), Constant.new(0))))
+        self.set_positions(1, 0)
+
+        with self.assertRaises(ZeroDivisionError, msg='compiled Divide should raise ZeroDivisionError'):
+            program.compile()(self.env)
+
+
+if __name__ == '__main__':
+    unittest.main()
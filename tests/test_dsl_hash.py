@@ -0,0 +1,101 @@
+import unittest
+import subprocess
+import sys
+from src.dsl import *
+
+class TestStructuralHash(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+
+    def new_program(self, constant=0.5, action=1):
+        return Strategy.new(
+            IT.new(
+                GreaterThan.new(NonPlayerObjectPosition(), Plus.new(PlayerPosition(), Times.new(VarScalar.new('paddle_width'), Constant.new(constant)))),
+                ReturnAction.new(VarFromArray.new('actions', action))
+            ),
+            None
+        )
+
+    def test_same_program_same_hash(self):
+        p1 = self.new_program()
+        p2 = self.new_program()
+        self.assertEqual(p1.get_hash(), p2.get_hash(), 'identical programs should have the same hash')
+        self.assertTrue(p1.equals(p2), 'identical programs should be equal')
+
+    def test_different_programs(self):
+        p = self.new_program()
+        for other in [self.new_program(constant=0.25), self.new_program(action=0), self.new_program(constant=1)]:
+            self.assertNotEqual(p.get_hash(), other.get_hash(), f'{other.to_string()} should not have the same hash')
+            self.assertFalse(p.equals(other), f'{other.to_string()} should not be equal')
+
+    def test_child_order_matters(self):
+        left = Plus.new(PlayerPosition(), NonPlayerObjectPosition())
+        right = Plus.new(NonPlayerObjectPosition(), PlayerPosition())
+        self.assertNotEqual(left.get_hash(), right.get_hash(), 'operand order should change the hash')
+
+    def test_children_do_not_cancel_out(self):
+        x = PlayerPosition()
+        y = NonPlayerObjectPosition()
+        nested = Minus.new(x, Minus.new(PlayerPosition(), y))
+        self.assertNotEqual(nested.get_hash(), y.get_hash(), 'a child repeated twice should not cancel out')
+
+        rest = self.new_program(action=0)
+        strategy = Strategy.new(self.new_program().get_children()[0], Strategy.new(self.new_program().get_children()[0], rest))
+        self.assertNotEqual(strategy.get_hash(), rest.get_hash(), 'a statement repeated twice should not cancel out')
+
+    def test_keys(self):
+        p = self.new_program()
+        self.assertEqual(p.get_key(), self.new_program().get_key())
+        for other in [self.new_program(constant=0.25), self.new_program(action=0)]:
+            self.assertNotEqual(p.get_key(), other.get_key())
+
+        self.assertNotEqual(Constant.new(1).get_key(), Constant.new(1.0).get_key(), 'literals of different types should have different keys')
+
+    def test_node_keys(self):
+        p = self.new_program()
+        table = {NodeKey(p): 1}
+        self.assertEqual(table.get(NodeKey(self.new_program())), 1, 'identical programs should have equal node keys')
+        for other in [self.new_program(constant=0.25), self.new_program(action=0)]:
+            self.assertNotIn(NodeKey(other), table)
+
+        # Programs whose hashes collide are told apart by equals
+        other = self.new_program(constant=0.25)
+        other.hash = p.hash
+        self.assertEqual(hash(NodeKey(other)), hash(NodeKey(p)))
+        self.assertNotIn(NodeKey(other), table)
+        self.assertNotIn(NodeKey(Constant.new(1.0)), {NodeKey(Constant.new(1)): 1},
+            'literals of different types should have different node keys')
+
+    def test_replace_child(self):
+        p = Plus.new(PlayerPosition(), Constant.new(1))
+        p.replace_child(Constant.new(2), 1)
+        self.assertEqual(p.get_hash(), Plus.new(PlayerPosition(), Constant.new(2)).get_hash(),
+            'replace_child should update the hash')
+
+    def test_check_correct_size_refreshes_hash(self):
+        p = self.new_program()
+        constant = p.get_children()[0].get_children()[0].get_children()[1].get_children()[1].get_children()[1]
+        constant.replace_child(0.25, 0)
+        p.check_correct_size()
+        self.assertEqual(p.get_hash(), self.new_program(constant=0.25).get_hash(),
+            'check_correct_size should refresh the hashes of the ancestors')
+
+    def test_hash_independent_of_hash_seed(self):
+        code = 'from src.dsl import *; print(Plus.new(VarScalar.new("paddle_width"), Constant.new(0.5)).get_hash())'
+        hashes = set()
+        for seed in ['1', '2']:
+            output = subprocess.run(
+                [sys.executable, '-c', code],
+                env={'PYTHONHASHSEED': seed, 'PYGAME_HIDE_SUPPORT_PROMPT': '1'},
+                capture_output=True,
+                text=True
+            )
+            hashes.add(output.stdout.strip())
+
+        self.assertEqual(len(hashes), 1, 'hashes should not depend on PYTHONHASHSEED')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import copy
+import os
+import tempfile
+from src.dsl import *
+from src.Evaluation.evaluation_cache import EvaluationCache
+
+class ConfigStub:
+    pass
+
+class EvaluationStub:
+
+    def __init__(self, total_games):
+        self.eval_config = ConfigStub()
+        self.total_games = total_games
+
+    def get_total_games(self):
+        return self.total_games
+
+    def get_seed_key(self):
+        return None
+
+    def get_action_repeat(self):
+        return 1
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+
+        self.evaluation = EvaluationStub(3)
+        self.programs = [
+            ITE.new(
+                GreaterThan.new(NonPlayerObjectPosition(), Plus.new(PlayerPosition(), Constant.new(c))),
+                ReturnAction.new(VarFromArray.new('actions', 1)),
+                ReturnAction.new(VarFromArray.new('actions', 0))
+            )
+            for c in range(5)
+        ]
+
+    def test_get_and_put(self):
+        cache = EvaluationCache()
+        key = cache.get_key(self.programs[0], self.evaluation)
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, [1, 2, 3], 2)
+        self.assertEqual(cache.get(key), ((1, 2, 3), 2))
+        self.assertEqual(cache.get_hit_rate(), 0.5)
+
+    def test_key_depends_on_structure_and_config(self):
+        cache = EvaluationCache()
+        key = cache.get_key(self.programs[0], self.evaluation)
+        self.assertEqual(key, cache.get_key(copy.deepcopy(self.programs[0]), self.evaluation),
+            'equal programs should have the same key')
+        self.assertNotEqual(key, cache.get_key(self.programs[1], self.evaluation),
+            'programs with different constants should have different keys')
+        self.assertNotEqual(key, cache.get_key(self.programs[0], EvaluationStub(10)),
+            'evaluations playing a different number of games should have different keys')
+
+    def test_key_ignores_hash_collisions(self):
+        cache = EvaluationCache()
+        key = cache.get_key(self.programs[0], self.evaluation)
+        cache.put(key, [1, 2, 3], 2)
+
+        # Different programs may share a structural hash, but never a key
+        self.programs[1].hash = self.programs[0].get_hash()
+        self.assertIsNone(cache.get(cache.get_key(self.programs[1], self.evaluation)))
+
+    def test_least_recently_used_evicted(self):
+        cache = EvaluationCache(max_size=3)
+        keys = [cache.get_key(p, self.evaluation) for p in self.programs]
+        for key in keys[:3]:
+            cache.put(key, [0], 0)
+
+        cache.get(keys[0])
+        cache.put(keys[3], [0], 0)
+
+        self.assertEqual(cache.get_size(), 3)
+        self.assertIsNotNone(cache.get(keys[0]), 'recently used entries should be kept')
+        self.assertIsNone(cache.get(keys[1]), 'the least recently used entry should be evicted')
+
+    def test_save_and_load(self):
+        cache = EvaluationCache()
+        key = cache.get_key(self.programs[0], self.evaluation)
+        cache.put(key, [1, 2, 3], 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'cache')
+            cache.save(filepath)
+            warm_cache = EvaluationCache(filepath=filepath)
+
+        self.assertEqual(warm_cache.get(key), ((1, 2, 3), 2), 'a loaded cache should hold the saved entries')
+
+
+if __name__ == '__main__':
+    unittest.main()
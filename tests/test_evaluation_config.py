@@ -0,0 +1,91 @@
+import unittest
+from statistics import variance
+from src.Evaluation.EvaluationConfig.evaluation_config import *
+
+MIN_SCORE = -1_000_000
+
+class TestEvaluationConfig(unittest.TestCase):
+
+    def get_config(self, config_name, best_scores, total_games=30, var_bound=500):
+        attributes = form_basic_attr_dict(True, var_bound, 0.95, total_games, sum(best_scores) / len(best_scores), MIN_SCORE, 5)
+        config = EvaluationConfigFactory().get_config(config_name, attributes)
+        config.set_best_eval_variance(variance(best_scores))
+        config.set_best_eval_range(max(best_scores) - min(best_scores))
+        return config
+
+    def play(self, config, scores):
+        config.clean_up()
+        played = []
+        for score in scores:
+            played.append(score)
+            result = config.compute_result(played, len(played))
+            if not config.check_continue(result, len(played)):
+                return len(played)
+
+    def test_factory(self):
+        best_scores = [100, 120] * 15
+        self.assertIsInstance(self.get_config('BERNSTEIN', best_scores), EvaluationConfigBernstein)
+        self.assertIsInstance(self.get_config('SEQUENTIAL', best_scores), EvaluationConfigSequential)
+        self.assertIsInstance(self.get_config('PAIRED', best_scores), EvaluationConfigPaired)
+
+    def test_hopeless_program_stopped_early(self):
+        best_scores = [400, 500] * 15
+        hopeless_scores = [-3] * 30
+        for config_name in ['BERNSTEIN', 'SEQUENTIAL']:
+            config = self.get_config(config_name, best_scores)
+            self.assertEqual(self.play(config, hopeless_scores), 5, config_name)
+
+        self.assertGreater(self.play(self.get_config('NORMAL', best_scores), hopeless_scores), 5)
+        self.assertEqual(self.play(self.get_config('NORMAL', best_scores, var_bound=1000), hopeless_scores), 30,
+            'the Hoeffding bound should depend on the range given by the user')
+        self.assertEqual(self.play(self.get_config('BERNSTEIN', best_scores, var_bound=1000), hopeless_scores), 5)
+
+    def test_equal_scores_not_stopped(self):
+        best_scores = [1] * 20
+        for config_name in ['BERNSTEIN', 'SEQUENTIAL']:
+            config = self.get_config(config_name, best_scores, total_games=20, var_bound=1)
+            self.assertEqual(self.play(config, [1] * 20), 20, config_name)
+
+    def test_good_program_not_stopped(self):
+        best_scores = [400, 500] * 15
+        for config_name in ['BERNSTEIN', 'SEQUENTIAL']:
+            config = self.get_config(config_name, best_scores)
+            self.assertEqual(self.play(config, [300, 600] * 15), 30, config_name)
+            self.assertEqual(self.play(config, [600, 0] * 15), 30, config_name)
+
+    def test_sequential_bound_is_wider(self):
+        best_scores = [400, 500] * 15
+        bernstein = self.get_config('BERNSTEIN', best_scores)
+        sequential = self.get_config('SEQUENTIAL', best_scores)
+        for games_played in [2, 10, 30]:
+            self.assertLess(bernstein.get_program_log_term(games_played), sequential.get_program_log_term(games_played))
+
+        self.assertEqual(bernstein.get_log_term(), sequential.get_log_term(),
+            'the bound of the best program should not depend on the config')
+
+    def test_paired_triage(self):
+        # The scores vary a lot from one game to the next, but the program always
+        # scores 20 less than the best program on the same game
+        best_scores = [100 * (i % 7) for i in range(30)]
+        scores = [score - 20 for score in best_scores]
+
+        paired = self.get_config('PAIRED', best_scores)
+        paired.set_best_scores(best_scores)
+        self.assertEqual(self.play(paired, scores), 5)
+        self.assertEqual(self.play(self.get_config('BERNSTEIN', best_scores), scores), 30)
+
+        better_scores = [score + 1 for score in best_scores]
+        self.assertEqual(self.play(paired, better_scores), 30)
+
+        # Without the scores of the best program, the unpaired triage is used
+        paired.set_best_scores(None)
+        self.assertEqual(self.play(paired, scores), 30)
+
+    def test_no_triage(self):
+        attributes = form_basic_attr_dict(False, None, None, 10, 500, MIN_SCORE, 5)
+        config = EvaluationConfigFactory().get_config('SEQUENTIAL', attributes)
+        self.assertEqual(self.play(config, [-3] * 10), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
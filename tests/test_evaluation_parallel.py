@@ -0,0 +1,85 @@
+import unittest
+import os
+from src.dsl import *
+from src.Evaluation.evaluation_parent import *
+
+MIN_SCORE = -1_000_000
+
+class EvaluationEpisodes(Evaluation):
+    # The score of a game is the episode at which it was played, plus the action taken
+
+    def __init__(self, score_threshold, eval_config):
+        super(EvaluationEpisodes, self).__init__(score_threshold, eval_config)
+        self.env = GameEnv()
+        self.game_episode = None
+        self.ticks = 0
+        self.score = 0
+
+    def init_game(self):
+        self.game_episode = self.episode
+        self.episode += 1
+        self.ticks = 0
+        self.score = 0
+
+    def game_over(self):
+        return self.ticks >= 3
+
+    def play(self, strategy):
+        self.env.player_position = self.game_episode
+        self.env.actions = [0, 1, None]
+        self.ticks += 1
+        self.score = 10 * self.game_episode + strategy(self.env)
+        return self.score
+
+
+def get_pid(_):
+    return os.getpid()
+
+
+class TestEvaluateParallel(unittest.TestCase):
+
+    def setUp(self):
+        attributes = form_basic_attr_dict(False, None, None, 12, MIN_SCORE, MIN_SCORE, None)
+        self.evaluation = EvaluationEpisodes(0, EvaluationConfigFactory().get_config('NORMAL', attributes))
+        self.evaluation.set_best(None, MIN_SCORE, None)
+        self.evaluation.set_pool_workers(2)
+
+    def tearDown(self):
+        self.evaluation.shutdown_pool()
+
+    def test_scores_in_episode_order(self):
+        self.assertIsNone(self.evaluation.pool_size)
+
+        for action in [1, 0]:
+            program = ReturnAction.new(VarFromArray.new('actions', action))
+            scores, result = self.evaluation.evaluate_parallel(program, verbose=True)
+            self.assertEqual(scores, [10 * episode + action for episode in range(12)])
+            self.assertEqual(result, round(sum(scores) / 12, 2))
+            self.assertEqual(self.evaluation.get_total_games(), 12)
+
+    def test_pool_reused(self):
+        program = ReturnAction.new(VarFromArray.new('actions', 1))
+        self.evaluation.evaluate_parallel(program)
+        pool = self.evaluation.pool
+        pids = set(pool.map(get_pid, range(8)))
+
+        self.evaluation.evaluate_parallel(ReturnAction.new(VarFromArray.new('actions', 0)))
+        self.assertIs(self.evaluation.pool, pool, 'the pool should be kept between evaluations')
+        self.assertEqual(self.evaluation.pool_size, 2)
+        pids.update(pool.map(get_pid, range(8)))
+        self.assertLessEqual(len(pids), 2, 'the workers should be kept between evaluations')
+
+    def test_submit_evaluation(self):
+        program = ReturnAction.new(VarFromArray.new('actions', 1))
+        futures = [self.evaluation.submit_evaluation(program) for _ in range(3)]
+        for future in futures:
+            scores, result = self.evaluation.collect_evaluation(program, future)
+            self.assertEqual(list(scores), [10 * episode + 1 for episode in range(12)])
+
+        # The workers are back to playing single games for evaluate_parallel
+        scores = self.evaluation.evaluate_parallel(ReturnAction.new(VarFromArray.new('actions', 0)), verbose=True)[0]
+        self.assertEqual(scores, [10 * episode for episode in range(12)])
+
+
+if __name__ == '__main__':
+    unittest.main()
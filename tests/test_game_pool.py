@@ -0,0 +1,73 @@
+import unittest
+import random
+from src.Evaluation.game_pool import GamePool
+
+class GameStub:
+    # Every random draw of an episode comes from the random state handed to the game
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.positions = None
+
+    def reset(self):
+        self.positions = [self.rng.randint(0, 500) for _ in range(5)]
+
+    def play(self):
+        # The episode keeps drawing from the random state after the reset
+        return self.positions + [self.rng.random() for _ in range(5)]
+
+
+class PLEStub:
+
+    def __init__(self, game):
+        self.game = game
+        self.game.reset()
+
+    def reset_game(self):
+        self.game.reset()
+
+
+def make_game(seed):
+    game = GameStub(seed)
+    return game, PLEStub(game)
+
+
+class TestGamePool(unittest.TestCase):
+
+    def test_reset_game_same_as_new_game(self):
+        seeds = iter([3, 17, 3, 42])
+        made = []
+
+        def make_counted_game(seed):
+            made.append(seed)
+            return make_game(seed)
+
+        pool = GamePool(make_counted_game, lambda: next(seeds))
+        game, p = pool.acquire()
+        self.assertEqual(game.play(), make_game(3)[0].play())
+        pool.release(game, p)
+
+        for seed in [17, 3, 42]:
+            reused_game, reused_p = pool.acquire()
+            self.assertIs(reused_game, game, 'released games should be reused')
+            self.assertEqual(reused_game.play(), make_game(seed)[0].play(),
+                'a reused game should play the same episode as a new game with the same seed')
+            pool.release(reused_game, reused_p)
+
+        self.assertEqual(made, [3])
+        self.assertEqual(pool.get_free_count(), 1)
+
+    def test_games_in_use_not_shared(self):
+        pool = GamePool(make_game, lambda: 0)
+        games = [pool.acquire() for _ in range(3)]
+        self.assertEqual(len(set(id(game) for game, _ in games)), 3)
+
+        for game, p in games:
+            pool.release(game, p)
+        self.assertEqual(pool.get_free_count(), 3)
+        self.assertIn(pool.acquire(), games)
+        self.assertEqual(pool.get_free_count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import random
+import importlib.util
+from statistics import variance
+from src.dsl import *
+from src.Evaluation.EvaluationConfig.evaluation_config import *
+from src.Evaluation.seed_schedule import SeedSchedule
+
+# evaluation_ple imports the PLE games, but the games played here are stubs
+if importlib.util.find_spec('pygame_games') is not None:
+    from src.Evaluation.evaluation_ple import EvaluationPle
+else:
+    EvaluationPle = object
+
+MIN_SCORE = -1_000_000
+
+class StubGame:
+    # The length and the positions of an episode only depend on the seed
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.length = self.rng.randint(3, 12)
+        self.ticks = 0
+        self.score = 0
+        self.position = self.rng.randint(0, 10)
+
+    def game_over(self):
+        return self.ticks >= self.length
+
+
+class StubPLE:
+
+    def __init__(self, game):
+        self.game = game
+
+    def reset_game(self):
+        self.game.reset()
+
+    def getGameState(self):
+        return {'position': self.game.position}
+
+    def getActionSet(self):
+        return [97, 100, None]
+
+    def act(self, action):
+        self.game.ticks += 1
+        if action == 100:
+            self.game.score += self.game.position
+        self.game.position = self.game.rng.randint(0, 10)
+
+    def score(self):
+        return self.game.score
+
+
+class EvaluationStubGame(EvaluationPle):
+
+    def update_env(self, game_state, action_set, env=None):
+        if env is None:
+            env = self.env
+
+        env.player_position = game_state['position']
+        env.actions = action_set
+        return env
+
+    def make_game(self, seed):
+        game = StubGame(seed)
+        return game, StubPLE(game)
+
+
+@unittest.skipIf(EvaluationPle is object, 'the PLE games are not installed')
+class TestLockstep(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+
+        # Moves right when the position is large, which scores the position
+        self.program = ITE.new(
+            GreaterThan.new(PlayerPosition(), Constant.new(5)),
+            ReturnAction.new(VarFromArray.new('actions', 1)),
+            ReturnAction.new(VarFromArray.new('actions', 0))
+        )
+
+    def get_evaluation(self, eval_config, lockstep_games):
+        evaluation = EvaluationStubGame(0, eval_config)
+        evaluation.set_seed_schedule(SeedSchedule(0))
+        evaluation.set_lockstep_games(lockstep_games)
+        return evaluation
+
+    def get_normal_config(self, total_games):
+        attributes = form_basic_attr_dict(False, None, None, total_games, MIN_SCORE, MIN_SCORE, None)
+        return EvaluationConfigFactory().get_config('NORMAL', attributes)
+
+    def get_triage_config(self, total_games):
+        best_scores = [400, 500] * 15
+        attributes = form_basic_attr_dict(True, 500, 0.95, total_games, 450, MIN_SCORE, 5)
+        config = EvaluationConfigFactory().get_config('BERNSTEIN', attributes)
+        config.set_best_eval_variance(variance(best_scores))
+        config.set_best_eval_range(max(best_scores) - min(best_scores))
+        return config
+
+    def test_scores_in_seed_order(self):
+        sequential = self.get_evaluation(self.get_normal_config(20), 1)
+        expected_scores, expected_result = sequential.evaluate(self.program, verbose=True)
+        self.assertEqual(len(expected_scores), 20)
+        self.assertGreater(len(set(expected_scores)), 1)
+
+        for lockstep_games in [2, 4, 7]:
+            lockstep = self.get_evaluation(self.get_normal_config(20), lockstep_games)
+            scores, result = lockstep.evaluate(self.program, verbose=True)
+            self.assertEqual(scores, expected_scores, 'the i-th score should be the score of the i-th seed')
+            self.assertEqual(result, expected_result)
+            self.assertLessEqual(lockstep.get_game_pool().get_free_count(), lockstep_games,
+                'finished games should be reused')
+
+    def test_triage_stops_early(self):
+        sequential = self.get_evaluation(self.get_triage_config(30), 1)
+        expected_scores, expected_result = sequential.evaluate(self.program, verbose=True)
+        self.assertLess(len(expected_scores), 30)
+
+        lockstep = self.get_evaluation(self.get_triage_config(30), 4)
+        scores, result = lockstep.evaluate(self.program, verbose=True)
+        self.assertEqual(scores, expected_scores, 'triage should stop after the same games')
+        self.assertEqual(result, expected_result)
+
+    def test_error_in_some_games(self):
+        # The program only raises in the games where the position is 0
+        program = ITE.new(
+            GreaterThan.new(Divide.new(Constant.new(10), PlayerPosition()), Constant.new(1)),
+            ReturnAction.new(VarFromArray.new('actions', 1)),
+            ReturnAction.new(VarFromArray.new('actions', 0))
+        )
+        for lockstep_games in [1, 4]:
+            evaluation = self.get_evaluation(self.get_normal_config(10), lockstep_games)
+            self.assertEqual(evaluation.evaluate(program, verbose=True), (tuple(), MIN_SCORE))
+            self.assertEqual(evaluation.get_game_pool().get_free_count(), min(lockstep_games, 10),
+                'the running games should be released')
+
+
+if __name__ == '__main__':
+    unittest.main()
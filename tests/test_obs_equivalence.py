@@ -0,0 +1,58 @@
+import unittest
+import random
+from src.dsl import *
+from src.Utils.obs_equivalence import ObservationalEquivalence
+
+class TestObservationalEquivalence(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+        random.seed(0)
+
+        envs = []
+        for _ in range(20):
+            env = {}
+            env['state'] = {}
+            env['state']['player_position'] = random.randint(0, 500)
+            env['state']['non_player_position'] = random.randint(0, 500)
+            env['state']['non_player_approaching'] = random.choice([True, False])
+            env['paddle_width'] = 50
+            env['actions'] = [97, 100, None]
+            envs.append(env)
+
+        self.equivalence = ObservationalEquivalence(envs)
+
+    def test_commutative_expressions(self):
+        self.assertTrue(self.equivalence.is_new(Plus.new(PlayerPosition(), NonPlayerObjectPosition())))
+        self.assertFalse(self.equivalence.is_new(Plus.new(NonPlayerObjectPosition(), PlayerPosition())),
+            'b + a should be equivalent to a + b')
+
+    def test_different_expressions(self):
+        self.assertTrue(self.equivalence.is_new(Minus.new(PlayerPosition(), NonPlayerObjectPosition())))
+        self.assertTrue(self.equivalence.is_new(Minus.new(NonPlayerObjectPosition(), PlayerPosition())),
+            'b - a should not be equivalent to a - b')
+
+    def test_equivalent_conditions(self):
+        self.assertTrue(self.equivalence.is_new(LessThan.new(PlayerPosition(), NonPlayerObjectPosition())))
+        self.assertFalse(self.equivalence.is_new(GreaterThan.new(NonPlayerObjectPosition(), PlayerPosition())),
+            'b > a should be equivalent to a < b')
+
+    def test_condition_not_merged_with_expression(self):
+        self.assertTrue(self.equivalence.is_new(Constant.new(1)))
+        self.assertTrue(self.equivalence.is_new(EqualTo.new(VarScalar.new('paddle_width'), VarScalar.new('paddle_width'))),
+            'a condition should not be equivalent to an expression')
+
+    def test_errors(self):
+        self.assertTrue(self.equivalence.is_new(Divide.new(PlayerPosition(), Constant.new(0))))
+        self.assertFalse(self.equivalence.is_new(Divide.new(NonPlayerObjectPosition(), Constant.new(0))),
+            'expressions failing on every game state should be equivalent')
+
+    def test_statements_never_pruned(self):
+        statement = IT.new(NonPlayerObjectApproaching(), ReturnAction.new(VarFromArray.new('actions', 0)))
+        self.assertTrue(self.equivalence.is_new(statement))
+        self.assertTrue(self.equivalence.is_new(statement), 'statements should never be pruned')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import os
+import time
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+# sim_anneal imports the PLE games and the optimizer entry point
+if importlib.util.find_spec('pygame_games') is not None and importlib.util.find_spec('src.Optimizer.start_optimizer') is not None:
+    from src.SA.parallel_sim_anneal import ParallelSimulatedAnnealing
+else:
+    ParallelSimulatedAnnealing = None
+
+class ProgramStub:
+
+    def __init__(self, name):
+        self.name = name
+
+    def get_size(self):
+        return 1
+
+    def to_string(self, indent=0):
+        return self.name
+
+
+class LoggerStub:
+
+    def log(self, item, end=None):
+        pass
+
+    def log_program(self, pstring, pdescr):
+        pass
+
+
+class EvaluationStub:
+
+    def __init__(self):
+        self.pool_workers = None
+        self.pool = None
+        self.intervals = 0
+        self.best = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['pool'] = None
+        return state
+
+    def set_pool_workers(self, pool_workers):
+        self.pool_workers = pool_workers
+
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.pool_workers)
+        return self.pool
+
+    def shutdown_pool(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def set_best(self, best, best_eval, scores):
+        self.best = (best, best_eval, scores)
+
+
+class ChainStub:
+    # Runs for the whole interval and records what it was given in its closed list
+
+    SCORES = [[5, 9, 1], [7, 2, 3], [4, 4, 8], [6, 6, 6]]
+
+    def __init__(self, index):
+        self.index = index
+        self.time_limit = None
+        self.best_scores = None
+        self.closed_list = None
+
+    def synthesize(self, current_t, final_t, eval_funct, plot_filename, option=1, verbose_opt=False, initial_best=None, closed_list=None):
+        time.sleep(self.time_limit)
+        eval_funct.intervals += 1
+
+        self.closed_list = closed_list
+        calls = closed_list.setdefault('calls', [])
+        calls.append({
+            'current_t': current_t,
+            'initial_best': None if initial_best is None else (initial_best[0].name, initial_best[1]),
+            'worker': (os.getpid(), id(eval_funct), eval_funct.intervals, eval_funct.get_pool().submit(os.getpid).result())
+        })
+
+        interval = len(calls) - 1
+        best_eval = ChainStub.SCORES[interval % len(ChainStub.SCORES)][self.index]
+        self.best_scores = (best_eval,)
+        return ProgramStub(f'{self.index}-{interval}'), best_eval
+
+
+@unittest.skipIf(ParallelSimulatedAnnealing is None, 'the PLE games or the optimizer are not installed')
+class TestParallelSimulatedAnnealing(unittest.TestCase):
+
+    def test_temperatures(self):
+        for n_chains in [1, 2, 4]:
+            parallel_sa = ParallelSimulatedAnnealing(1, LoggerStub(), [None] * n_chains, 1)
+            temperatures = parallel_sa.get_temperatures(2000, 1)
+
+            self.assertEqual(len(temperatures), n_chains)
+            self.assertEqual(temperatures[0], 2000)
+            self.assertGreater(temperatures[-1], 1, 'every chain should start above the final temperature')
+            for higher, lower in zip(temperatures, temperatures[1:] + [1]):
+                self.assertAlmostEqual(higher / lower, 2000 ** (1 / n_chains), msg='the temperatures should be spaced geometrically')
+
+    def test_exchanges(self):
+        chains = [ChainStub(i) for i in range(3)]
+        parallel_sa = ParallelSimulatedAnnealing(1.2, LoggerStub(), chains, 0.3)
+        evaluation = EvaluationStub()
+        parallel_sa.synthesize(2000, 1, evaluation, None)
+
+        # The closed lists of the chains are kept between the exchanges
+        calls = [parallel_sa.closed_lists[i]['calls'] for i in range(3)]
+        intervals = len(calls[0])
+        self.assertGreater(intervals, 1)
+
+        temperatures = parallel_sa.get_temperatures(2000, 1)
+        best = None
+        for interval in range(intervals):
+            for i in range(3):
+                self.assertEqual(calls[i][interval]['current_t'], temperatures[i])
+                self.assertEqual(calls[i][interval]['initial_best'], best,
+                    'the best program of the previous exchanges should be broadcast to every chain')
+
+            for i in range(3):
+                chain_best = (f'{i}-{interval}', ChainStub.SCORES[interval % len(ChainStub.SCORES)][i])
+                if best is None or chain_best[1] > best[1]:
+                    best = chain_best
+
+        self.assertEqual((evaluation.best[0].name, evaluation.best[1]), best)
+
+        # Each worker keeps its evaluation object from one interval to the next
+        # and the pool of the evaluation, which is shut down when the worker exits
+        workers = {}
+        for chain_calls in calls:
+            for call in chain_calls:
+                pid, evaluation_id, intervals_run, pool_pid = call['worker']
+                workers.setdefault(pid, []).append((evaluation_id, intervals_run, pool_pid))
+
+        for worker_calls in workers.values():
+            self.assertEqual(len(set(evaluation_id for evaluation_id, _, _ in worker_calls)), 1)
+            self.assertEqual(len(set(pool_pid for _, _, pool_pid in worker_calls)), 1)
+            self.assertEqual(sorted(intervals_run for _, intervals_run, _ in worker_calls), list(range(1, len(worker_calls) + 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
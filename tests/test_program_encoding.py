@@ -0,0 +1,113 @@
+import unittest
+import pickle
+import random
+import src.dsl as dsl
+import src.BUS.bus_dsl as bus_dsl
+from src.dsl import *
+from src.SA.program_mutator import ProgramMutator
+from src.Utils.dsl_config import DslConfig
+from src.Utils.program_encoding import EncodedProgram
+
+class TestProgramEncoding(unittest.TestCase):
+
+    def setUp(self):
+        # The grammar is set at class level, so it is restored after each test
+        self.grammar_state = {}
+        for name, cls in vars(dsl).items():
+            if isinstance(cls, type) and issubclass(cls, Node):
+                self.grammar_state[cls] = cls.valid_children_types
+
+        dsl_config = DslConfig('./src/dsl_config.json')
+        dsl_config.init_valid_children_types('Catcher')
+        grammar = dsl_config.get_grammar('Catcher')
+        VarArray.valid_children_types = [set(grammar['arrays'])]
+        VarFromArray.valid_children_types = [set(grammar['arrays']), set(grammar['array_indexes'])]
+        VarScalar.valid_children_types = [set(grammar['scalars'])]
+        Constant.valid_children_types = [set(grammar['constants'])]
+
+        random.seed(0)
+        mutator = ProgramMutator(0, 4, 50)
+        self.programs = [mutator.generate_random({}) for _ in range(100)]
+
+        self.envs = []
+        for _ in range(20):
+            env = GameEnv()
+            env.player_position = random.randint(0, 500)
+            env.non_player_position = random.randint(0, 500)
+            env.paddle_width = 50
+            env.actions = [97, 100, None]
+            self.envs.append(env)
+
+    def tearDown(self):
+        for cls, valid_children_types in self.grammar_state.items():
+            cls.valid_children_types = valid_children_types
+
+    def interpret(self, program, env):
+        try:
+            return program.interpret(env)
+        except ZeroDivisionError:
+            return ZeroDivisionError
+
+    def test_round_trip(self):
+        for program in self.programs:
+            decoded = EncodedProgram.encode(program).decode()
+            self.assertTrue(decoded.equals(program), 'decoding should give back the encoded program')
+            self.assertEqual(decoded.to_string(), program.to_string())
+            self.assertEqual(decoded.get_size(), program.get_size())
+
+    def test_round_trip_dsfs_with_children(self):
+        program = ITE.new(
+            GreaterThan.new(PlayerPosition.new(1), NonPlayerObjectPosition.new(0)),
+            ReturnAction.new(VarFromArray.new('actions', 1)),
+            ReturnAction.new(VarFromArray.new('actions', 0))
+        )
+        self.assertTrue(EncodedProgram.encode(program).decode().equals(program))
+
+    def new_program(self, module):
+        return module.ITE.new(
+            module.GreaterThan.new(module.NonPlayerObjectPosition(), module.Plus.new(module.PlayerPosition(), module.Constant.new(25))),
+            module.ReturnAction.new(module.VarFromArray.new('actions', 1)),
+            module.ReturnAction.new(module.VarFromArray.new('actions', 0))
+        )
+
+    def test_round_trip_bus_dsl(self):
+        program = self.new_program(bus_dsl)
+        decoded = EncodedProgram.encode(program).decode()
+        self.assertTrue(decoded.equals(program), 'the classes of the Bottom-Up Search dsl should be kept')
+        self.assertIs(type(decoded.get_children()[0]), bus_dsl.GreaterThan)
+        self.assertNotEqual(EncodedProgram.encode(program), EncodedProgram.encode(self.new_program(dsl)))
+
+    def test_unknown_node_class(self):
+        class UnknownNode(Node):
+            __slots__ = ()
+
+        with self.assertRaisesRegex(Exception, 'UnknownNode'):
+            EncodedProgram.encode(UnknownNode())
+
+    def test_interpret(self):
+        for program in self.programs:
+            encoded = EncodedProgram.encode(program)
+            for env in self.envs:
+                self.assertEqual(self.interpret(encoded, env), self.interpret(program, env),
+                    'the encoded program should return the same actions as the AST')
+
+    def test_pickle(self):
+        for program in self.programs:
+            encoded = EncodedProgram.encode(program)
+            pickled = pickle.dumps(encoded)
+            self.assertLess(len(pickled), 500)
+            self.assertEqual(pickle.loads(pickled), encoded)
+
+    def test_hash_and_equality(self):
+        encoded = EncodedProgram.encode(self.programs[0])
+        same = EncodedProgram.encode(EncodedProgram.encode(self.programs[0]).decode())
+        self.assertEqual(encoded, same)
+        self.assertEqual(encoded.get_hash(), same.get_hash())
+        self.assertEqual(len({encoded, same}), 1)
+
+        one = EncodedProgram.encode(Constant.new(1))
+        self.assertNotEqual(one, EncodedProgram.encode(Constant.new(1.0)), 'values of different types should differ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import copy
+import random
+import src.dsl as dsl
+from src.dsl import *
+from src.SA.program_mutator import ProgramMutator
+from src.Utils.dsl_config import DslConfig
+
+class TestProgramMutator(unittest.TestCase):
+
+    def setUp(self):
+        # The grammar is set at class level, so it is restored after each test
+        self.grammar_state = {}
+        for name, cls in vars(dsl).items():
+            if isinstance(cls, type) and issubclass(cls, Node):
+                self.grammar_state[cls] = cls.valid_children_types
+
+        dsl_config = DslConfig('./src/dsl_config.json')
+        dsl_config.init_valid_children_types('Catcher')
+        grammar = dsl_config.get_grammar('Catcher')
+        VarArray.valid_children_types = [set(grammar['arrays'])]
+        VarFromArray.valid_children_types = [set(grammar['arrays']), set(grammar['array_indexes'])]
+        VarScalar.valid_children_types = [set(grammar['scalars'])]
+        Constant.valid_children_types = [set(grammar['constants'])]
+
+        random.seed(0)
+        self.mutator = ProgramMutator(0, 4, 50)
+
+    def tearDown(self):
+        for cls, valid_children_types in self.grammar_state.items():
+            cls.valid_children_types = valid_children_types
+
+    def get_bookkeeping(self, node, depth=0):
+        """
+        Returns the size, height, hash and depth of every node in preorder, and
+        checks that the parent of every child is set.
+        """
+        values = [(node.get_size(), node.get_height(), node.get_hash(), node.get_depth())]
+        self.assertEqual(node.get_depth(), depth)
+        for child in node.get_children():
+            if isinstance(child, Node):
+                self.assertIs(child.get_parent(), node, 'the parent of each child should be set')
+                values.extend(self.get_bookkeeping(child, depth + 1))
+        return values
+
+    def test_incremental_bookkeeping(self):
+        p = self.mutator.generate_random({})
+        for _ in range(200):
+            p = self.mutator.mutate(p, {})
+
+            incremental = self.get_bookkeeping(p)
+            p.check_correct_size()
+            self.assertEqual(incremental, self.get_bookkeeping(p),
+                'incremental sizes, heights and hashes should match a full traversal')
+
+    def test_mutate_leaves_program_untouched(self):
+        p = self.mutator.generate_random({})
+        for _ in range(200):
+            program, size, p_hash = p.to_string(), p.get_size(), p.get_hash()
+            copied = copy.deepcopy(p)
+            candidate = self.mutator.mutate(p, {})
+
+            self.assertEqual(p.to_string(), program, 'mutate should not modify the mutated program')
+            self.assertEqual((p.get_size(), p.get_hash()), (size, p_hash))
+            self.assertTrue(p.equals(copied))
+            p = candidate
+
+    def test_preorder_index_spliced(self):
+        p = self.mutator.generate_random({})
+        for _ in range(200):
+            p = self.mutator.mutate(p, {})
+
+            spliced = p.get_preorder_index()
+            p.preorder_index = None
+            self.assertEqual(spliced, p.get_preorder_index(),
+                'the spliced preorder index should match a rebuilt one')
+
+    def test_preorder_index(self):
+        program = IT.new(GreaterThan.new(PlayerPosition(), Constant.new(1)), ReturnAction.new(VarFromArray.new('actions', 0)))
+        self.assertEqual(program.get_preorder_index(), [
+            ((), 'IT'),
+            ((0,), 'GreaterThan'),
+            ((0, 0), 'PlayerPosition'),
+            ((0, 1), 'Constant'),
+            ((0, 1, 0), 'Constant'),
+            ((1,), 'ReturnAction'),
+            ((1, 0), 'VarFromArray'),
+            ((1, 0, 0), 'VarFromArray'),
+            ((1, 0, 1), 'VarFromArray')
+        ])
+
+        program.get_children()[0].replace_child(Constant.new(2), 0)
+        self.assertEqual(program.get_preorder_index()[2], ((0, 0), 'Constant'),
+            'replace_child should invalidate the preorder index of the root')
+
+    def test_weighted_selection(self):
+        mutator = ProgramMutator(0, 4, 50, node_weights={'Constant': 1000})
+        program = IT.new(GreaterThan.new(PlayerPosition(), Constant.new(1)), ReturnAction.new(VarFromArray.new('actions', 0)))
+        preorder_index = program.get_preorder_index()
+
+        kinds = [preorder_index[mutator.select_position(program)][1] for _ in range(100)]
+        self.assertGreater(kinds.count('Constant'), 90, 'weighted kinds should be selected more often')
+
+    def test_copy_path_shares_subtrees(self):
+        comparison = GreaterThan.new(PlayerPosition(), Plus.new(NonPlayerObjectPosition(), Constant.new(1)))
+        action = ReturnAction.new(VarFromArray.new('actions', 0))
+        program = IT.new(comparison, action)
+
+        copied, plus = program.copy_path([0, 1])
+        plus.replace_child(Constant.new(2), 1)
+
+        self.assertIs(copied.get_children()[1], action, 'subtrees off the path should be shared')
+        self.assertIs(copied.get_children()[0].get_children()[0], comparison.get_children()[0])
+        self.assertIsNot(copied.get_children()[0], comparison, 'nodes on the path should be copied')
+        self.assertEqual(comparison.get_children()[1].get_children()[1].get_children()[0], 1)
+        self.assertNotEqual(copied.get_hash(), program.get_hash())
+        self.assertEqual(copied.get_size(), program.get_size())
+
+    def test_replace_child_updates_ancestors(self):
+        comparison = GreaterThan.new(PlayerPosition(), Plus.new(NonPlayerObjectPosition(), Constant.new(1)))
+        program = Strategy.new(IT.new(comparison, ReturnAction.new(VarFromArray.new('actions', 0))), None)
+        size, height = program.get_size(), program.get_height()
+
+        plus = comparison.get_children()[1]
+        plus.replace_child(Times.new(VarScalar.new('paddle_width'), Constant.new(2)), 1)
+
+        self.assertEqual(program.get_size(), size + 2, 'replace_child should update the size of the root')
+        self.assertEqual(program.get_height(), height + 1, 'replace_child should update the height of the root')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from src.Evaluation.racing import Racing
+from src.Evaluation.EvaluationConfig.evaluation_config import *
+
+class EvaluationStub:
+
+    MIN_SCORE = -100_000
+
+    def __init__(self, total_games, known_results=None):
+        # Results are computed by a real config, which keeps running statistics of the scores
+        attributes = form_basic_attr_dict(False, None, None, total_games, self.MIN_SCORE, self.MIN_SCORE, None)
+        self.eval_config = EvaluationConfigFactory().get_config('NORMAL', attributes)
+        self.total_games = total_games
+        self.known_results = {} if known_results is None else known_results
+        self.games_played = {}
+        self.cached = {}
+
+    def get_total_games(self):
+        return self.total_games
+
+    def get_known_result(self, program):
+        return self.known_results.get(program)
+
+    def play_games(self, program, n_games, first_game=0):
+        # programs are the score of each of their games, and None always raises
+        if program is None:
+            return None
+
+        assert first_game == self.games_played.get(program, 0), 'games should be played in the order of the seeds'
+
+        self.games_played[program] = self.games_played.get(program, 0) + n_games
+        return [program] * n_games
+
+    def compute_result(self, scores, games_played):
+        return self.eval_config.compute_result(scores, games_played)
+
+    def cache_result(self, program, scores, result):
+        self.cached[program] = (scores, result)
+
+
+class TestRacing(unittest.TestCase):
+
+    def test_schedule(self):
+        racing = Racing(EvaluationStub(16))
+        self.assertEqual(racing.get_schedule(1), [16])
+        self.assertEqual(racing.get_schedule(4), [4, 8, 16])
+        self.assertEqual(racing.get_schedule(5), [2, 4, 8, 16])
+        self.assertEqual(Racing(EvaluationStub(2)).get_schedule(8), [1, 2])
+
+    def test_race(self):
+        evaluation = EvaluationStub(16)
+        programs = [3, 7, 1, 5]
+        results = Racing(evaluation).race(programs)
+
+        self.assertEqual([result for _, result in results], [3, 7, 1, 5])
+        self.assertEqual(evaluation.games_played, {3: 4, 7: 16, 1: 4, 5: 8},
+            'the games should go to the programs that are still in the race')
+        self.assertEqual(list(evaluation.cached.keys()), [7], 'only complete evaluations should be cached')
+        self.assertEqual(len(results[1][0]), 16)
+        self.assertLess(sum(evaluation.games_played.values()), 16 * len(programs))
+
+    def test_known_results_and_errors(self):
+        evaluation = EvaluationStub(8, known_results={9: ((9,) * 8, 9)})
+        results = Racing(evaluation).race([9, None, 2, 4])
+
+        self.assertEqual(results[0], ((9,) * 8, 9))
+        self.assertEqual(results[1], (tuple(), EvaluationStub.MIN_SCORE))
+        self.assertNotIn(9, evaluation.games_played, 'known results should not be played again')
+        self.assertEqual(evaluation.games_played[4], 8)
+
+    def test_race_scores_each_program(self):
+        # The race scores the lists of several programs in turn with the same config
+        evaluation = EvaluationStub(8)
+        results = Racing(evaluation).race([1, 50, 100, 7])
+
+        self.assertEqual([result for _, result in results], [1, 50, 100, 7])
+        self.assertEqual(evaluation.games_played[100], 8)
+        self.assertEqual(list(evaluation.cached.keys()), [100])
+
+
+if __name__ == '__main__':
+    unittest.main()
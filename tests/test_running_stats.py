@@ -0,0 +1,69 @@
+import unittest
+import random
+from statistics import mean, variance, pvariance
+from src.Evaluation.EvaluationConfig.running_stats import RunningStats, BatchMaxTracker
+from src.Evaluation.EvaluationConfig.evaluation_config import *
+
+class TestRunningStats(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.scores = [random.randint(-3, 500) for _ in range(200)]
+
+    def test_running_stats(self):
+        stats = RunningStats()
+        for i, score in enumerate(self.scores):
+            stats.update(score)
+            scores = self.scores[:i + 1]
+            self.assertAlmostEqual(stats.get_mean(), mean(scores))
+            self.assertAlmostEqual(stats.get_pvariance(), pvariance(scores), places=6)
+            if i > 0:
+                self.assertAlmostEqual(stats.get_variance(), variance(scores), places=6)
+            self.assertEqual(stats.get_range(), max(scores) - min(scores))
+
+        self.assertEqual(RunningStats(self.scores).get_count(), len(self.scores))
+
+    def test_batch_max_tracker(self):
+        tracker = BatchMaxTracker(5)
+        for score in self.scores[:13]:
+            tracker.update(score)
+
+        max_scores = [max(self.scores[:5]), max(self.scores[5:10])]
+        self.assertEqual(tracker.get_max_stats().get_count(), 2, 'incomplete batches should not be counted')
+        self.assertAlmostEqual(tracker.get_max_stats().get_mean(), mean(max_scores))
+
+    def test_configs_reuse_stats(self):
+        attributes = form_basic_attr_dict(False, None, None, 10, 0, -1_000_000, 5)
+        for config_name in ['NORMAL', 'CHEBY', 'BATCH']:
+            config = EvaluationConfigFactory().get_config(config_name, attributes)
+
+            # Two evaluations in a row start from scratch
+            for scores in [self.scores[:10], self.scores[10:20]]:
+                played = []
+                for score in scores:
+                    played.append(score)
+                    result = config.compute_result(played, len(played))
+
+                if config_name == 'BATCH':
+                    self.assertEqual(result, round(mean([max(scores[:5]), max(scores[5:])]), 2))
+                else:
+                    self.assertEqual(result, round(mean(scores), 2))
+
+    def test_configs_score_several_lists(self):
+        attributes = form_basic_attr_dict(False, None, None, 10, 0, -1_000_000, 5)
+        for config_name in ['NORMAL', 'CHEBY', 'BATCH', 'BERNSTEIN', 'PAIRED']:
+            config = EvaluationConfigFactory().get_config(config_name, attributes)
+
+            # The lists of several programs grow in turn, as in Racing.race
+            lists = [[], [], []]
+            for games_played in range(1, 11):
+                for i, played in enumerate(lists):
+                    played.append(self.scores[10 * i + games_played - 1])
+                    result = config.compute_result(played, games_played)
+
+                    expected = config.__class__(attributes).compute_result(list(played), games_played)
+                    self.assertEqual(result, expected, f'{config_name} should not mix the scores of different lists')
+
+
+if __name__ == '__main__':
+    unittest.main()
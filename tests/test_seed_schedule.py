@@ -0,0 +1,24 @@
+import unittest
+from src.Evaluation.seed_schedule import SeedSchedule
+
+class TestSeedSchedule(unittest.TestCase):
+
+    def test_same_seeds_in_same_order(self):
+        schedule = SeedSchedule(3)
+        first_seeds = [schedule.get_seed(episode) for episode in range(10)]
+        self.assertEqual(schedule.get_seeds(10), first_seeds)
+        self.assertEqual(schedule.get_seed(4), first_seeds[4])
+
+        # Seeds drawn out of order are the same
+        other_schedule = SeedSchedule(3)
+        self.assertEqual(other_schedule.get_seed(7), first_seeds[7])
+        self.assertEqual(other_schedule.get_seeds(10), first_seeds)
+
+    def test_keys(self):
+        self.assertEqual(SeedSchedule(1).get_key(), SeedSchedule(1).get_key())
+        self.assertNotEqual(SeedSchedule(1).get_key(), SeedSchedule(2).get_key())
+        self.assertNotEqual(SeedSchedule(1).get_seeds(5), SeedSchedule(2).get_seeds(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
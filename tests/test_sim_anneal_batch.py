@@ -0,0 +1,127 @@
+import unittest
+import random
+import time
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from src.dsl import *
+from src.Utils.simplifier import canonical_key
+
+# sim_anneal imports the PLE games and the optimizer entry point
+if importlib.util.find_spec('pygame_games') is not None and importlib.util.find_spec('src.Optimizer.start_optimizer') is not None:
+    from src.SA.sim_anneal import SimulatedAnnealing
+else:
+    SimulatedAnnealing = None
+
+def new_program(constant):
+    return IT.new(
+        GreaterThan.new(PlayerPosition(), Constant.new(constant)),
+        ReturnAction.new(VarFromArray.new('actions', 1))
+    )
+
+def get_constant(program):
+    return program.get_children()[0].get_children()[1].get_children()[0]
+
+def get_score(constant):
+    return (constant * 37) % 101
+
+
+class LoggerStub:
+
+    def log(self, item, end=None):
+        pass
+
+    def log_program(self, pstring, pdescr):
+        pass
+
+
+class MutatorStub:
+    # The mutations of a program are the programs with the next constants
+
+    def __init__(self):
+        self.parents = {}
+        self.currents = []
+
+    def mutate(self, p, closed_list):
+        if len(self.currents) == 0 or self.currents[-1] != get_constant(p):
+            self.currents.append(get_constant(p))
+
+        constant = get_constant(p)
+        while True:
+            constant += 1
+            candidate = new_program(constant)
+            if closed_list.get(canonical_key(candidate)) is None:
+                self.parents[constant] = get_constant(p)
+                return candidate
+
+
+class EvaluationStub:
+    # The games are played by a pool of threads, which delays the results at random
+
+    STRONG_SCORE = 1_000_000
+
+    def __init__(self, workers):
+        self.pool = ThreadPoolExecutor(workers)
+        self.in_flight = {}
+        self.submitted = []
+        self.collected = set()
+        self.duplicates = []
+
+    def play(self, constant):
+        time.sleep(random.uniform(0, 0.002))
+        return (get_score(constant),), get_score(constant)
+
+    def submit_evaluation(self, program):
+        constant = get_constant(program)
+        if constant in [c for future, c in self.in_flight.items() if not future.cancelled()]:
+            self.duplicates.append(constant)
+
+        future = self.pool.submit(self.play, constant)
+        self.in_flight[future] = constant
+        self.submitted.append(future)
+        return future
+
+    def collect_evaluation(self, program, future):
+        self.collected.add(future)
+        del self.in_flight[future]
+        return future.result()
+
+    def set_best(self, best, best_eval, scores):
+        pass
+
+
+@unittest.skipIf(SimulatedAnnealing is None, 'the PLE games or the optimizer are not installed')
+class TestSimulatedAnnealingBatch(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+
+    def anneal(self, seed):
+        random.seed(seed)
+        mutator = MutatorStub()
+        evaluation = EvaluationStub(2)
+        sa = SimulatedAnnealing(10, LoggerStub(), None, mutator, batch_size=4)
+        sa.init_attributes(evaluation)
+        sa.start = time.time()
+        sa.closed_list = {}
+
+        current = new_program(0)
+        sa.simulated_annealing_batch(10 ** 12, 1, current, current, get_score(0), get_score(0), 0, evaluation, False)
+        evaluation.pool.shutdown()
+        return mutator, evaluation
+
+    def test_batch(self):
+        for seed in range(5):
+            mutator, evaluation = self.anneal(seed)
+
+            self.assertEqual(evaluation.duplicates, [], 'a candidate should not be submitted while it is in flight')
+            for future in evaluation.submitted:
+                self.assertTrue(future.cancelled() or future in evaluation.collected, 'every finished evaluation should be consumed')
+
+            # Each new current program is a mutation of the previous one
+            self.assertGreater(len(mutator.currents), 2)
+            for previous, current in zip(mutator.currents, mutator.currents[1:]):
+                self.assertEqual(mutator.parents[current], previous, 'only mutations of the current program should be accepted')
+
+
+if __name__ == '__main__':
+    unittest.main()
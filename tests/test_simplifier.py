@@ -0,0 +1,120 @@
+import unittest
+import random
+import src.dsl as dsl
+from src.dsl import *
+from src.SA.program_mutator import ProgramMutator
+from src.Utils.dsl_config import DslConfig
+from src.Utils.simplifier import simplify, canonical_key, is_constant_program
+
+class TestSimplifier(unittest.TestCase):
+
+    def setUp(self):
+        # The grammar is set at class level, so it is restored after each test
+        self.grammar_state = {}
+        for name, cls in vars(dsl).items():
+            if isinstance(cls, type) and issubclass(cls, Node):
+                self.grammar_state[cls] = cls.valid_children_types
+
+        dsl_config = DslConfig('./src/dsl_config.json')
+        dsl_config.init_valid_children_types('Catcher')
+        grammar = dsl_config.get_grammar('Catcher')
+        VarArray.valid_children_types = [set(grammar['arrays'])]
+        VarFromArray.valid_children_types = [set(grammar['arrays']), set(grammar['array_indexes'])]
+        VarScalar.valid_children_types = [set(grammar['scalars'])]
+        Constant.valid_children_types = [set(grammar['constants'])]
+
+        self.left = ReturnAction.new(VarFromArray.new('actions', 0))
+        self.right = ReturnAction.new(VarFromArray.new('actions', 1))
+
+        self.envs = []
+        random.seed(0)
+        for _ in range(20):
+            env = GameEnv()
+            env.player_position = random.randint(0, 500)
+            env.non_player_position = random.randint(0, 500)
+            env.paddle_width = 50
+            env.actions = [97, 100, None]
+            self.envs.append(env)
+
+    def tearDown(self):
+        for cls, valid_children_types in self.grammar_state.items():
+            cls.valid_children_types = valid_children_types
+
+    def interpret(self, program, env):
+        try:
+            return program.interpret(env)
+        except ZeroDivisionError:
+            return ZeroDivisionError
+
+    def test_constant_folding(self):
+        expression = Times.new(Constant.new(3), Plus.new(Constant.new(2), Constant.new(5)))
+        simplified = simplify(expression)
+        self.assertIsInstance(simplified, Constant)
+        self.assertEqual(simplified.interpret({}), 21)
+
+        division = Divide.new(Constant.new(1), Constant.new(0))
+        self.assertIsInstance(simplify(division), Divide, 'divisions by zero should not be folded')
+
+    def test_identities(self):
+        self.assertIsInstance(simplify(Minus.new(PlayerPosition(), PlayerPosition())), Constant)
+        self.assertIsInstance(simplify(Plus.new(PlayerPosition(), Constant.new(0))), PlayerPosition)
+
+        comparison = GreaterThan.new(NonPlayerObjectPosition(), NonPlayerObjectPosition())
+        self.assertEqual(simplify(comparison).interpret({}), False)
+
+        division = Divide.new(PlayerPosition(), Constant.new(0))
+        self.assertIsInstance(simplify(Minus.new(division, division)), Minus,
+            'expressions that can raise an error should not be folded')
+
+    def test_canonical_forms(self):
+        plus = Plus.new(PlayerPosition(), NonPlayerObjectPosition())
+        commuted = Plus.new(NonPlayerObjectPosition(), PlayerPosition())
+        self.assertEqual(canonical_key(plus), canonical_key(commuted))
+
+        greater = GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition())
+        less = LessThan.new(NonPlayerObjectPosition(), PlayerPosition())
+        self.assertEqual(canonical_key(greater), canonical_key(less))
+        self.assertNotEqual(canonical_key(greater), canonical_key(LessThan.new(PlayerPosition(), NonPlayerObjectPosition())))
+
+    def test_dead_branches(self):
+        never = IT.new(LessThan.new(Constant.new(2), Constant.new(1)), self.left)
+        program = Strategy.new(never, self.right)
+        self.assertTrue(simplify(program).equals(self.right), 'an IT that never fires should be removed')
+        self.assertTrue(is_constant_program(program))
+
+        always = IT.new(LessThan.new(Constant.new(1), Constant.new(2)), self.left)
+        program = Strategy.new(always, Strategy.new(IT.new(GreaterThan.new(PlayerPosition(), Constant.new(10)), self.right), None))
+        self.assertTrue(simplify(program).equals(self.left), 'statements after an IT that always fires should be removed')
+
+        program = ITE.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left, ReturnAction.new(VarFromArray.new('actions', 0)))
+        self.assertTrue(is_constant_program(program), 'an ITE with equal branches should be constant')
+
+        program = ITE.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left, self.right)
+        self.assertFalse(is_constant_program(program))
+
+    def test_hash_collision(self):
+        constant = ITE.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left, ReturnAction.new(VarFromArray.new('actions', 0)))
+        program = ITE.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left, self.right)
+        self.assertTrue(is_constant_program(constant))
+
+        # Different programs may share a hash, so the canonical forms must not be keyed by it
+        program.hash = constant.get_hash()
+        self.assertFalse(is_constant_program(program))
+        self.assertNotEqual(canonical_key(program), canonical_key(constant))
+
+    def test_equivalence(self):
+        random.seed(1)
+        mutator = ProgramMutator(0, 4, 50)
+        for _ in range(200):
+            program = mutator.generate_random({})
+            program_string = program.to_string()
+            simplified = simplify(program)
+
+            self.assertEqual(program.to_string(), program_string, 'simplify should not modify the program')
+            for env in self.envs:
+                self.assertEqual(self.interpret(simplified, env), self.interpret(program, env),
+                    'the simplified program should return the same actions')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import random
+import src.dsl as dsl
+from src.dsl import *
+from src.SA.program_mutator import ProgramMutator
+from src.Utils.dsl_config import DslConfig
+from src.Utils.static_analysis import classify, always_raises, RAISES, CONSTANT
+from src.Evaluation.EvaluationConfig.evaluation_config import *
+from src.Evaluation.evaluation_parent import Evaluation
+from src.Evaluation.seed_schedule import SeedSchedule
+
+class TestStaticAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        # The grammar is set at class level, so it is restored after each test
+        self.grammar_state = {}
+        for name, cls in vars(dsl).items():
+            if isinstance(cls, type) and issubclass(cls, Node):
+                self.grammar_state[cls] = cls.valid_children_types
+
+        dsl_config = DslConfig('./src/dsl_config.json')
+        dsl_config.init_valid_children_types('Catcher')
+        grammar = dsl_config.get_grammar('Catcher')
+        VarArray.valid_children_types = [set(grammar['arrays'])]
+        VarFromArray.valid_children_types = [set(grammar['arrays']), set(grammar['array_indexes'])]
+        VarScalar.valid_children_types = [set(grammar['scalars'])]
+        Constant.valid_children_types = [set(grammar['constants'])]
+
+        self.left = ReturnAction.new(VarFromArray.new('actions', 0))
+        self.right = ReturnAction.new(VarFromArray.new('actions', 1))
+
+        self.env = GameEnv()
+        self.env.player_position = 10
+        self.env.non_player_position = 20
+        self.env.paddle_width = 50
+        self.env.actions = [97, 100, None]
+
+    def tearDown(self):
+        for cls, valid_children_types in self.grammar_state.items():
+            cls.valid_children_types = valid_children_types
+
+    def test_division_by_zero(self):
+        condition = GreaterThan.new(Divide.new(PlayerPosition(), Constant.new(0)), NonPlayerObjectPosition())
+        program = ITE.new(condition, self.left, self.right)
+        self.assertEqual(classify(program), RAISES)
+
+        difference = Minus.new(PlayerPosition(), PlayerPosition())
+        condition = GreaterThan.new(Divide.new(PlayerPosition(), difference), NonPlayerObjectPosition())
+        self.assertTrue(always_raises(ITE.new(condition, self.left, self.right)),
+            'denominators that simplify to zero should be found')
+
+    def test_conditional_division_by_zero(self):
+        condition = GreaterThan.new(Divide.new(PlayerPosition(), Constant.new(0)), NonPlayerObjectPosition())
+        program = Strategy.new(
+            IT.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left),
+            Strategy.new(IT.new(condition, self.right), None)
+        )
+        self.assertFalse(always_raises(program), 'statements that are not always interpreted should not be considered')
+
+        never = IT.new(LessThan.new(Constant.new(2), Constant.new(1)), self.left)
+        program = Strategy.new(never, Strategy.new(IT.new(condition, self.right), None))
+        self.assertTrue(always_raises(program), 'statements after one that never returns are always interpreted')
+
+    def test_constant(self):
+        program = ITE.new(GreaterThan.new(PlayerPosition(), PlayerPosition()), self.left, self.right)
+        self.assertEqual(classify(program), CONSTANT)
+
+        program = ITE.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left, self.right)
+        self.assertIsNone(classify(program))
+
+    def test_constant_cache_needs_seed_schedule(self):
+        attributes = form_basic_attr_dict(False, None, None, 5, Evaluation.MIN_SCORE, Evaluation.MIN_SCORE, None)
+        evaluation = Evaluation(0, EvaluationConfigFactory().get_config('NORMAL', attributes))
+        program = ITE.new(GreaterThan.new(PlayerPosition(), PlayerPosition()), self.left, self.right)
+
+        # Without fixed seeds, the scores of a constant program depend on the games drawn
+        self.assertIsNone(evaluation.get_result_cache(program))
+
+        evaluation.set_seed_schedule(SeedSchedule(0))
+        self.assertIsNotNone(evaluation.get_result_cache(program))
+        program = ITE.new(GreaterThan.new(PlayerPosition(), NonPlayerObjectPosition()), self.left, self.right)
+        self.assertIsNone(evaluation.get_result_cache(program))
+
+    def test_raising_programs_raise(self):
+        random.seed(2)
+        mutator = ProgramMutator(0, 4, 50)
+        for _ in range(300):
+            program = mutator.generate_random({})
+            if always_raises(program):
+                with self.assertRaises(ZeroDivisionError):
+                    program.interpret(self.env)
+
+
+if __name__ == '__main__':
+    unittest.main()
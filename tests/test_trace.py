@@ -0,0 +1,93 @@
+import unittest
+import os
+import random
+import tempfile
+from src.dsl import *
+from src.Evaluation.trace import TraceRecorder, TraceCorpus
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        PlayerPosition.valid_children_types = 'empty'
+        NonPlayerObjectPosition.valid_children_types = 'empty'
+        random.seed(0)
+
+        self.program = ITE.new(
+            GreaterThan.new(NonPlayerObjectPosition(), PlayerPosition()),
+            ReturnAction.new(VarFromArray.new('actions', 1)),
+            ReturnAction.new(VarFromArray.new('actions', 0))
+        )
+        strategy = self.program.compile()
+
+        # two episodes of five ticks played by the program, scoring a point every other tick
+        self.recorder = TraceRecorder()
+        env = GameEnv()
+        env.actions = [97, 100, None]
+        env.non_player_approaching = True
+        for _ in range(2):
+            self.recorder.start_episode()
+            for tick in range(5):
+                env.player_position = random.randint(0, 500)
+                env.non_player_position = random.randint(0, 500)
+                self.recorder.record(env, strategy(env), (tick + 1) // 2)
+
+        self.corpus = self.recorder.get_corpus()
+
+    def test_rewards(self):
+        self.assertEqual(self.corpus.get_rewards().tolist(), [0, 1, 0, 1, 0] * 2,
+            'rewards should be the score changes within each episode')
+
+    def test_agreement(self):
+        self.assertEqual(self.corpus.agreement(self.program), 1.0, 'the recorded program should always agree')
+
+        program = ReturnAction.new(VarFromArray.new('actions', 2))
+        self.assertEqual(self.corpus.agreement(program), 0.0, 'a program never taking the recorded actions should not agree')
+
+    def test_proxy_reward(self):
+        self.assertEqual(self.corpus.proxy_reward(self.program), 2.0, 'the recorded program should get every reward')
+
+    def test_replay_error(self):
+        program = ReturnAction.new(VarFromArray.new('actions', Divide.new(PlayerPosition(), Constant.new(0))))
+        self.assertIsNone(self.corpus.replay(program), 'replay should return None if the program raises')
+        self.assertEqual(self.corpus.agreement(program), 0.0)
+
+    def test_replay_for_each(self):
+        # body_dist_list has a different length at each tick, so batch mode is not supported
+        self.addCleanup(setattr, VarScalar, 'valid_children_types', VarScalar.valid_children_types)
+        self.addCleanup(setattr, Constant, 'valid_children_types', Constant.valid_children_types)
+        VarScalar.valid_children_types = [{'loop'}]
+        Constant.valid_children_types = [{0}]
+        loop_body = Strategy.new(IT.new(GreaterThan.new(VarScalar.new('loop'), Constant.new(0)), ReturnAction.new(VarFromArray.new('actions', 1))), None)
+        program = ForEach.new(VarArray.new('body_dist_list'), loop_body)
+        strategy = program.compile()
+
+        recorder = TraceRecorder()
+        env = GameEnv()
+        env.actions = [97, 100, None]
+        env.player_position = 0
+        for tick in range(6):
+            env.body_dist_list = list(range(tick % 3))
+            recorder.record(env, strategy(env), tick)
+
+        corpus = recorder.get_corpus()
+        self.assertEqual(corpus.replay(program).tolist(), [None, None, 100] * 2)
+        self.assertEqual(corpus.agreement(program), 1.0, 'programs unsupported in batch mode should be replayed one tick at a time')
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'corpus.npz')
+            self.corpus.save(path)
+            corpus = TraceCorpus.load(path)
+
+        self.assertEqual(corpus.get_tick_count(), 10)
+        self.assertEqual(corpus.get_episode_count(), 2)
+        self.assertEqual(corpus.agreement(self.program), 1.0, 'a loaded corpus should replay like the original')
+        self.assertEqual(corpus.get_envs(), self.corpus.get_envs(), 'a loaded corpus should have the same game states')
+
+    def test_envs_can_be_interpreted(self):
+        for env, action in zip(self.corpus.get_envs(), self.corpus.actions):
+            self.assertEqual(self.program.interpret(env), action)
+
+
+if __name__ == '__main__':
+    unittest.main()